@@ -1,16 +1,20 @@
+import asyncio
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Optional
+from typing import Any, NamedTuple, Optional
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
 
+from cache import LRUCache
 from db import SessionLocal
-from models import User
+from models import User, UserRole
 
 
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-super-secret-key-change-in-production")
@@ -25,13 +29,135 @@ pwd_context = CryptContext(
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login", auto_error=False)
 
+ADMIN_ROLES = frozenset({UserRole.ADMIN, UserRole.SUPER_ADMIN})
+FACULTY_ROLES = frozenset({UserRole.FACULTY, UserRole.ADMIN, UserRole.SUPER_ADMIN})
+
+
+class Principal(NamedTuple):
+    """The parts of a User that authorization needs; cached per user id."""
+    id: int
+    role: UserRole
+    organisation_id: Optional[int]
+    faculty_id: Optional[int]
+    is_active: bool
+
+
+# Short TTL bounds how long other worker processes can serve a stale principal
+principal_cache = LRUCache(
+    max_entries=int(os.getenv("AUTH_PRINCIPAL_CACHE_MAX_ENTRIES", "10000")),
+    ttl_seconds=float(os.getenv("AUTH_PRINCIPAL_CACHE_TTL_SECONDS", "30")),
+)
+
+
+# =========================
+# PASSWORD HASHING POOL
+# =========================
+class HashingPool:
+    """
+    Bounded executor for argon2 work, kept off FastAPI's request threadpool.
+
+    At most `workers` hashes run at once and `queue_limit` more may wait;
+    beyond that callers get a 503 instead of piling up behind a login storm.
+    """
+
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hashing")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._stats = {
+            "submitted": 0,
+            "rejected": 0,
+            "completed": 0,
+            "failed": 0,
+            "rehashed": 0,
+            "max_in_flight": 0,
+            "queue_wait_ms": 0.0,
+            "hash_ms": 0.0,
+        }
+
+    def submit(self, fn, *args):
+        with self._lock:
+            if self._in_flight >= self.workers + self.queue_limit:
+                self._stats["rejected"] += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail="Too many authentication requests in progress, please retry",
+                    headers={"Retry-After": "1"},
+                )
+            self._in_flight += 1
+            self._stats["submitted"] += 1
+            self._stats["max_in_flight"] = max(self._stats["max_in_flight"], self._in_flight)
+        return self._executor.submit(self._run, time.perf_counter(), fn, *args)
+
+    def _run(self, submitted_at, fn, *args):
+        started_at = time.perf_counter()
+        ok = False
+        try:
+            result = fn(*args)
+            ok = True
+            return result
+        finally:
+            finished_at = time.perf_counter()
+            with self._lock:
+                self._in_flight -= 1
+                self._stats["completed" if ok else "failed"] += 1
+                self._stats["queue_wait_ms"] += (started_at - submitted_at) * 1000
+                self._stats["hash_ms"] += (finished_at - started_at) * 1000
+
+    def run(self, fn, *args):
+        return self.submit(fn, *args).result()
+
+    async def run_async(self, fn, *args):
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def record_rehash(self):
+        with self._lock:
+            self._stats["rehashed"] += 1
+
+    def metrics(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            in_flight = self._in_flight
+        done = stats["completed"] + stats["failed"]
+        return {
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "in_flight": in_flight,
+            "queued": max(0, in_flight - self.workers),
+            **{k: v for k, v in stats.items() if not k.endswith("_ms")},
+            "avg_queue_wait_ms": round(stats["queue_wait_ms"] / done, 2) if done else 0.0,
+            "avg_hash_ms": round(stats["hash_ms"] / done, 2) if done else 0.0,
+        }
+
+
+hashing_pool = HashingPool(
+    workers=int(os.getenv("PASSWORD_HASH_WORKERS", "4")),
+    queue_limit=int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "64")),
+)
+
 
 def hash_password(password: str):
-    return pwd_context.hash(password)
+    """Blocks the calling thread until the hash is done; for scripts. Request handlers use hash_password_async."""
+    return hashing_pool.run(pwd_context.hash, password)
 
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return hashing_pool.run(pwd_context.verify, plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    return await hashing_pool.run_async(pwd_context.hash, password)
+
+
+async def verify_password_async(plain_password, hashed_password) -> bool:
+    return await hashing_pool.run_async(pwd_context.verify, plain_password, hashed_password)
+
+
+async def verify_and_update_password(plain_password, hashed_password) -> tuple[bool, Optional[str]]:
+    """Verify off the request path; also returns a new hash when the stored one uses outdated parameters."""
+    return await hashing_pool.run_async(pwd_context.verify_and_update, plain_password, hashed_password)
 
 
 def create_access_token(
@@ -67,10 +193,27 @@ def get_db():
         db.close()
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-):
+def invalidate_principal(user_id: int) -> None:
+    principal_cache.invalidate_tags([f"user:{user_id}"])
+
+
+def load_principal(user_id: int) -> Optional[Principal]:
+    key = f"principal:{user_id}"
+    principal = principal_cache.get(key)
+    if principal is None:
+        # Short-lived session so no connection is held for the rest of the request
+        with SessionLocal() as db:
+            row = db.query(
+                User.id, User.role, User.organisation_id, User.faculty_id, User.is_active
+            ).filter(User.id == user_id).first()
+        if row is None:
+            return None
+        principal = Principal(row.id, UserRole(row.role), row.organisation_id, row.faculty_id, bool(row.is_active))
+        principal_cache.set(key, principal, tags=[f"user:{user_id}"])
+    return principal
+
+
+def get_current_user(token: str = Depends(oauth2_scheme)):
     if token is None:
         raise HTTPException(status_code=401, detail="Not authenticated")
 
@@ -84,7 +227,7 @@ def get_current_user(
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = load_principal(user_id)
 
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
@@ -95,22 +238,19 @@ def get_current_user(
     return user
 
 
-def get_current_admin(user: User = Depends(get_current_user)):
-    role_value = user.role.value if hasattr(user.role, 'value') else user.role
-    if role_value not in ["admin", "super_admin"]:
+def get_current_admin(user: Principal = Depends(get_current_user)):
+    if user.role not in ADMIN_ROLES:
         raise HTTPException(status_code=403, detail="Admin access required")
     return user
 
 
-def get_current_faculty(user: User = Depends(get_current_user)):
-    role_value = user.role.value if hasattr(user.role, 'value') else user.role
-    if role_value not in ["faculty", "admin", "super_admin"]:
+def get_current_faculty(user: Principal = Depends(get_current_user)):
+    if user.role not in FACULTY_ROLES:
         raise HTTPException(status_code=403, detail="Faculty access required")
     return user
 
 
-def get_current_super_admin(user: User = Depends(get_current_user)):
-    role_value = user.role.value if hasattr(user.role, 'value') else user.role
-    if role_value != "super_admin":
+def get_current_super_admin(user: Principal = Depends(get_current_user)):
+    if user.role != UserRole.SUPER_ADMIN:
         raise HTTPException(status_code=403, detail="Super Admin access required")
     return user
@@ -0,0 +1,87 @@
+"""
+Load test for the read endpoints against a running API.
+
+Start the server once with DB_ASYNC_READS=0 and once with DB_ASYNC_READS=1
+(same worker count and pool settings) and compare throughput and latency.
+Logs in as the given user and fires GET requests at the paths round-robin
+with a fixed number of concurrent clients. Conditional requests are not sent,
+so every response is a full 200.
+
+Usage: python bench_reads.py --url http://localhost:8000 --username admin --password ...
+                             --path /timetable/term/1 [--path /dashboard/summary ...]
+                             [--concurrency 64] [--requests 2000]
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def login(url: str, username: str, password: str) -> str:
+    request = urllib.request.Request(
+        f"{url}/login",
+        data=json.dumps({"username": username, "password": password}).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)["access_token"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--path", action="append", required=True)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    token = login(args.url, args.username, args.password)
+    latencies = []
+    errors = {}
+    lock = threading.Lock()
+
+    def fetch(i):
+        request = urllib.request.Request(
+            args.url + args.path[i % len(args.path)],
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+            status = None
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except OSError as e:
+            status = type(e).__name__
+        elapsed = (time.perf_counter() - started) * 1000
+        with lock:
+            if status is None:
+                latencies.append(elapsed)
+            else:
+                errors[status] = errors.get(status, 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(fetch, range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    if latencies:
+        p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+        print(f"ok={len(latencies)} errors={errors or 0} elapsed={elapsed:.2f}s "
+              f"rps={len(latencies) / elapsed:.0f}")
+        print(f"latency ms: mean={statistics.mean(latencies):.1f} p50={p(0.5):.1f} "
+              f"p95={p(0.95):.1f} p99={p(0.99):.1f} max={latencies[-1]:.1f}")
+    else:
+        print(f"no successful requests, errors={errors}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark for the timetable generator on synthetic terms.
+
+Builds a term with the requested number of sections (each taking every
+subject), faculties teaching a few sections each and enough rooms, then
+times `scheduler.solve` on it.
+
+Usage: python bench_scheduler.py [--sections 300] [--subjects 6] [--hours 4] [--seed 0]
+                                 [--starts 1] [--workers N] [--budget SECONDS]
+"""
+import argparse
+import time
+
+from scheduler import Lesson, Problem, solve_multistart
+
+
+DAYS = 5
+PERIODS_PER_DAY = 7
+PERIOD_MINUTES = 60
+MAX_WEEKLY_HOURS = 20
+
+
+def build_problem(sections: int, subjects: int, hours: int, sections_per_faculty: int, room_slack: float) -> Problem:
+    lessons = []
+    assignment = 0
+    faculty_count = 0
+    for subject in range(subjects):
+        for section in range(sections):
+            faculty = faculty_count + section // sections_per_faculty
+            lessons.extend(Lesson(assignment, faculty, section, ()) for _ in range(hours))
+            assignment += 1
+        faculty_count += -(-sections // sections_per_faculty)
+
+    n_slots = DAYS * PERIODS_PER_DAY
+    room_count = int(len(lessons) / n_slots * room_slack) + 1
+    rooms = tuple(range(room_count))
+    lessons = tuple(l._replace(rooms=rooms) for l in lessons)
+
+    return Problem(
+        days=DAYS,
+        periods_per_day=PERIODS_PER_DAY,
+        slot_minutes=(PERIOD_MINUTES,) * n_slots,
+        lessons=lessons,
+        faculty_limits=(MAX_WEEKLY_HOURS * 60,) * faculty_count,
+        faculty_fixed=(0,) * faculty_count,
+        room_fixed=(0,) * room_count,
+        group_fixed=(0,) * sections,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sections", type=int, default=300)
+    parser.add_argument("--subjects", type=int, default=6)
+    parser.add_argument("--hours", type=int, default=4)
+    parser.add_argument("--sections-per-faculty", type=int, default=4)
+    parser.add_argument("--room-slack", type=float, default=1.15)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--starts", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--budget", type=float, default=None)
+    args = parser.parse_args()
+
+    problem = build_problem(args.sections, args.subjects, args.hours, args.sections_per_faculty, args.room_slack)
+    print(f"lessons={len(problem.lessons)} faculties={len(problem.faculty_limits)} "
+          f"rooms={len(problem.room_fixed)} slots/week={problem.days * problem.periods_per_day}")
+
+    started = time.perf_counter()
+    solution, completed = solve_multistart(
+        problem, starts=args.starts, workers=args.workers, time_budget=args.budget, seed=args.seed
+    )
+    elapsed = time.perf_counter() - started
+    print(f"solve: {elapsed:.2f}s starts={completed}/{args.starts} best_seed={solution.seed} "
+          f"unplaced={solution.unplaced} score={solution.score}")
+
+
+if __name__ == "__main__":
+    main()
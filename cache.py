@@ -0,0 +1,159 @@
+"""
+Read-through cache for timetable payloads.
+
+Entries are stored with tags (term, section, batch, student) so writes can
+invalidate exactly the views they affect. `CacheBackend` is the interface a
+shared backend (e.g. Redis) would implement; the in-process `LRUCache` is
+bounded by entry count and TTL.
+
+Invalidation only reaches the process that made the write, so `memory` is
+meant for a single worker: with several, the others keep serving their copy
+until the TTL expires. Caching is therefore off unless asked for.
+
+Configuration:
+    TIMETABLE_CACHE_BACKEND      none (default) or memory
+    TIMETABLE_CACHE_MAX_ENTRIES  default 2048
+    TIMETABLE_CACHE_TTL_SECONDS  default 300
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterable, Optional
+
+
+class CacheBackend:
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, tags: Iterable[str] = ()) -> None:
+        raise NotImplementedError
+
+    def invalidate_tags(self, tags: Iterable[str]) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class NullCache(CacheBackend):
+    def get(self, key):
+        return None
+
+    def set(self, key, value, tags=()):
+        pass
+
+    def invalidate_tags(self, tags):
+        pass
+
+    def clear(self):
+        pass
+
+
+class LRUCache(CacheBackend):
+    def __init__(self, max_entries: int = 2048, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._keys_by_tag = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value, _ = entry
+            if expires_at < time.monotonic():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, tags=()):
+        tags = tuple(tags)
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value, tags)
+            for tag in tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate_tags(self, tags):
+        with self._lock:
+            for tag in tags:
+                for key in list(self._keys_by_tag.get(tag, ())):
+                    self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_tag.clear()
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+
+CACHE_BACKENDS = {
+    "memory": lambda: LRUCache(
+        max_entries=int(os.getenv("TIMETABLE_CACHE_MAX_ENTRIES", "2048")),
+        ttl_seconds=float(os.getenv("TIMETABLE_CACHE_TTL_SECONDS", "300")),
+    ),
+    "none": NullCache,
+}
+
+timetable_cache: CacheBackend = CACHE_BACKENDS[os.getenv("TIMETABLE_CACHE_BACKEND", "none")]()
+
+
+# =========================
+# TIMETABLE KEYS / TAGS
+# =========================
+def term_tag(term_id: int) -> str:
+    return f"term:{term_id}"
+
+
+def section_tag(section_id: int) -> str:
+    return f"section:{section_id}"
+
+
+def batch_tag(batch_id: int) -> str:
+    return f"batch:{batch_id}"
+
+
+def student_tag(student_id: str) -> str:
+    return f"student:{student_id}"
+
+
+def slot_tags(slot) -> set[str]:
+    """Tags of every cached view that shows `slot` (a TimetableSlot or a dict of its columns)."""
+    values = slot if isinstance(slot, dict) else {
+        "academic_term_id": slot.academic_term_id,
+        "section_id": slot.section_id,
+        "batch_id": slot.batch_id,
+    }
+    tags = {term_tag(values["academic_term_id"])}
+    if values.get("section_id"):
+        tags.add(section_tag(values["section_id"]))
+    if values.get("batch_id"):
+        tags.add(batch_tag(values["batch_id"]))
+    return tags
+
+
+def invalidate_slots(slots) -> None:
+    tags = set()
+    for slot in slots:
+        tags |= slot_tags(slot)
+    timetable_cache.invalidate_tags(tags)
+
+
+def invalidate_students(student_ids) -> None:
+    timetable_cache.invalidate_tags({student_tag(sid) for sid in student_ids})
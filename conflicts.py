@@ -0,0 +1,138 @@
+from typing import Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from db import env_flag
+from models import TimetableSlot
+
+# SLOT_OVERLAP_CONSTRAINTS: rely on the exclusion constraints from
+# migrations/005_slot_overlap_exclusion.sql (PostgreSQL only) and skip the
+# conflict pre-check queries on write; violations are mapped back to the
+# same conflict payload.
+SLOT_OVERLAP_CONSTRAINTS = env_flag("SLOT_OVERLAP_CONSTRAINTS", False)
+
+
+# =========================
+# CONFLICT DIMENSIONS
+# =========================
+CONFLICT_DIMENSIONS = ("faculty", "room", "section", "batch")
+
+CONFLICT_MESSAGES = {
+    "faculty": "Faculty already has a class at this time",
+    "room": "Room is already occupied at this time",
+    "section": "Section already has a class at this time",
+    "batch": "Batch already has a class at this time",
+}
+
+RESOURCE_COLUMNS = {
+    "faculty": TimetableSlot.faculty_id,
+    "room": TimetableSlot.room_id,
+    "section": TimetableSlot.section_id,
+    "batch": TimetableSlot.batch_id,
+}
+
+
+UNIQUE_VIOLATION = "23505"
+EXCLUSION_VIOLATION = "23P01"
+
+CONSTRAINT_DIMENSIONS = {
+    "excl_timetable_slots_faculty_overlap": "faculty",
+    "excl_timetable_slots_room_overlap": "room",
+    "excl_timetable_slots_section_overlap": "section",
+    "excl_timetable_slots_batch_overlap": "batch",
+    "unique_faculty_slot": "faculty",
+    "unique_room_slot": "room",
+    "unique_section_slot": "section",
+    "unique_batch_slot": "batch",
+}
+
+
+def slot_resources(data) -> dict[str, int]:
+    """Resource ids a slot occupies, keyed by conflict dimension (unset ones are omitted)."""
+    resources = {
+        "faculty": data.faculty_id,
+        "room": data.room_id,
+        "section": data.section_id,
+        "batch": data.batch_id,
+    }
+    return {dim: rid for dim, rid in resources.items() if rid}
+
+
+def find_conflicting_slots(db: Session, data, exclude_slot_id: int = None) -> dict[str, list[int]]:
+    """
+    Resolve every conflict dimension for `data` in a single query.
+
+    Returns the ids of the overlapping active slots per dimension; dimensions
+    without a conflict are omitted.
+    """
+    resources = slot_resources(data)
+    if not resources:
+        return {}
+
+    filters = [
+        TimetableSlot.date == data.date,
+        TimetableSlot.start_time < data.end_time,
+        TimetableSlot.end_time > data.start_time,
+        TimetableSlot.is_active == True,
+        or_(*(RESOURCE_COLUMNS[dim] == rid for dim, rid in resources.items())),
+    ]
+    if exclude_slot_id is not None:
+        filters.append(TimetableSlot.id != exclude_slot_id)
+
+    rows = db.query(
+        TimetableSlot.id,
+        TimetableSlot.faculty_id,
+        TimetableSlot.room_id,
+        TimetableSlot.section_id,
+        TimetableSlot.batch_id,
+    ).filter(*filters).order_by(TimetableSlot.id).all()
+
+    found = {}
+    for row in rows:
+        row_resources = {
+            "faculty": row.faculty_id,
+            "room": row.room_id,
+            "section": row.section_id,
+            "batch": row.batch_id,
+        }
+        for dim, rid in resources.items():
+            if row_resources[dim] == rid:
+                found.setdefault(dim, []).append(row.id)
+    return found
+
+
+def build_conflicts(
+    found: dict[str, list[int]],
+    batch_found: dict[str, list[int]] = None,
+    recurring_found: dict[str, list[int]] = None
+) -> list[dict]:
+    """
+    Turn per-dimension slot ids into the conflict payload returned by the API.
+
+    `batch_found` holds clashes with other rows of the same bulk request; their
+    positions are reported under `indexes`. `recurring_found` holds clashes
+    with recurring slots, reported under `recurring_slot_ids`.
+    """
+    batch_found = batch_found or {}
+    recurring_found = recurring_found or {}
+    conflicts = []
+    for dim in CONFLICT_DIMENSIONS:
+        if dim not in found and dim not in batch_found and dim not in recurring_found:
+            continue
+        conflict = {"type": dim, "message": CONFLICT_MESSAGES[dim], "slot_ids": found.get(dim, [])}
+        if dim in batch_found:
+            conflict["indexes"] = batch_found[dim]
+        if dim in recurring_found:
+            conflict["recurring_slot_ids"] = recurring_found[dim]
+        conflicts.append(conflict)
+    return conflicts
+
+
+def conflict_dimension(error) -> Optional[str]:
+    """Conflict dimension of an IntegrityError raised by an overlap/unique slot constraint, else None."""
+    orig = getattr(error, "orig", None)
+    if getattr(orig, "pgcode", None) not in (UNIQUE_VIOLATION, EXCLUSION_VIOLATION):
+        return None
+    constraint = getattr(getattr(orig, "diag", None), "constraint_name", None)
+    return CONSTRAINT_DIMENSIONS.get(constraint)
@@ -1,19 +1,250 @@
-import os
-
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
-import os
-from dotenv import load_dotenv
-
-load_dotenv()  
-
-DATABASE_URL = os.getenv("DATABASE_URL")
-
-
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(bind=engine)
-
-Base = declarative_base()
-
-
- 
\ No newline at end of file
+import os
+import threading
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError, DBAPIError, OperationalError, InterfaceError
+from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import NullPool, QueuePool
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+
+def env_flag(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
+
+# =========================
+# ENGINE / POOL CONFIG
+# =========================
+# DB_PGBOUNCER: connect through PgBouncer in transaction pooling mode. The
+# app keeps no pool of its own and sets the statement timeout per
+# transaction, since session-level settings do not survive PgBouncer.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = env_flag("DB_POOL_PRE_PING", True)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+DB_PGBOUNCER = env_flag("DB_PGBOUNCER", False)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that also records how many callers wait for a connection and for how long."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.waiters = 0
+        self.max_waiters = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.timeout_wait_ms = 0.0
+
+    def _do_get(self):
+        with self._stats_lock:
+            self.waiters += 1
+            self.max_waiters = max(self.max_waiters, self.waiters)
+        started_at = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            # Kept apart so a timeout does not pass for a slow successful checkout
+            waited = (time.perf_counter() - started_at) * 1000
+            with self._stats_lock:
+                self.waiters -= 1
+                self.timeouts += 1
+                self.timeout_wait_ms += waited
+            raise
+        except BaseException:
+            with self._stats_lock:
+                self.waiters -= 1
+            raise
+        waited = (time.perf_counter() - started_at) * 1000
+        with self._stats_lock:
+            self.waiters -= 1
+            self.checkouts += 1
+            self.wait_ms += waited
+            self.max_wait_ms = max(self.max_wait_ms, waited)
+        return connection
+
+
+def build_engine(url: str):
+    backend = make_url(url).get_backend_name()
+    kwargs = {"pool_pre_ping": DB_POOL_PRE_PING}
+    connect_args = {}
+
+    if DB_PGBOUNCER:
+        kwargs["poolclass"] = NullPool
+    else:
+        kwargs.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+        if DB_STATEMENT_TIMEOUT_MS and backend == "postgresql":
+            connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+
+    engine = create_engine(url, connect_args=connect_args, **kwargs)
+
+    if DB_PGBOUNCER and DB_STATEMENT_TIMEOUT_MS and backend == "postgresql":
+        @event.listens_for(engine, "begin")
+        def set_statement_timeout(conn):
+            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {DB_STATEMENT_TIMEOUT_MS}")
+
+    return engine
+
+
+def pool_status(engine) -> dict:
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__, "pgbouncer": DB_PGBOUNCER}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(0, pool.overflow()),
+            max_overflow=DB_MAX_OVERFLOW,
+            timeout_seconds=DB_POOL_TIMEOUT,
+        )
+    if isinstance(pool, InstrumentedQueuePool):
+        with pool._stats_lock:
+            status.update(
+                waiters=pool.waiters,
+                max_waiters=pool.max_waiters,
+                checkouts=pool.checkouts,
+                timeouts=pool.timeouts,
+                avg_wait_ms=round(pool.wait_ms / pool.checkouts, 3) if pool.checkouts else 0.0,
+                max_wait_ms=round(pool.max_wait_ms, 3),
+                avg_timeout_wait_ms=round(pool.timeout_wait_ms / pool.timeouts, 3) if pool.timeouts else 0.0,
+            )
+    return status
+
+
+# =========================
+# READ REPLICAS
+# =========================
+# DATABASE_REPLICA_URLS: comma-separated replica URLs for read-only sessions.
+# A replica that fails a health check, lags more than
+# DB_REPLICA_MAX_LAG_SECONDS or drops a connection is skipped for
+# DB_REPLICA_RETRY_SECONDS; with no usable replica reads go to the primary.
+DATABASE_REPLICA_URLS = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+DB_REPLICA_HEALTH_INTERVAL = float(os.getenv("DB_REPLICA_HEALTH_INTERVAL", "5"))
+DB_REPLICA_RETRY_SECONDS = float(os.getenv("DB_REPLICA_RETRY_SECONDS", "30"))
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "10"))
+
+REPLICA_LAG_SQL = (
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+def is_connection_error(error: Exception) -> bool:
+    if isinstance(error, (OperationalError, InterfaceError, OSError)):
+        return True
+    return isinstance(error, DBAPIError) and error.connection_invalidated
+
+
+class Replica:
+    def __init__(self, index: int, url: str):
+        self.index = index
+        self.url = url
+        self.engine = build_engine(url)
+        self.session_factory = sessionmaker(bind=self.engine)
+        self.down_until = 0.0
+        self.checked_at = 0.0
+        self.lag_seconds = None
+        self.last_error = None
+        self.routed = 0
+        self.failures = 0
+
+
+class ReplicaRouter:
+    def __init__(self, urls: list[str]):
+        self.replicas = [Replica(i, url) for i, url in enumerate(urls)]
+        self._lock = threading.Lock()
+        self._next = 0
+        self.primary_fallbacks = 0
+
+    def pick(self):
+        """Next usable replica (round-robin), or None to read from the primary."""
+        if not self.replicas:
+            return None
+        now = time.monotonic()
+        for _ in range(len(self.replicas)):
+            with self._lock:
+                replica = self.replicas[self._next % len(self.replicas)]
+                self._next += 1
+                if replica.down_until > now:
+                    continue
+                needs_check = now - replica.checked_at >= DB_REPLICA_HEALTH_INTERVAL
+                if needs_check:
+                    # Claim the check so concurrent requests keep using the last known state
+                    replica.checked_at = now
+            if needs_check and not self.check(replica):
+                continue
+            with self._lock:
+                replica.routed += 1
+            return replica
+        with self._lock:
+            self.primary_fallbacks += 1
+        return None
+
+    def check(self, replica: Replica) -> bool:
+        try:
+            with replica.engine.connect() as conn:
+                if replica.engine.dialect.name == "postgresql":
+                    lag = float(conn.exec_driver_sql(REPLICA_LAG_SQL).scalar() or 0)
+                else:
+                    conn.exec_driver_sql("SELECT 1")
+                    lag = 0.0
+        except Exception as e:
+            self.mark_down(replica, e)
+            return False
+        replica.lag_seconds = lag
+        if lag > DB_REPLICA_MAX_LAG_SECONDS:
+            self.mark_down(replica, f"replication lag {lag:.1f}s")
+            return False
+        replica.last_error = None
+        return True
+
+    def mark_down(self, replica: Replica, error) -> None:
+        with self._lock:
+            replica.down_until = time.monotonic() + DB_REPLICA_RETRY_SECONDS
+            replica.checked_at = 0.0
+            replica.failures += 1
+            replica.last_error = str(error)
+
+    def status(self) -> dict:
+        now = time.monotonic()
+        return {
+            "primary_fallbacks": self.primary_fallbacks,
+            "replicas": [
+                {
+                    "index": r.index,
+                    "host": make_url(r.url).host,
+                    "available": r.down_until <= now,
+                    "lag_seconds": r.lag_seconds,
+                    "routed": r.routed,
+                    "failures": r.failures,
+                    "last_error": r.last_error,
+                    "pool": pool_status(r.engine),
+                }
+                for r in self.replicas
+            ],
+        }
+
+
+engine = build_engine(DATABASE_URL)
+SessionLocal = sessionmaker(bind=engine)
+replica_router = ReplicaRouter(DATABASE_REPLICA_URLS)
+
+Base = declarative_base()
@@ -0,0 +1,202 @@
+"""
+Check that the hot timetable_slots queries use the indexes from
+migrations/004_timetable_slot_indexes.sql.
+
+Seeds a synthetic dataset (1,000,000 slots by default) on DATABASE_URL inside
+one transaction, runs ANALYZE and EXPLAIN for each query shape and rolls
+everything back, so the database is left as it was. Needs PostgreSQL with the
+migrations applied. Exits non-zero if a query does not use an expected index
+or falls back to a sequential scan of timetable_slots.
+
+tests/test_explain_indexes.py runs the same check when
+EXPLAIN_INDEXES_DATABASE_URL points at a PostgreSQL database.
+
+Usage: python explain_indexes.py [--slots 1000000] [--terms 50] [--sections-per-term 10]
+"""
+import argparse
+import json
+import math
+import sys
+from datetime import date, time, timedelta
+
+from sqlalchemy import select, or_
+from sqlalchemy.orm import Session
+
+from db import engine
+from models import (
+    Organisation, Department, Course, AcademicTerm, Subject, Section,
+    Faculty, Room, Batch, TimetableSlot, TermType
+)
+
+PERIODS_PER_DAY = 8
+SEED_START = date(2000, 1, 3)
+
+
+def seed(conn, slots: int, terms: int, sections_per_term: int):
+    session = Session(bind=conn)
+    org = Organisation(name="explain-indexes", code="EXPLAIN-IDX")
+    session.add(org)
+    session.flush()
+    dept = Department(name="explain", short_name="EXP", organisation_id=org.id)
+    session.add(dept)
+    session.flush()
+    course = Course(name="explain", code="EXPLAIN-IDX", duration_years=1, department_id=dept.id)
+    session.add(course)
+    session.flush()
+
+    groups = []
+    for t in range(terms):
+        term = AcademicTerm(
+            course_id=course.id, term_number=t + 1, term_type=TermType.SEMESTER,
+            start_date=SEED_START, end_date=SEED_START + timedelta(days=3650)
+        )
+        session.add(term)
+        session.flush()
+        for s in range(sections_per_term):
+            subject = Subject(
+                academic_term_id=term.id, name=f"S{t}-{s}", code=f"S{t}-{s}", subject_short_name=f"S{t}-{s}"
+            )
+            section = Section(academic_term_id=term.id, name=f"{t}-{s}")
+            faculty = Faculty(name=f"F{t}-{s}", employee_code=f"EXPLAIN-{t}-{s}", department_id=dept.id)
+            room = Room(name=f"R{t}-{s}", department_id=dept.id)
+            session.add_all([subject, section, faculty, room])
+            session.flush()
+            batch = Batch(academic_term_id=term.id, subject_id=subject.id, name=f"B{t}-{s}")
+            session.add(batch)
+            session.flush()
+            groups.append((term.id, subject.id, section.id, batch.id, faculty.id, room.id))
+
+    # One faculty and room per group, so every (group, day, period) is a valid
+    # slot. The last period of each day is taught to the batch instead of the
+    # section, so the batch shape has rows to find.
+    days = math.ceil(slots / (len(groups) * PERIODS_PER_DAY))
+    conn.exec_driver_sql(
+        "CREATE TEMP TABLE seed_groups (term_id INT, subject_id INT, section_id INT, batch_id INT, "
+        "faculty_id INT, room_id INT) ON COMMIT DROP"
+    )
+    conn.exec_driver_sql("INSERT INTO seed_groups VALUES (%s, %s, %s, %s, %s, %s)", groups)
+    conn.exec_driver_sql(
+        "INSERT INTO timetable_slots (academic_term_id, subject_id, faculty_id, section_id, batch_id, room_id, "
+        "date, start_time, end_time, modality, is_active) "
+        "SELECT g.term_id, g.subject_id, g.faculty_id, "
+        "CASE WHEN p = %(periods)s - 1 THEN NULL ELSE g.section_id END, "
+        "CASE WHEN p = %(periods)s - 1 THEN g.batch_id END, g.room_id, "
+        "%(start)s::date + d, make_time(8 + p, 0, 0), make_time(8 + p, 50, 0), 'Offline', (d + p) %% 10 <> 0 "
+        "FROM seed_groups g CROSS JOIN generate_series(0, %(days)s - 1) d "
+        "CROSS JOIN generate_series(0, %(periods)s - 1) p "
+        "LIMIT %(slots)s",
+        {"start": SEED_START, "days": days, "periods": PERIODS_PER_DAY, "slots": slots},
+    )
+    conn.exec_driver_sql("ANALYZE timetable_slots")
+    return groups[len(groups) // 2]
+
+
+def query_shapes(term_id, section_id, batch_id, faculty_id, room_id):
+    day = SEED_START + timedelta(days=10)
+    return [
+        (
+            "term timetable",
+            select(TimetableSlot.id, TimetableSlot.date, TimetableSlot.start_time).where(
+                TimetableSlot.academic_term_id == term_id, TimetableSlot.is_active == True
+            ),
+            {"idx_timetable_slots_term_active"},
+        ),
+        (
+            "section timetable",
+            select(TimetableSlot.id, TimetableSlot.date, TimetableSlot.start_time).where(
+                TimetableSlot.section_id == section_id, TimetableSlot.is_active == True
+            ).order_by(TimetableSlot.date, TimetableSlot.start_time),
+            {"idx_timetable_slots_section_active"},
+        ),
+        (
+            "batch timetable",
+            select(TimetableSlot.id, TimetableSlot.date, TimetableSlot.start_time).where(
+                TimetableSlot.batch_id == batch_id, TimetableSlot.is_active == True
+            ).order_by(TimetableSlot.date, TimetableSlot.start_time),
+            {"idx_timetable_slots_batch_active"},
+        ),
+        (
+            "faculty hours",
+            select(TimetableSlot.start_time, TimetableSlot.end_time).where(
+                TimetableSlot.faculty_id == faculty_id, TimetableSlot.is_active == True
+            ),
+            {"idx_timetable_slots_faculty_active"},
+        ),
+        (
+            "conflict check",
+            select(TimetableSlot.id).where(
+                TimetableSlot.date == day,
+                TimetableSlot.start_time < time(10, 0),
+                TimetableSlot.end_time > time(9, 0),
+                TimetableSlot.is_active == True,
+                or_(
+                    TimetableSlot.faculty_id == faculty_id,
+                    TimetableSlot.room_id == room_id,
+                    TimetableSlot.section_id == section_id,
+                ),
+            ),
+            {
+                "unique_faculty_slot", "unique_room_slot", "idx_timetable_slots_date_section",
+                "idx_timetable_slots_faculty_active", "idx_timetable_slots_section_active",
+            },
+        ),
+    ]
+
+
+def plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def explain(conn, statement) -> dict:
+    compiled = statement.compile(dialect=conn.dialect)
+    rows = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params).scalar()
+    if isinstance(rows, str):
+        rows = json.loads(rows)
+    return rows[0]["Plan"]
+
+
+def check_indexes(conn, slots: int, terms: int, sections_per_term: int) -> list:
+    """Seed, EXPLAIN each query shape and roll back; returns (name, ok, scans) per shape."""
+    results = []
+    transaction = conn.begin()
+    try:
+        term_id, _, section_id, batch_id, faculty_id, room_id = seed(conn, slots, terms, sections_per_term)
+        for name, statement, expected in query_shapes(term_id, section_id, batch_id, faculty_id, room_id):
+            nodes = list(plan_nodes(explain(conn, statement)))
+            used = {n["Index Name"] for n in nodes if "Index Name" in n}
+            seq_scan = any(
+                n["Node Type"] == "Seq Scan" and n.get("Relation Name") == "timetable_slots" for n in nodes
+            )
+            scans = ", ".join(
+                f"{n['Node Type']}({n.get('Index Name', n.get('Relation Name'))})"
+                for n in nodes if "Scan" in n["Node Type"]
+            )
+            results.append((name, bool(used & expected) and not seq_scan, scans))
+    finally:
+        transaction.rollback()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--slots", type=int, default=1_000_000)
+    parser.add_argument("--terms", type=int, default=50)
+    parser.add_argument("--sections-per-term", type=int, default=10)
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        sys.exit("explain_indexes.py needs a PostgreSQL DATABASE_URL")
+
+    failures = 0
+    with engine.connect() as conn:
+        for name, ok, scans in check_indexes(conn, args.slots, args.terms, args.sections_per_term):
+            failures += not ok
+            print(f"{'ok  ' if ok else 'FAIL'} {name:<18} {scans}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Per-request SQL statement counting and timing.
+
+Engine events add every statement's count and duration to the RequestStats of
+the request being served (tracked in a contextvar, which also follows the
+request into threadpool calls). The middleware reports them in a
+Server-Timing header and adds them to per-route histograms, exposed at
+GET /super-admin/metrics/requests.
+
+SQL_INSTRUMENTATION=0 turns it all off; SERVER_TIMING=0 keeps the histograms
+but drops the header.
+"""
+import math
+import os
+import threading
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from db import env_flag
+
+SQL_INSTRUMENTATION = env_flag("SQL_INSTRUMENTATION", True)
+SERVER_TIMING = env_flag("SERVER_TIMING", True)
+SLOWEST_SQL_MAX_CHARS = int(os.getenv("SLOWEST_SQL_MAX_CHARS", "300"))
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, math.inf)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, math.inf)
+
+
+class RequestStats:
+    __slots__ = ("statements", "db_ms", "slowest_ms", "slowest_sql", "started_at", "closed")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_sql = None
+        self.started_at = perf_counter()
+        self.closed = False
+
+    def record(self, statement: str, elapsed_ms: float):
+        # Background tasks run after the response was reported; leave them out
+        if self.closed:
+            return
+        self.statements += 1
+        self.db_ms += elapsed_ms
+        if elapsed_ms > self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest_sql = statement
+
+    def server_timing(self, total_ms: float) -> str:
+        return (
+            f'db;dur={self.db_ms:.1f};desc="{self.statements} statements", '
+            f"db-slowest;dur={self.slowest_ms:.1f}, "
+            f"total;dur={total_ms:.1f}"
+        )
+
+
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+# =========================
+# ENGINE EVENTS
+# =========================
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_request_stats.get() is not None:
+        conn.info.setdefault("query_started_at", []).append(perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_started_at")
+    if not started:
+        return
+    elapsed_ms = (perf_counter() - started.pop()) * 1000
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed_ms)
+
+
+def handle_error(exception_context):
+    started = exception_context.connection.info.get("query_started_at") if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+if SQL_INSTRUMENTATION:
+    # Listening on the Engine class covers the primary, the replicas and the
+    # sync side of the async engines
+    event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(Engine, "handle_error", handle_error)
+
+
+# =========================
+# PER-ROUTE HISTOGRAMS
+# =========================
+class RouteStats:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.statements = 0
+        self.max_statements = 0
+        self.db_ms = 0.0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_sql = None
+        self.latency_counts = [0] * len(LATENCY_BUCKETS_MS)
+        self.statement_counts = [0] * len(STATEMENT_BUCKETS)
+
+    def add(self, stats: RequestStats, total_ms: float, status: int):
+        self.requests += 1
+        self.errors += status >= 500
+        self.statements += stats.statements
+        self.max_statements = max(self.max_statements, stats.statements)
+        self.db_ms += stats.db_ms
+        self.total_ms += total_ms
+        if stats.slowest_ms > self.slowest_ms:
+            self.slowest_ms = stats.slowest_ms
+            self.slowest_sql = (stats.slowest_sql or "")[:SLOWEST_SQL_MAX_CHARS]
+        self.latency_counts[bucket_index(LATENCY_BUCKETS_MS, total_ms)] += 1
+        self.statement_counts[bucket_index(STATEMENT_BUCKETS, stats.statements)] += 1
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "avg_statements": round(self.statements / self.requests, 2),
+            "max_statements": self.max_statements,
+            "avg_db_ms": round(self.db_ms / self.requests, 3),
+            "avg_total_ms": round(self.total_ms / self.requests, 3),
+            "slowest_statement_ms": round(self.slowest_ms, 3),
+            "slowest_statement": self.slowest_sql,
+            "latency_ms": histogram(LATENCY_BUCKETS_MS, self.latency_counts),
+            "statements": histogram(STATEMENT_BUCKETS, self.statement_counts),
+        }
+
+
+def bucket_index(bounds, value) -> int:
+    for i, bound in enumerate(bounds):
+        if value <= bound:
+            return i
+    return len(bounds) - 1
+
+
+def histogram(bounds, counts) -> dict:
+    """Cumulative counts keyed by upper bound, like a Prometheus histogram."""
+    result, running = {}, 0
+    for bound, count in zip(bounds, counts):
+        running += count
+        result["+Inf" if bound == math.inf else str(bound)] = running
+    return result
+
+
+class RequestMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def record(self, route: str, stats: RequestStats, total_ms: float, status: int):
+        with self._lock:
+            route_stats = self._routes.get(route)
+            if route_stats is None:
+                route_stats = self._routes[route] = RouteStats()
+            route_stats.add(stats, total_ms, status)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {route: stats.to_dict() for route, stats in sorted(self._routes.items())}
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+request_metrics = RequestMetrics()
+
+
+# =========================
+# MIDDLEWARE
+# =========================
+def route_name(scope) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None) or "<unmatched>"
+    return f"{scope['method']} {path}"
+
+
+class SQLInstrumentationMiddleware:
+    """ASGI middleware that tracks the SQL each HTTP request runs."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not SQL_INSTRUMENTATION:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and not stats.closed:
+                stats.closed = True
+                total_ms = (perf_counter() - stats.started_at) * 1000
+                request_metrics.record(route_name(scope), stats, total_ms, message["status"])
+                if SERVER_TIMING:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", stats.server_timing(total_ms).encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            if not stats.closed:
+                # An unhandled exception is turned into a 500 outside this middleware
+                stats.closed = True
+                request_metrics.record(route_name(scope), stats, (perf_counter() - stats.started_at) * 1000, 500)
+            current_request_stats.reset(token)
@@ -0,0 +1,85 @@
+"""
+In-process registry for background jobs started from API requests.
+
+Jobs run on FastAPI's background task threadpool; their progress lives in
+memory on the worker that accepted the request, and the newest JOB_RETENTION
+jobs are kept for polling via GET /jobs/{id}.
+
+Nothing is shared between processes: with several workers, a poll that lands
+on another worker gets a 404. Run a single worker, or route /jobs requests
+back to the same one, until jobs are persisted.
+"""
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional
+
+JOB_RETENTION = int(os.getenv("JOB_RETENTION", "200"))
+
+
+class Job:
+    def __init__(self, kind: str, organisation_id: int, total: int = 0, groups_total: int = 0):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.organisation_id = organisation_id
+        self.status = "pending"
+        self.total = total
+        self.processed = 0
+        self.groups_total = groups_total
+        self.groups_done = 0
+        self.results = []
+        self.error = None
+        self.created_at = datetime.now(timezone.utc)
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        self.status = "running"
+
+    def add_result(self, result: dict, processed: int):
+        with self._lock:
+            self.results.append(result)
+            self.processed += processed
+            self.groups_done += 1
+
+    def finish(self, error: str = None):
+        self.error = error
+        self.status = "failed" if error else "completed"
+        self.finished_at = datetime.now(timezone.utc)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "total": self.total,
+                "processed": self.processed,
+                "groups_total": self.groups_total,
+                "groups_done": self.groups_done,
+                "results": list(self.results),
+                "error": self.error,
+                "created_at": self.created_at,
+                "finished_at": self.finished_at,
+            }
+
+
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+
+
+def create_job(kind: str, organisation_id: int, total: int = 0, groups_total: int = 0) -> Job:
+    job = Job(kind, organisation_id, total, groups_total)
+    with _jobs_lock:
+        _jobs[job.id] = job
+        finished = [jid for jid, j in _jobs.items() if j.finished_at is not None]
+        for jid in finished[:max(0, len(_jobs) - JOB_RETENTION)]:
+            del _jobs[jid]
+    return job
+
+
+def get_job(job_id: str) -> Optional[Job]:
+    with _jobs_lock:
+        return _jobs.get(job_id)
@@ -1,20 +1,32 @@
-from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session, joinedload
+from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, File, Request, Response, Query, BackgroundTasks
+from sqlalchemy.orm import Session, joinedload, aliased
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, insert, select, func, text, case, cast, exists, literal
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 import secrets
 import string
 import io
-from datetime import date
-
-from auth import get_current_user, get_current_admin, get_current_super_admin
-from db import SessionLocal
+import csv
+from itertools import islice
+from datetime import date, timedelta
+from typing import Iterable, Iterator, Optional
+from time import perf_counter
+
+from auth import get_current_user, get_current_admin, get_current_super_admin, invalidate_principal, Principal
+from conflicts import find_conflicting_slots, build_conflicts, conflict_dimension, SLOT_OVERLAP_CONSTRAINTS
+from occupancy import (
+    OCCUPANCY_GRID_ENABLED, OccupancyGrid, grid, load_grid_for_slots,
+    track_slot_saved, track_slots_created, track_slot_deleted, track_bulk_change
+)
+from db import SessionLocal, engine, env_flag, pool_status, replica_router
+from read_db import get_read_db, mark_primary_write
 from models import (
     Base, Organisation, Department, Course, AcademicTerm,
     Subject, Section, Batch, Faculty, FacultyAssignment,
     Room, TimetableSlot, User, TermType, SubjectType, DayOfWeek, UserRole,
-    StudentGroupMap, GroupType
+    StudentGroupMap, GroupType, OrganisationCounter, RecurringSlot, RecurringSlotException
 )
 from schemas import (
     OrganisationCreate, OrganisationUpdate, OrganisationResponse,
@@ -24,16 +36,34 @@ from schemas import (
     SubjectCreate, SubjectUpdate, SubjectResponse,
     SectionCreate, SectionUpdate, SectionResponse,
     BatchCreate, BatchUpdate, BatchResponse,
-    FacultyCreate, FacultyUpdate, FacultyResponse,
+    FacultyCreate, FacultyUpdate, FacultyResponse, FacultyLoadResponse,
     FacultyAssignmentCreate, FacultyAssignmentResponse,
     RoomCreate, RoomUpdate, RoomResponse,
     TimetableSlotCreate, TimetableSlotUpdate, TimetableSlotResponse,
     TimetableSlotWithDetails,
+    RecurringSlotCreate, RecurringSlotResponse, RecurringSlotExceptionCreate,
     UserCreate, LoginRequest, TokenResponse,
     StudentEnrollmentResponse, BulkEnrollRequest, BulkEnrollResult,
-    StudentTimetableSlot
+    StudentTimetableSlot,
+    TermBulkEnrollRequest, EnrollmentJobResponse,
+    TimetableGenerateRequest, TimetableGenerateResult,
+    TimetableCloneRequest, TimetableCloneResult
+)
+from cache import (
+    timetable_cache, term_tag, section_tag, batch_tag, student_tag,
+    slot_tags, invalidate_slots, invalidate_students
+)
+from versions import (
+    bump_versions, bump_slot_versions, bump_versions_where,
+    make_etag, make_digest_etag, not_modified
+)
+from jobs import create_job, get_job
+from instrumentation import SQLInstrumentationMiddleware, request_metrics
+from scheduler import load_problem, solve_multistart, expand_solution, unplaced_summary, generator_runs
+from recurrence import (
+    RecurringRules, Occurrence, expand, first_occurrence, is_occurrence, find_pattern_conflicts, weekday_of,
+    load_occurrences
 )
-
 app = FastAPI(title="Class Timetable API Service")
 
 app.add_middleware(
@@ -43,15 +73,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Server-Timing", "X-Total-Count"],
 )
+app.add_middleware(SQLInstrumentationMiddleware)
 
 
-def get_db():
+def get_db(request: Request):
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+        if request.method not in ("GET", "HEAD", "OPTIONS"):
+            mark_primary_write(request)
 
 
 def generate_code(base_name: str, db: Session, model_class, field_name: str = "code") -> str:
@@ -93,7 +127,10 @@ def get_faculty_department_id(db: Session, faculty_id: int) -> int:
 def validate_faculty_department_match(db: Session, faculty_id: int, subject_id: int) -> None:
     faculty_dept_id = get_faculty_department_id(db, faculty_id)
     subject_dept_id = get_subject_department_id(db, subject_id)
-    
+    check_department_ids_match(faculty_dept_id, subject_dept_id)
+
+
+def check_department_ids_match(faculty_dept_id: int, subject_dept_id: int) -> None:
     if faculty_dept_id is None:
         raise HTTPException(404, "Faculty not found")
     if subject_dept_id is None:
@@ -107,6 +144,9 @@ def validate_faculty_department_match(db: Session, faculty_id: int, subject_id:
         )
 
 
+NO_ASSIGNMENT_MESSAGE = "No faculty assignment found. Assign the faculty to this subject first."
+
+
 def validate_faculty_assignment_exists(db: Session, faculty_id: int, subject_id: int, section_id: int = None, batch_id: int = None) -> None:
     query = db.query(FacultyAssignment).filter(
         FacultyAssignment.faculty_id == faculty_id,
@@ -119,87 +159,129 @@ def validate_faculty_assignment_exists(db: Session, faculty_id: int, subject_id:
         query = query.filter(FacultyAssignment.batch_id == batch_id)
     assignment = query.first()
     if not assignment:
-        raise HTTPException(400, "No faculty assignment found. Assign the faculty to this subject first.")
+        raise HTTPException(400, NO_ASSIGNMENT_MESSAGE)
 
 
 def check_timetable_conflicts(db: Session, data: TimetableSlotCreate, exclude_slot_id: int = None) -> list:
-    conflicts = []
-    
-    faculty_conflict = db.query(TimetableSlot).filter(
-        TimetableSlot.faculty_id == data.faculty_id,
-        TimetableSlot.date == data.date,
-        TimetableSlot.start_time < data.end_time,
-        TimetableSlot.end_time > data.start_time,
+    if SLOT_OVERLAP_CONSTRAINTS:
+        # Stored slots are checked by the exclusion constraints on write
+        found = {}
+    elif OCCUPANCY_GRID_ENABLED:
+        grid.load_dates(db, [data.date])
+        found = grid.conflicts(data, exclude_ref=exclude_slot_id)
+    else:
+        found = find_conflicting_slots(db, data, exclude_slot_id)
+    recurring_found = RecurringRules.load(db, [data]).conflicts(data)
+    return build_conflicts(found, recurring_found=recurring_found)
+
+
+def raise_for_slot_conflict(db: Session, error: IntegrityError, data: TimetableSlotCreate, exclude_slot_id: int = None) -> None:
+    """After a rolled-back write, turn a slot overlap constraint violation into the conflict response."""
+    dim = conflict_dimension(error)
+    if dim is None:
+        return
+    found = find_conflicting_slots(db, data, exclude_slot_id) or {dim: []}
+    raise HTTPException(400, {"message": "Scheduling conflict", "conflicts": build_conflicts(found)})
+
+
+MAX_FACULTY_LOAD_WEEKS = 53
+
+SLOT_MINUTES = (func.extract("epoch", TimetableSlot.end_time) - func.extract("epoch", TimetableSlot.start_time)) / 60
+
+
+def slot_minutes(slot) -> int:
+    return (slot.end_time.hour * 60 + slot.end_time.minute) - (slot.start_time.hour * 60 + slot.start_time.minute)
+
+
+def week_start(day: date) -> date:
+    """Monday of the ISO week containing `day`."""
+    return day - timedelta(days=day.weekday())
+
+
+def faculty_week_minutes(db: Session, faculty_id: int, day: date, exclude_slot_id: int = None) -> int:
+    monday = week_start(day)
+    query = db.query(func.coalesce(func.sum(SLOT_MINUTES), 0)).filter(
+        TimetableSlot.faculty_id == faculty_id,
         TimetableSlot.is_active == True,
-        exclude_slot_id is None or TimetableSlot.id != exclude_slot_id
-    ).first()
-    if faculty_conflict:
-        conflicts.append({"type": "faculty", "message": "Faculty already has a class at this time"})
-    
-    if data.room_id:
-        room_conflict = db.query(TimetableSlot).filter(
-            TimetableSlot.room_id == data.room_id,
-            TimetableSlot.date == data.date,
-            TimetableSlot.start_time < data.end_time,
-            TimetableSlot.end_time > data.start_time,
-            TimetableSlot.is_active == True,
-            exclude_slot_id is None or TimetableSlot.id != exclude_slot_id
-        ).first()
-        if room_conflict:
-            conflicts.append({"type": "room", "message": "Room is already occupied at this time"})
-    
-    if data.section_id:
-        section_conflict = db.query(TimetableSlot).filter(
-            TimetableSlot.section_id == data.section_id,
-            TimetableSlot.date == data.date,
-            TimetableSlot.start_time < data.end_time,
-            TimetableSlot.end_time > data.start_time,
-            TimetableSlot.is_active == True,
-            exclude_slot_id is None or TimetableSlot.id != exclude_slot_id
-        ).first()
-        if section_conflict:
-            conflicts.append({"type": "section", "message": "Section already has a class at this time"})
-    
-    if data.batch_id:
-        batch_conflict = db.query(TimetableSlot).filter(
-            TimetableSlot.batch_id == data.batch_id,
-            TimetableSlot.date == data.date,
-            TimetableSlot.start_time < data.end_time,
-            TimetableSlot.end_time > data.start_time,
-            TimetableSlot.is_active == True,
-            exclude_slot_id is None or TimetableSlot.id != exclude_slot_id
-        ).first()
-        if batch_conflict:
-            conflicts.append({"type": "batch", "message": "Batch already has a class at this time"})
-    
-    return conflicts
+        TimetableSlot.date >= monday,
+        TimetableSlot.date <= monday + timedelta(days=6)
+    )
+    if exclude_slot_id:
+        query = query.filter(TimetableSlot.id != exclude_slot_id)
+    recurring = load_occurrences(db, monday, monday + timedelta(days=6), {"faculty": {faculty_id}})
+    return int(query.scalar()) + sum(slot_minutes(occurrence) for occurrence in recurring)
+
+
+def max_hours_message(max_weekly_hours: int) -> str:
+    return f"Faculty would exceed max weekly hours ({max_weekly_hours}h)"
 
 
-def check_faculty_hours(db: Session, faculty_id: int, new_slot_hours: float) -> tuple[bool, str]:
+def check_faculty_hours(db: Session, faculty_id: int, slot_date: date, new_slot_hours: float, exclude_slot_id: int = None) -> tuple[bool, str]:
     faculty = db.query(Faculty).filter(Faculty.id == faculty_id).first()
     if not faculty:
         return False, "Faculty not found"
+    if faculty.max_weekly_hours is None:
+        return True, "OK"
     
-    from datetime import time
-    from sqlalchemy import extract
-    
-    slots = db.query(TimetableSlot).filter(
-        TimetableSlot.faculty_id == faculty_id,
-        TimetableSlot.is_active == True
-    ).all()
-    
-    total_minutes = sum(
-        (slot.end_time.hour * 60 + slot.end_time.minute) - 
-        (slot.start_time.hour * 60 + slot.start_time.minute)
-        for slot in slots
-    )
+    total_minutes = faculty_week_minutes(db, faculty_id, slot_date, exclude_slot_id)
     
     if total_minutes + (new_slot_hours * 60) > faculty.max_weekly_hours * 60:
-        return False, f"Faculty would exceed max weekly hours ({faculty.max_weekly_hours}h)"
+        return False, max_hours_message(faculty.max_weekly_hours)
     
     return True, "OK"
 
 
+def validate_faculty_hours(db: Session, data, exclude_slot_id: int = None) -> None:
+    ok, message = check_faculty_hours(db, data.faculty_id, data.date, slot_minutes(data) / 60, exclude_slot_id)
+    if not ok:
+        raise HTTPException(400, message)
+
+
+class FacultyWeekLoads:
+    """Weekly minutes of the faculties in a batch of slots, for the weeks it touches; updated as rows are accepted."""
+    
+    def __init__(self, limits: dict, minutes: dict):
+        self.limits = limits
+        self.minutes = minutes
+    
+    @classmethod
+    def load(cls, db: Session, slots) -> "FacultyWeekLoads":
+        if not slots:
+            return cls({}, {})
+        faculty_ids = {data.faculty_id for data in slots}
+        first = week_start(min(data.date for data in slots))
+        last = week_start(max(data.date for data in slots)) + timedelta(days=6)
+        limits = dict(db.query(Faculty.id, Faculty.max_weekly_hours).filter(Faculty.id.in_(sorted(faculty_ids))).all())
+        
+        minutes = {}
+        rows = db.query(TimetableSlot.faculty_id, TimetableSlot.date, func.sum(SLOT_MINUTES).label("minutes")).filter(
+            TimetableSlot.faculty_id.in_(sorted(faculty_ids)),
+            TimetableSlot.is_active == True,
+            TimetableSlot.date >= first,
+            TimetableSlot.date <= last
+        ).group_by(TimetableSlot.faculty_id, TimetableSlot.date)
+        for row in rows:
+            key = (row.faculty_id, week_start(row.date))
+            minutes[key] = minutes.get(key, 0) + int(row.minutes)
+        for occurrence in load_occurrences(db, first, last, {"faculty": faculty_ids}):
+            key = (occurrence.faculty_id, week_start(occurrence.date))
+            minutes[key] = minutes.get(key, 0) + slot_minutes(occurrence)
+        return cls(limits, minutes)
+    
+    def exceeded(self, data) -> Optional[str]:
+        """The error for `data` if it would take its faculty over the weekly limit, else None."""
+        limit = self.limits.get(data.faculty_id)
+        if limit is None:
+            return None
+        if self.minutes.get((data.faculty_id, week_start(data.date)), 0) + slot_minutes(data) > limit * 60:
+            return max_hours_message(limit)
+        return None
+    
+    def add(self, data) -> None:
+        key = (data.faculty_id, week_start(data.date))
+        self.minutes[key] = self.minutes.get(key, 0) + slot_minutes(data)
+
+
 # =========================
 # HEALTH CHECK
 # =========================
@@ -212,20 +294,32 @@ def health_check():
 # AUTH
 # =========================
 @app.post("/login", response_model=TokenResponse)
-def login(data: LoginRequest, db: Session = Depends(get_db)):
-    from auth import verify_password
-    user = db.query(User).filter(User.username == data.username).first()
-    if not user or not verify_password(data.password, user.password):
+async def login(data: LoginRequest, db: Session = Depends(get_db)):
+    from auth import verify_and_update_password, hashing_pool
+    user = await run_in_threadpool(
+        lambda: db.query(User).filter(User.username == data.username).first()
+    )
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    verified, new_hash = await verify_and_update_password(data.password, user.password)
+    if not verified:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     if not user.is_active:
         raise HTTPException(status_code=403, detail="User is deactivated")
     
-    from auth import create_access_token
-    token = create_access_token({
+    # Read before the commit below expires `user`, which would reload it on the event loop
+    claims = {
         "user_id": user.id,
         "organisation_id": user.organisation_id,
         "role": user.role.value if hasattr(user.role, 'value') else user.role
-    })
+    }
+    if new_hash:
+        user.password = new_hash
+        await run_in_threadpool(db.commit)
+        hashing_pool.record_rehash()
+    
+    from auth import create_access_token
+    token = create_access_token(claims)
     return {"access_token": token, "token_type": "bearer"}
 
 
@@ -263,43 +357,54 @@ def get_organisation(org_id: int, db: Session = Depends(get_db)):
 # USER MANAGEMENT
 # =========================
 @app.post("/users", status_code=201)
-def create_user(data: UserCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+async def create_user(data: UserCreate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
     if current_user.role.value != "super_admin":
         raise HTTPException(403, "Only super admin can create users")
     
-    existing = db.query(User).filter(User.username == data.username).first()
+    existing = await run_in_threadpool(
+        lambda: db.query(User.id).filter(User.username == data.username).first()
+    )
     if existing:
         raise HTTPException(400, "Username already exists")
     
-    from auth import hash_password
-    user = User(
-        username=data.username,
-        password=hash_password(data.password),
-        email=data.email,
-        role=UserRole(data.role),
-        faculty_id=data.faculty_id,
-        organisation_id=data.organisation_id
-    )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return {"id": user.id, "username": user.username, "role": user.role.value}
+    from auth import hash_password_async
+    password = await hash_password_async(data.password)
+    
+    def save():
+        user = User(
+            username=data.username,
+            password=password,
+            email=data.email,
+            role=UserRole(data.role),
+            faculty_id=data.faculty_id,
+            organisation_id=data.organisation_id
+        )
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return {"id": user.id, "username": user.username, "role": user.role.value}
+    
+    return await run_in_threadpool(save)
 
 
 @app.post("/users/change-password", status_code=200)
-def change_password(
+async def change_password(
     current_password: str,
     new_password: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
-    from auth import verify_password, hash_password
+    from auth import verify_password_async, hash_password_async
     
-    if not verify_password(current_password, current_user.password):
+    user = await run_in_threadpool(
+        lambda: db.query(User).filter(User.id == current_user.id).first()
+    )
+    if not await verify_password_async(current_password, user.password):
         raise HTTPException(400, "Current password is incorrect")
     
-    current_user.password = hash_password(new_password)
-    db.commit()
+    user.password = await hash_password_async(new_password)
+    await run_in_threadpool(db.commit)
+    invalidate_principal(current_user.id)
     return {"message": "Password changed successfully"}
 
 
@@ -307,7 +412,7 @@ def change_password(
 # SUPER ADMIN
 # =========================
 @app.post("/super-admin/organisations", response_model=OrganisationResponse, status_code=201)
-def super_admin_create_organisation(data: OrganisationCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_super_admin)):
+def super_admin_create_organisation(data: OrganisationCreate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_super_admin)):
     existing = db.query(Organisation).filter(Organisation.name == data.name).first()
     if existing:
         raise HTTPException(400, "Organisation already exists")
@@ -321,12 +426,12 @@ def super_admin_create_organisation(data: OrganisationCreate, db: Session = Depe
 
 
 @app.get("/super-admin/organisations", response_model=list[OrganisationResponse])
-def super_admin_list_organisations(db: Session = Depends(get_db), current_user: User = Depends(get_current_super_admin)):
+def super_admin_list_organisations(db: Session = Depends(get_db), current_user: Principal = Depends(get_current_super_admin)):
     return db.query(Organisation).filter(Organisation.is_active == True).all()
 
 
 @app.get("/super-admin/organisations/{org_id}", response_model=OrganisationResponse)
-def super_admin_get_organisation(org_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_super_admin)):
+def super_admin_get_organisation(org_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_super_admin)):
     org = db.query(Organisation).filter(Organisation.id == org_id).first()
     if not org:
         raise HTTPException(404, "Organisation not found")
@@ -334,18 +439,21 @@ def super_admin_get_organisation(org_id: int, db: Session = Depends(get_db), cur
 
 
 @app.post("/super-admin/organisations/{org_id}/admin", status_code=201)
-def super_admin_create_admin(
+async def super_admin_create_admin(
     org_id: int,
     username: str,
     email: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_super_admin)
+    current_user: Principal = Depends(get_current_super_admin)
 ):
-    org = db.query(Organisation).filter(Organisation.id == org_id).first()
+    def lookup():
+        org = db.query(Organisation.name).filter(Organisation.id == org_id).first()
+        existing = db.query(User.id).filter(User.username == username).first()
+        return org, existing
+    
+    org, existing = await run_in_threadpool(lookup)
     if not org:
         raise HTTPException(404, "Organisation not found")
-    
-    existing = db.query(User).filter(User.username == username).first()
     if existing:
         raise HTTPException(400, "Username already exists")
     
@@ -353,69 +461,144 @@ def super_admin_create_admin(
     import string
     generated_password = ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(12))
     
-    from auth import hash_password
-    user = User(
-        username=username,
-        password=hash_password(generated_password),
-        email=email,
-        role=UserRole.ADMIN,
-        organisation_id=org_id
-    )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    from auth import hash_password_async
+    password = await hash_password_async(generated_password)
     
-    return {
-        "id": user.id,
-        "username": user.username,
-        "email": user.email,
-        "role": user.role.value,
-        "organisation_id": user.organisation_id,
-        "organisation_name": org.name,
-        "password": generated_password,
-        "message": "Save this password! It will not be shown again."
-    }
-
-
-@app.get("/super-admin/users", status_code=200)
-def super_admin_list_users(db: Session = Depends(get_db), current_user: User = Depends(get_current_super_admin)):
-    users = db.query(User).filter(User.is_active == True).all()
-    result = []
-    for user in users:
-        org = db.query(Organisation).filter(Organisation.id == user.organisation_id).first() if user.organisation_id else None
-        result.append({
+    def save():
+        user = User(
+            username=username,
+            password=password,
+            email=email,
+            role=UserRole.ADMIN,
+            organisation_id=org_id
+        )
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return {
             "id": user.id,
             "username": user.username,
             "email": user.email,
             "role": user.role.value,
             "organisation_id": user.organisation_id,
-            "organisation_name": org.name if org else "System"
-        })
-    return result
+            "organisation_name": org.name,
+            "password": generated_password,
+            "message": "Save this password! It will not be shown again."
+        }
+    
+    return await run_in_threadpool(save)
+
+
+@app.get("/super-admin/users", status_code=200)
+def super_admin_list_users(
+    response: Response,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_super_admin)
+):
+    active_users = db.query(User).filter(User.is_active == True)
+    response.headers["X-Total-Count"] = str(active_users.count())
+    
+    rows = db.query(
+        User.id, User.username, User.email, User.role, User.organisation_id,
+        Organisation.name.label("organisation_name")
+    ).outerjoin(
+        Organisation, Organisation.id == User.organisation_id
+    ).filter(
+        User.is_active == True
+    ).order_by(User.id).offset(offset).limit(limit).all()
+    
+    return [
+        {
+            "id": row.id,
+            "username": row.username,
+            "email": row.email,
+            "role": row.role.value,
+            "organisation_id": row.organisation_id,
+            "organisation_name": row.organisation_name or "System"
+        }
+        for row in rows
+    ]
+
+
+@app.delete("/super-admin/users/{user_id}", status_code=200)
+def super_admin_deactivate_user(user_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_super_admin)):
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(404, "User not found")
+    if user.id == current_user.id:
+        raise HTTPException(400, "You cannot deactivate your own account")
+    
+    user.is_active = False
+    db.commit()
+    invalidate_principal(user.id)
+    return {"message": "User deactivated"}
+
+
+@app.get("/super-admin/metrics/hashing", status_code=200)
+def super_admin_hashing_metrics(current_user: Principal = Depends(get_current_super_admin)):
+    from auth import hashing_pool
+    return hashing_pool.metrics()
+
+
+@app.get("/super-admin/metrics/db-pool", status_code=200)
+def super_admin_db_pool_metrics(current_user: Principal = Depends(get_current_super_admin)):
+    return {**pool_status(engine), **replica_router.status()}
+
+
+@app.get("/super-admin/metrics/requests", status_code=200)
+def super_admin_request_metrics(reset: bool = False, current_user: Principal = Depends(get_current_super_admin)):
+    routes = request_metrics.snapshot()
+    if reset:
+        request_metrics.reset()
+    return {"routes": routes}
 
 
 @app.get("/super-admin/stats", status_code=200)
-def super_admin_get_stats(db: Session = Depends(get_db), current_user: User = Depends(get_current_super_admin)):
-    total_orgs = db.query(Organisation).filter(Organisation.is_active == True).count()
-    total_users = db.query(User).filter(User.is_active == True).count()
-    total_admins = db.query(User).filter(User.role == UserRole.ADMIN, User.is_active == True).count()
-    
-    org_stats = []
-    orgs = db.query(Organisation).filter(Organisation.is_active == True).all()
-    for org in orgs:
-        user_count = db.query(User).filter(User.organisation_id == org.id, User.is_active == True).count()
-        dept_count = db.query(Department).filter(Department.organisation_id == org.id, Department.is_active == True).count()
-        course_count = db.query(Course).join(Department).filter(Department.organisation_id == org.id, Course.is_active == True).count()
-        org_stats.append({
-            "organisation_id": org.id,
-            "organisation_name": org.name,
+def super_admin_get_stats(db: Session = Depends(get_db), current_user: Principal = Depends(get_current_super_admin)):
+    total_users, total_admins = db.query(
+        func.count(User.id),
+        func.count(User.id).filter(User.role == UserRole.ADMIN)
+    ).filter(User.is_active == True).one()
+    
+    users = db.query(
+        User.organisation_id, func.count(User.id).label("count")
+    ).filter(User.is_active == True).group_by(User.organisation_id).subquery()
+    
+    depts = db.query(
+        Department.organisation_id, func.count(Department.id).label("count")
+    ).filter(Department.is_active == True).group_by(Department.organisation_id).subquery()
+    
+    courses = db.query(
+        Department.organisation_id, func.count(Course.id).label("count")
+    ).join(Course, Course.department_id == Department.id).filter(
+        Course.is_active == True
+    ).group_by(Department.organisation_id).subquery()
+    
+    orgs = db.query(
+        Organisation.id, Organisation.name,
+        func.coalesce(users.c.count, 0),
+        func.coalesce(depts.c.count, 0),
+        func.coalesce(courses.c.count, 0)
+    ).outerjoin(users, users.c.organisation_id == Organisation.id
+    ).outerjoin(depts, depts.c.organisation_id == Organisation.id
+    ).outerjoin(courses, courses.c.organisation_id == Organisation.id
+    ).filter(Organisation.is_active == True).order_by(Organisation.id).all()
+    
+    org_stats = [
+        {
+            "organisation_id": org_id,
+            "organisation_name": name,
             "users": user_count,
             "departments": dept_count,
             "courses": course_count
-        })
+        }
+        for org_id, name, user_count, dept_count, course_count in orgs
+    ]
     
     return {
-        "total_organisations": total_orgs,
+        "total_organisations": len(org_stats),
         "total_users": total_users,
         "total_admins": total_admins,
         "organisations": org_stats
@@ -430,7 +613,7 @@ def super_admin_get_stats(db: Session = Depends(get_db), current_user: User = De
 def create_department(
     data: DepartmentCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ):
     dept = Department(
         name=data.name,
@@ -460,7 +643,7 @@ def create_department(
 @app.get("/departments", response_model=list[DepartmentResponse])
 def list_departments(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ):
     return db.query(Department).filter(
         Department.organisation_id == current_user.organisation_id,
@@ -472,7 +655,7 @@ def list_departments(
 def get_department(
     dept_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ):
     dept = db.query(Department).filter(
         Department.id == dept_id,
@@ -490,7 +673,7 @@ def update_department(
     dept_id: int,
     data: DepartmentUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ):
     dept = db.query(Department).filter(
         Department.id == dept_id,
@@ -525,7 +708,7 @@ def update_department(
 def delete_department(
     dept_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ):
     dept = db.query(Department).filter(
         Department.id == dept_id,
@@ -545,7 +728,7 @@ def delete_department(
 # COURSE
 # =========================
 @app.post("/courses", response_model=CourseResponse, status_code=201)
-def create_course(data: CourseCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+def create_course(data: CourseCreate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
     dept = db.query(Department).filter(
         Department.id == data.department_id,
         Department.organisation_id == current_user.organisation_id
@@ -575,7 +758,7 @@ def create_course(data: CourseCreate, db: Session = Depends(get_db), current_use
 
 
 @app.get("/courses", response_model=list[CourseResponse])
-def list_courses(department_id: int = None, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+def list_courses(department_id: int = None, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
     query = db.query(Course).join(Department).filter(
         Department.organisation_id == current_user.organisation_id,
         Course.is_active == True
@@ -586,7 +769,7 @@ def list_courses(department_id: int = None, db: Session = Depends(get_db), curre
 
 
 @app.get("/courses/{course_id}", response_model=CourseResponse)
-def get_course(course_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+def get_course(course_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
     course = db.query(Course).join(Department).filter(
         Course.id == course_id,
         Department.organisation_id == current_user.organisation_id
@@ -597,7 +780,7 @@ def get_course(course_id: int, db: Session = Depends(get_db), current_user: User
 
 
 @app.put("/courses/{course_id}", response_model=CourseResponse)
-def update_course(course_id: int, data: CourseUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+def update_course(course_id: int, data: CourseUpdate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
     course = db.query(Course).join(Department).filter(
         Course.id == course_id,
         Department.organisation_id == current_user.organisation_id
@@ -616,7 +799,7 @@ def update_course(course_id: int, data: CourseUpdate, db: Session = Depends(get_
 
 
 @app.delete("/courses/{course_id}")
-def delete_course(course_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+def delete_course(course_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
     course = db.query(Course).join(Department).filter(
         Course.id == course_id,
         Department.organisation_id == current_user.organisation_id
@@ -632,7 +815,7 @@ def delete_course(course_id: int, db: Session = Depends(get_db), current_user: U
 # ACADEMIC TERMS
 # =========================
 @app.post("/courses/{course_id}/terms", response_model=AcademicTermResponse, status_code=201)
-def create_term(course_id: int, data: AcademicTermCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+def create_term(course_id: int, data: AcademicTermCreate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
     course = db.query(Course).join(Department).filter(
         Course.id == course_id,
         Department.organisation_id == current_user.organisation_id
@@ -667,7 +850,7 @@ def create_term(course_id: int, data: AcademicTermCreate, db: Session = Depends(
 
 
 @app.get("/courses/{course_id}/terms", response_model=list[AcademicTermResponse])
-def list_terms(course_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+def list_terms(course_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
     course = db.query(Course).join(Department).filter(
         Course.id == course_id,
         Department.organisation_id == current_user.organisation_id
@@ -681,16 +864,26 @@ def list_terms(course_id: int, db: Session = Depends(get_db), current_user: User
     ).order_by(AcademicTerm.term_number).all()
 
 
+async def read_term_exists(db, term_id: int, organisation_id: int) -> bool:
+    term = await db.scalar(select(AcademicTerm.id).join(Course).join(Department).where(
+        AcademicTerm.id == term_id,
+        Department.organisation_id == organisation_id
+    ))
+    return term is not None
+
+
 @app.get("/terms", response_model=list[AcademicTermResponse])
-def list_all_terms(db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
-    return db.query(AcademicTerm).join(Course).join(Department).filter(
-        Department.organisation_id == current_user.organisation_id,
-        AcademicTerm.is_active == True
-    ).order_by(AcademicTerm.term_number).all()
+async def list_all_terms(db=Depends(get_read_db), current_user: Principal = Depends(get_current_admin)):
+    return (await db.scalars(
+        select(AcademicTerm).join(Course).join(Department).where(
+            Department.organisation_id == current_user.organisation_id,
+            AcademicTerm.is_active == True
+        ).order_by(AcademicTerm.term_number)
+    )).all()
 
 
 @app.get("/terms/{term_id}", response_model=AcademicTermResponse)
-def get_term(term_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+def get_term(term_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
     term = db.query(AcademicTerm).join(Course).join(Department).filter(
         AcademicTerm.id == term_id,
         Department.organisation_id == current_user.organisation_id
@@ -701,7 +894,7 @@ def get_term(term_id: int, db: Session = Depends(get_db), current_user: User = D
 
 
 @app.put("/terms/{term_id}", response_model=AcademicTermResponse)
-def update_term(term_id: int, data: AcademicTermUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+def update_term(term_id: int, data: AcademicTermUpdate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
     term = db.query(AcademicTerm).join(Course).join(Department).filter(
         AcademicTerm.id == term_id,
         Department.organisation_id == current_user.organisation_id
@@ -718,7 +911,7 @@ def update_term(term_id: int, data: AcademicTermUpdate, db: Session = Depends(ge
 
 
 @app.delete("/terms/{term_id}")
-def delete_term(term_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+def delete_term(term_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
     term = db.query(AcademicTerm).join(Course).join(Department).filter(
         AcademicTerm.id == term_id,
         Department.organisation_id == current_user.organisation_id
@@ -747,7 +940,7 @@ def create_subject(
     term_id: int,
     data: SubjectCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ):
     term = db.query(AcademicTerm).join(Course).join(Department).filter(
         AcademicTerm.id == term_id,
@@ -785,23 +978,20 @@ def create_subject(
 
 
 @app.get("/terms/{term_id}/subjects", response_model=list[SubjectResponse])
-def list_subjects(
+async def list_subjects(
     term_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    db=Depends(get_read_db),
+    current_user: Principal = Depends(get_current_admin)
 ):
-    term = db.query(AcademicTerm).join(Course).join(Department).filter(
-        AcademicTerm.id == term_id,
-        Department.organisation_id == current_user.organisation_id
-    ).first()
-
-    if not term:
+    if not await read_term_exists(db, term_id, current_user.organisation_id):
         raise HTTPException(404, "Term not found")
 
-    subjects = db.query(Subject).filter(
-        Subject.academic_term_id == term_id,
-        Subject.is_active == True
-    ).all()
+    subjects = (await db.scalars(
+        select(Subject).where(
+            Subject.academic_term_id == term_id,
+            Subject.is_active == True
+        )
+    )).all()
 
     # ✅ Safety fix for old NULL data (prevents crash)
     for s in subjects:
@@ -815,7 +1005,7 @@ def list_subjects(
 def get_subject(
     subject_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ):
     subject = db.query(Subject).join(AcademicTerm).join(Course).join(Department).filter(
         Subject.id == subject_id,
@@ -837,7 +1027,7 @@ def update_subject(
     subject_id: int,
     data: SubjectUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ):
     subject = db.query(Subject).join(AcademicTerm).join(Course).join(Department).filter(
         Subject.id == subject_id,
@@ -856,8 +1046,9 @@ def update_subject(
             value = value or subject.code
 
         setattr(subject, key, value)
-
+    bump_versions_where(db, "subject_id", subject.id)
     db.commit()
+    timetable_cache.clear()
     db.refresh(subject)
 
     return subject
@@ -867,7 +1058,7 @@ def update_subject(
 def delete_subject(
     subject_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ):
     subject = db.query(Subject).join(AcademicTerm).join(Course).join(Department).filter(
         Subject.id == subject_id,
@@ -895,7 +1086,7 @@ def delete_subject(
 # SECTIONS
 # =========================
 @app.post("/terms/{term_id}/sections", response_model=SectionResponse, status_code=201)
-def create_section(term_id: int, data: SectionCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+def create_section(term_id: int, data: SectionCreate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
     term = db.query(AcademicTerm).join(Course).join(Department).filter(
         AcademicTerm.id == term_id,
         Department.organisation_id == current_user.organisation_id
@@ -915,22 +1106,20 @@ def create_section(term_id: int, data: SectionCreate, db: Session = Depends(get_
 
 
 @app.get("/terms/{term_id}/sections", response_model=list[SectionResponse])
-def list_sections(term_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
-    term = db.query(AcademicTerm).join(Course).join(Department).filter(
-        AcademicTerm.id == term_id,
-        Department.organisation_id == current_user.organisation_id
-    ).first()
-    if not term:
+async def list_sections(term_id: int, db=Depends(get_read_db), current_user: Principal = Depends(get_current_admin)):
+    if not await read_term_exists(db, term_id, current_user.organisation_id):
         raise HTTPException(404, "Term not found")
     
-    return db.query(Section).filter(
-        Section.academic_term_id == term_id,
-        Section.is_active == True
-    ).all()
+    return (await db.scalars(
+        select(Section).where(
+            Section.academic_term_id == term_id,
+            Section.is_active == True
+        )
+    )).all()
 
 
 @app.put("/sections/{section_id}", response_model=SectionResponse)
-def update_section(section_id: int, data: SectionUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+def update_section(section_id: int, data: SectionUpdate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
     section = db.query(Section).join(AcademicTerm).join(Course).join(Department).filter(
         Section.id == section_id,
         Department.organisation_id == current_user.organisation_id
@@ -941,13 +1130,15 @@ def update_section(section_id: int, data: SectionUpdate, db: Session = Depends(g
     for key, value in data.model_dump(exclude_unset=True).items():
         setattr(section, key, value)
     
+    bump_versions_where(db, "section_id", section.id)
     db.commit()
+    timetable_cache.clear()
     db.refresh(section)
     return section
 
 
 @app.delete("/sections/{section_id}")
-def delete_section(section_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+def delete_section(section_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
     section = db.query(Section).join(AcademicTerm).join(Course).join(Department).filter(
         Section.id == section_id,
         Department.organisation_id == current_user.organisation_id
@@ -964,7 +1155,7 @@ def delete_section(section_id: int, db: Session = Depends(get_db), current_user:
 # BATCHES
 # =========================
 @app.post("/terms/{term_id}/batches", response_model=BatchResponse, status_code=201)
-def create_batch(term_id: int, data: BatchCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+def create_batch(term_id: int, data: BatchCreate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
     term = db.query(AcademicTerm).join(Course).join(Department).filter(
         AcademicTerm.id == term_id,
         Department.organisation_id == current_user.organisation_id
@@ -996,22 +1187,20 @@ def create_batch(term_id: int, data: BatchCreate, db: Session = Depends(get_db),
 
 
 @app.get("/terms/{term_id}/batches", response_model=list[BatchResponse])
-def list_batches(term_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
-    term = db.query(AcademicTerm).join(Course).join(Department).filter(
-        AcademicTerm.id == term_id,
-        Department.organisation_id == current_user.organisation_id
-    ).first()
-    if not term:
+async def list_batches(term_id: int, db=Depends(get_read_db), current_user: Principal = Depends(get_current_admin)):
+    if not await read_term_exists(db, term_id, current_user.organisation_id):
         raise HTTPException(404, "Term not found")
     
-    return db.query(Batch).filter(
-        Batch.academic_term_id == term_id,
-        Batch.is_active == True
-    ).all()
+    return (await db.scalars(
+        select(Batch).where(
+            Batch.academic_term_id == term_id,
+            Batch.is_active == True
+        )
+    )).all()
 
 
 @app.put("/batches/{batch_id}", response_model=BatchResponse)
-def update_batch(batch_id: int, data: BatchUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+def update_batch(batch_id: int, data: BatchUpdate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
     batch = db.query(Batch).join(AcademicTerm).join(Course).join(Department).filter(
         Batch.id == batch_id,
         Department.organisation_id == current_user.organisation_id
@@ -1022,13 +1211,15 @@ def update_batch(batch_id: int, data: BatchUpdate, db: Session = Depends(get_db)
     for key, value in data.model_dump(exclude_unset=True).items():
         setattr(batch, key, value)
     
+    bump_versions_where(db, "batch_id", batch.id)
     db.commit()
+    timetable_cache.clear()
     db.refresh(batch)
     return batch
 
 
 @app.delete("/batches/{batch_id}")
-def delete_batch(batch_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+def delete_batch(batch_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
     batch = db.query(Batch).join(AcademicTerm).join(Course).join(Department).filter(
         Batch.id == batch_id,
         Department.organisation_id == current_user.organisation_id
@@ -1045,7 +1236,7 @@ def delete_batch(batch_id: int, db: Session = Depends(get_db), current_user: Use
 # FACULTY
 # =========================
 @app.post("/faculties", response_model=FacultyResponse, status_code=201)
-def create_faculty(data: FacultyCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+def create_faculty(data: FacultyCreate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
     dept = db.query(Department).filter(
         Department.id == data.department_id,
         Department.organisation_id == current_user.organisation_id
@@ -1078,18 +1269,18 @@ def create_faculty(data: FacultyCreate, db: Session = Depends(get_db), current_u
 
 
 @app.get("/faculties", response_model=list[FacultyResponse])
-def list_faculties(department_id: int = None, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
-    query = db.query(Faculty).join(Department).filter(
+async def list_faculties(department_id: int = None, db=Depends(get_read_db), current_user: Principal = Depends(get_current_admin)):
+    query = select(Faculty).join(Department).where(
         Department.organisation_id == current_user.organisation_id,
         Faculty.is_active == True
     )
     if department_id:
-        query = query.filter(Faculty.department_id == department_id)
-    return query.all()
+        query = query.where(Faculty.department_id == department_id)
+    return (await db.scalars(query)).all()
 
 
 @app.get("/faculties/{faculty_id}", response_model=FacultyResponse)
-def get_faculty(faculty_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+def get_faculty(faculty_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
     faculty = db.query(Faculty).join(Department).filter(
         Faculty.id == faculty_id,
         Department.organisation_id == current_user.organisation_id
@@ -1099,8 +1290,70 @@ def get_faculty(faculty_id: int, db: Session = Depends(get_db), current_user: Us
     return faculty
 
 
+@app.get("/faculties/{faculty_id}/load", response_model=FacultyLoadResponse)
+async def get_faculty_load(
+    faculty_id: int,
+    from_date: date = Query(..., alias="from"),
+    to_date: date = Query(..., alias="to"),
+    db=Depends(get_read_db),
+    current_user: Principal = Depends(get_current_admin)
+):
+    faculty = (await db.execute(
+        select(Faculty.id, Faculty.max_weekly_hours).join(Department).where(
+            Faculty.id == faculty_id,
+            Department.organisation_id == current_user.organisation_id
+        )
+    )).first()
+    if not faculty:
+        raise HTTPException(404, "Faculty not found")
+    if to_date < from_date:
+        raise HTTPException(400, "to must be on or after from")
+    
+    first_week = week_start(from_date)
+    last_week = week_start(to_date)
+    if (last_week - first_week).days // 7 >= MAX_FACULTY_LOAD_WEEKS:
+        raise HTTPException(400, f"Date range cannot exceed {MAX_FACULTY_LOAD_WEEKS} weeks")
+    
+    rows = (await db.execute(
+        select(TimetableSlot.date, func.sum(SLOT_MINUTES).label("minutes")).where(
+            TimetableSlot.faculty_id == faculty_id,
+            TimetableSlot.is_active == True,
+            TimetableSlot.date >= first_week,
+            TimetableSlot.date <= last_week + timedelta(days=6)
+        ).group_by(TimetableSlot.date)
+    )).all()
+    
+    minutes_by_week = {}
+    for row in rows:
+        monday = week_start(row.date)
+        minutes_by_week[monday] = minutes_by_week.get(monday, 0) + int(row.minutes)
+    for row, day in await query_recurring_occurrences(
+        db, RecurringSlot.faculty_id == faculty_id, from_date=first_week, to_date=last_week + timedelta(days=6)
+    ):
+        monday = week_start(day)
+        minutes_by_week[monday] = minutes_by_week.get(monday, 0) + slot_minutes(row)
+    
+    limit_minutes = faculty.max_weekly_hours * 60 if faculty.max_weekly_hours is not None else None
+    weeks = []
+    monday = first_week
+    while monday <= last_week:
+        minutes = minutes_by_week.get(monday, 0)
+        iso_year, iso_week, _ = monday.isocalendar()
+        weeks.append({
+            "week_start": monday,
+            "iso_year": iso_year,
+            "iso_week": iso_week,
+            "minutes": minutes,
+            "hours": round(minutes / 60, 2),
+            "over_limit": limit_minutes is not None and minutes > limit_minutes
+        })
+        monday += timedelta(days=7)
+    
+    return {"faculty_id": faculty.id, "max_weekly_hours": faculty.max_weekly_hours, "weeks": weeks}
+
+
 @app.put("/faculties/{faculty_id}", response_model=FacultyResponse)
-def update_faculty(faculty_id: int, data: FacultyUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+def update_faculty(faculty_id: int, data: FacultyUpdate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
     faculty = db.query(Faculty).join(Department).filter(
         Faculty.id == faculty_id,
         Department.organisation_id == current_user.organisation_id
@@ -1111,13 +1364,15 @@ def update_faculty(faculty_id: int, data: FacultyUpdate, db: Session = Depends(g
     for key, value in data.model_dump(exclude_unset=True).items():
         setattr(faculty, key, value)
     
+    bump_versions_where(db, "faculty_id", faculty.id)
     db.commit()
+    timetable_cache.clear()
     db.refresh(faculty)
     return faculty
 
 
 @app.delete("/faculties/{faculty_id}")
-def delete_faculty(faculty_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+def delete_faculty(faculty_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
     faculty = db.query(Faculty).join(Department).filter(
         Faculty.id == faculty_id,
         Department.organisation_id == current_user.organisation_id
@@ -1134,7 +1389,7 @@ def delete_faculty(faculty_id: int, db: Session = Depends(get_db), current_user:
 # FACULTY ASSIGNMENTS
 # =========================
 @app.post("/faculty-assignments", response_model=FacultyAssignmentResponse, status_code=201)
-def create_faculty_assignment(data: FacultyAssignmentCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+def create_faculty_assignment(data: FacultyAssignmentCreate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
     faculty = db.query(Faculty).join(Department).filter(
         Faculty.id == data.faculty_id,
         Department.organisation_id == current_user.organisation_id
@@ -1174,7 +1429,7 @@ def list_faculty_assignments(
     section_id: int = None,
     batch_id: int = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ):
     query = db.query(FacultyAssignment).join(Faculty).join(Department).join(Subject).filter(
         Department.organisation_id == current_user.organisation_id,
@@ -1194,7 +1449,7 @@ def list_faculty_assignments(
 
 
 @app.delete("/faculty-assignments/{assignment_id}")
-def delete_faculty_assignment(assignment_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+def delete_faculty_assignment(assignment_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
     assignment = db.query(FacultyAssignment).join(Faculty).join(Department).filter(
         FacultyAssignment.id == assignment_id,
         Department.organisation_id == current_user.organisation_id
@@ -1211,7 +1466,7 @@ def delete_faculty_assignment(assignment_id: int, db: Session = Depends(get_db),
 # ROOMS
 # =========================
 @app.post("/rooms", response_model=RoomResponse, status_code=201)
-def create_room(data: RoomCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+def create_room(data: RoomCreate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
     dept = db.query(Department).filter(
         Department.id == data.department_id,
         Department.organisation_id == current_user.organisation_id
@@ -1236,18 +1491,18 @@ def create_room(data: RoomCreate, db: Session = Depends(get_db), current_user: U
 
 
 @app.get("/rooms", response_model=list[RoomResponse])
-def list_rooms(department_id: int = None, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
-    query = db.query(Room).join(Department).filter(
+async def list_rooms(department_id: int = None, db=Depends(get_read_db), current_user: Principal = Depends(get_current_admin)):
+    query = select(Room).join(Department).where(
         Department.organisation_id == current_user.organisation_id,
         Room.is_active == True
     )
     if department_id:
-        query = query.filter(Room.department_id == department_id)
-    return query.all()
+        query = query.where(Room.department_id == department_id)
+    return (await db.scalars(query)).all()
 
 
 @app.put("/rooms/{room_id}", response_model=RoomResponse)
-def update_room(room_id: int, data: RoomUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+def update_room(room_id: int, data: RoomUpdate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
     room = db.query(Room).join(Department).filter(
         Room.id == room_id,
         Department.organisation_id == current_user.organisation_id
@@ -1258,13 +1513,15 @@ def update_room(room_id: int, data: RoomUpdate, db: Session = Depends(get_db), c
     for key, value in data.model_dump(exclude_unset=True).items():
         setattr(room, key, value)
     
+    bump_versions_where(db, "room_id", room.id)
     db.commit()
+    timetable_cache.clear()
     db.refresh(room)
     return room
 
 
 @app.delete("/rooms/{room_id}")
-def delete_room(room_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+def delete_room(room_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
     room = db.query(Room).join(Department).filter(
         Room.id == room_id,
         Department.organisation_id == current_user.organisation_id
@@ -1281,7 +1538,7 @@ def delete_room(room_id: int, db: Session = Depends(get_db), current_user: User
 # TIMETABLE SLOTS
 # =========================
 @app.post("/timetable/slots", response_model=TimetableSlotResponse, status_code=201)
-def create_timetable_slot(data: TimetableSlotCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+def create_timetable_slot(data: TimetableSlotCreate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
     term = db.query(AcademicTerm).join(Course).join(Department).filter(
         AcademicTerm.id == data.academic_term_id,
         Department.organisation_id == current_user.organisation_id
@@ -1291,6 +1548,7 @@ def create_timetable_slot(data: TimetableSlotCreate, db: Session = Depends(get_d
     
     validate_faculty_department_match(db, data.faculty_id, data.subject_id)
     validate_faculty_assignment_exists(db, data.faculty_id, data.subject_id, data.section_id, data.batch_id)
+    validate_faculty_hours(db, data)
     
     conflicts = check_timetable_conflicts(db, data)
     if conflicts:
@@ -1299,96 +1557,210 @@ def create_timetable_slot(data: TimetableSlotCreate, db: Session = Depends(get_d
     slot = TimetableSlot(**data.model_dump())
     db.add(slot)
     try:
+        bump_slot_versions(db, [slot])
         db.commit()
         db.refresh(slot)
-        return slot
     except IntegrityError as e:
         db.rollback()
+        raise_for_slot_conflict(db, e, data)
         raise HTTPException(400, f"Database constraint violation: {str(e.orig)}")
+    
+    track_slot_saved(slot)
+    invalidate_slots([slot])
+    return slot
 
 
-@app.get("/timetable/term/{term_id}", response_model=list[TimetableSlotWithDetails])
-def get_timetable_by_term(term_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
-    term = db.query(AcademicTerm).join(Course).join(Department).filter(
-        AcademicTerm.id == term_id,
-        Department.organisation_id == current_user.organisation_id
-    ).first()
-    if not term:
-        raise HTTPException(404, "Term not found")
-    
-    slots = db.query(TimetableSlot).filter(
-        TimetableSlot.academic_term_id == term_id,
-        TimetableSlot.is_active == True
-    ).all()
+SLOT_DETAIL_COLUMNS = (
+    TimetableSlot.id,
+    TimetableSlot.academic_term_id,
+    TimetableSlot.subject_id,
+    TimetableSlot.faculty_id,
+    TimetableSlot.section_id,
+    TimetableSlot.batch_id,
+    TimetableSlot.room_id,
+    TimetableSlot.date,
+    TimetableSlot.start_time,
+    TimetableSlot.end_time,
+    TimetableSlot.is_active,
+    TimetableSlot.modality,
+    Subject.name.label("subject_name"),
+    Faculty.name.label("faculty_name"),
+    Section.name.label("section_name"),
+    Batch.name.label("batch_name"),
+    Room.name.label("room_name"),
+)
+
+
+async def query_slot_details(db, *filters, order_by=()) -> list[dict]:
+    rows = (await db.execute(select(*SLOT_DETAIL_COLUMNS).select_from(TimetableSlot).outerjoin(
+        Subject, TimetableSlot.subject_id == Subject.id
+    ).outerjoin(
+        Faculty, TimetableSlot.faculty_id == Faculty.id
+    ).outerjoin(
+        Section, TimetableSlot.section_id == Section.id
+    ).outerjoin(
+        Batch, TimetableSlot.batch_id == Batch.id
+    ).outerjoin(
+        Room, TimetableSlot.room_id == Room.id
+    ).where(*filters).order_by(*order_by))).all()
     
     result = []
-    for slot in slots:
-        slot_dict = {
-            "id": slot.id,
-            "academic_term_id": slot.academic_term_id,
-            "subject_id": slot.subject_id,
-            "faculty_id": slot.faculty_id,
-            "section_id": slot.section_id,
-            "batch_id": slot.batch_id,
-            "room_id": slot.room_id,
-            "date": slot.date.isoformat() if slot.date else None,
-            "start_time": slot.start_time,
-            "end_time": slot.end_time,
-            "is_active": slot.is_active,
-            "modality": slot.modality,
-            "subject_name": slot.subject.name if slot.subject else None,
-            "faculty_name": slot.faculty.name if slot.faculty else None,
-            "section_name": slot.section.name if slot.section else None,
-            "batch_name": slot.batch.name if slot.batch else None,
-            "room_name": slot.room.name if slot.room else None,
-        }
+    for row in rows:
+        slot_dict = dict(row._mapping)
+        slot_dict["date"] = row.date.isoformat() if row.date else None
         result.append(slot_dict)
+    return result
+
+
+RECURRING_DETAIL_COLUMNS = (
+    RecurringSlot.id,
+    RecurringSlot.academic_term_id,
+    RecurringSlot.subject_id,
+    RecurringSlot.faculty_id,
+    RecurringSlot.section_id,
+    RecurringSlot.batch_id,
+    RecurringSlot.room_id,
+    RecurringSlot.day_of_week,
+    RecurringSlot.start_time,
+    RecurringSlot.end_time,
+    RecurringSlot.start_date,
+    RecurringSlot.end_date,
+    RecurringSlot.is_active,
+    RecurringSlot.modality,
+    Subject.name.label("subject_name"),
+    Subject.code.label("subject_code"),
+    Faculty.name.label("faculty_name"),
+    Section.name.label("section_name"),
+    Batch.name.label("batch_name"),
+    Room.name.label("room_name"),
+)
+
+
+async def query_recurring_occurrences(db, *filters, from_date: date = None, to_date: date = None) -> list[tuple]:
+    """(row, date) for each occurrence of the active recurring slots matching `filters` within the window."""
+    window = []
+    if from_date:
+        window.append(RecurringSlot.end_date >= from_date)
+    if to_date:
+        window.append(RecurringSlot.start_date <= to_date)
+    
+    rows = (await db.execute(select(*RECURRING_DETAIL_COLUMNS).select_from(RecurringSlot).outerjoin(
+        Subject, RecurringSlot.subject_id == Subject.id
+    ).outerjoin(
+        Faculty, RecurringSlot.faculty_id == Faculty.id
+    ).outerjoin(
+        Section, RecurringSlot.section_id == Section.id
+    ).outerjoin(
+        Batch, RecurringSlot.batch_id == Batch.id
+    ).outerjoin(
+        Room, RecurringSlot.room_id == Room.id
+    ).where(
+        RecurringSlot.is_active == True, *filters, *window
+    ).order_by(RecurringSlot.id))).all()
+    if not rows:
+        return []
+    
+    exceptions = {}
+    for row in (await db.execute(select(
+        RecurringSlotException.recurring_slot_id, RecurringSlotException.date
+    ).where(RecurringSlotException.recurring_slot_id.in_([row.id for row in rows])))).all():
+        exceptions.setdefault(row.recurring_slot_id, set()).add(row.date)
+    
+    return [
+        (row, occurrence.date)
+        for row in rows
+        for occurrence in expand(row, from_date, to_date, exceptions.get(row.id, ()))
+    ]
+
+
+def recurring_slot_detail(row, day: date) -> dict:
+    return {
+        "id": None,
+        "recurring_slot_id": row.id,
+        "academic_term_id": row.academic_term_id,
+        "subject_id": row.subject_id,
+        "faculty_id": row.faculty_id,
+        "section_id": row.section_id,
+        "batch_id": row.batch_id,
+        "room_id": row.room_id,
+        "date": day.isoformat(),
+        "start_time": row.start_time,
+        "end_time": row.end_time,
+        "is_active": row.is_active,
+        "modality": row.modality,
+        "subject_name": row.subject_name,
+        "faculty_name": row.faculty_name,
+        "section_name": row.section_name,
+        "batch_name": row.batch_name,
+        "room_name": row.room_name,
+    }
+
+
+@app.get("/timetable/term/{term_id}", response_model=list[TimetableSlotWithDetails])
+async def get_timetable_by_term(term_id: int, request: Request, response: Response, db=Depends(get_read_db), current_user: Principal = Depends(get_current_admin)):
+    term = (await db.execute(
+        select(AcademicTerm.id, AcademicTerm.timetable_version).join(Course).join(Department).where(
+            AcademicTerm.id == term_id,
+            Department.organisation_id == current_user.organisation_id
+        )
+    )).first()
+    if not term:
+        raise HTTPException(404, "Term not found")
     
+    cached = not_modified(request, response, make_etag("term", term_id, term.timetable_version))
+    if cached:
+        return cached
+    
+    cache_key = f"timetable:term:{term_id}:v{term.timetable_version}"
+    result = timetable_cache.get(cache_key)
+    if result is None:
+        result = await query_slot_details(
+            db,
+            TimetableSlot.academic_term_id == term_id,
+            TimetableSlot.is_active == True
+        )
+        result += [
+            recurring_slot_detail(row, day)
+            for row, day in await query_recurring_occurrences(db, RecurringSlot.academic_term_id == term_id)
+        ]
+        timetable_cache.set(cache_key, result, tags=[term_tag(term_id)])
     return result
 
 
 @app.get("/timetable/section/{section_id}", response_model=list[TimetableSlotWithDetails])
-def get_timetable_by_section(section_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
-    section = db.query(Section).join(AcademicTerm).join(Course).join(Department).filter(
-        Section.id == section_id,
-        Department.organisation_id == current_user.organisation_id
-    ).first()
+async def get_timetable_by_section(section_id: int, request: Request, response: Response, db=Depends(get_read_db), current_user: Principal = Depends(get_current_admin)):
+    section = (await db.execute(
+        select(Section.id, Section.timetable_version).join(AcademicTerm).join(Course).join(Department).where(
+            Section.id == section_id,
+            Department.organisation_id == current_user.organisation_id
+        )
+    )).first()
     if not section:
         raise HTTPException(404, "Section not found")
     
-    slots = db.query(TimetableSlot).filter(
-        TimetableSlot.section_id == section_id,
-        TimetableSlot.is_active == True
-    ).order_by(TimetableSlot.date, TimetableSlot.start_time).all()
-    
-    result = []
-    for slot in slots:
-        slot_dict = {
-            "id": slot.id,
-            "academic_term_id": slot.academic_term_id,
-            "subject_id": slot.subject_id,
-            "faculty_id": slot.faculty_id,
-            "section_id": slot.section_id,
-            "batch_id": slot.batch_id,
-            "room_id": slot.room_id,
-            "date": slot.date.isoformat() if slot.date else None,
-            "start_time": slot.start_time,
-            "end_time": slot.end_time,
-            "is_active": slot.is_active,
-            "modality": slot.modality,
-            "subject_name": slot.subject.name if slot.subject else None,
-            "faculty_name": slot.faculty.name if slot.faculty else None,
-            "section_name": slot.section.name if slot.section else None,
-            "batch_name": slot.batch.name if slot.batch else None,
-            "room_name": slot.room.name if slot.room else None,
-        }
-        result.append(slot_dict)
+    cached = not_modified(request, response, make_etag("section", section_id, section.timetable_version))
+    if cached:
+        return cached
     
+    cache_key = f"timetable:section:{section_id}:v{section.timetable_version}"
+    result = timetable_cache.get(cache_key)
+    if result is None:
+        result = await query_slot_details(
+            db,
+            TimetableSlot.section_id == section_id,
+            TimetableSlot.is_active == True,
+            order_by=(TimetableSlot.date, TimetableSlot.start_time)
+        )
+        occurrences = await query_recurring_occurrences(db, RecurringSlot.section_id == section_id)
+        if occurrences:
+            result += [recurring_slot_detail(row, day) for row, day in occurrences]
+            result.sort(key=lambda slot: (slot["date"], slot["start_time"]))
+        timetable_cache.set(cache_key, result, tags=[section_tag(section_id)])
     return result
 
 
 @app.put("/timetable/slots/{slot_id}", response_model=TimetableSlotResponse)
-def update_timetable_slot(slot_id: int, data: TimetableSlotUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+def update_timetable_slot(slot_id: int, data: TimetableSlotUpdate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
     slot = db.query(TimetableSlot).join(AcademicTerm).join(Course).join(Department).filter(
         TimetableSlot.id == slot_id,
         Department.organisation_id == current_user.organisation_id
@@ -1396,6 +1768,11 @@ def update_timetable_slot(slot_id: int, data: TimetableSlotUpdate, db: Session =
     if not slot:
         raise HTTPException(404, "Slot not found")
     
+    previous = {
+        "academic_term_id": slot.academic_term_id,
+        "section_id": slot.section_id,
+        "batch_id": slot.batch_id,
+    }
     update_data = data.model_dump(exclude_unset=True)
     if update_data:
         merged_data = TimetableSlotCreate(
@@ -1410,20 +1787,29 @@ def update_timetable_slot(slot_id: int, data: TimetableSlotUpdate, db: Session =
             end_time=update_data.get("end_time", slot.end_time),
         )
         validate_faculty_assignment_exists(db, merged_data.faculty_id, merged_data.subject_id, merged_data.section_id, merged_data.batch_id)
+        validate_faculty_hours(db, merged_data, exclude_slot_id=slot_id)
         conflicts = check_timetable_conflicts(db, merged_data, exclude_slot_id=slot_id)
         if conflicts:
             raise HTTPException(400, {"message": "Scheduling conflict", "conflicts": conflicts})
         
         for key, value in update_data.items():
             setattr(slot, key, value)
+        try:
+            bump_slot_versions(db, [previous, slot])
+            db.commit()
+        except IntegrityError as e:
+            db.rollback()
+            raise_for_slot_conflict(db, e, merged_data, exclude_slot_id=slot_id)
+            raise HTTPException(400, f"Database constraint violation: {str(e.orig)}")
     
-    db.commit()
     db.refresh(slot)
+    track_slot_saved(slot)
+    timetable_cache.invalidate_tags(slot_tags(previous) | slot_tags(slot))
     return slot
 
 
 @app.delete("/timetable/slots/{slot_id}")
-def delete_timetable_slot(slot_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+def delete_timetable_slot(slot_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
     slot = db.query(TimetableSlot).join(AcademicTerm).join(Course).join(Department).filter(
         TimetableSlot.id == slot_id,
         Department.organisation_id == current_user.organisation_id
@@ -1431,123 +1817,757 @@ def delete_timetable_slot(slot_id: int, db: Session = Depends(get_db), current_u
     if not slot:
         raise HTTPException(404, "Slot not found")
     
+    tags = slot_tags(slot)
+    bump_slot_versions(db, [slot])
     db.delete(slot)
     db.commit()
+    track_slot_deleted(slot_id)
+    timetable_cache.invalidate_tags(tags)
     return {"message": "Slot deleted permanently"}
 
 
 # =========================
-# BULK TIMETABLE OPERATIONS
+# RECURRING TIMETABLE SLOTS
 # =========================
-@app.post("/timetable/bulk", status_code=201)
-def create_bulk_timetable(slots_data: list[TimetableSlotCreate], db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
-    created_slots = []
-    errors = []
-    
-    for idx, data in enumerate(slots_data):
-        term = db.query(AcademicTerm).join(Course).join(Department).filter(
-            AcademicTerm.id == data.academic_term_id,
-            Department.organisation_id == current_user.organisation_id
-        ).first()
-        if not term:
-            errors.append({"index": idx, "error": "Term not found"})
-            continue
-        
-            try:
-                validate_faculty_department_match(db, data.faculty_id, data.subject_id)
-                validate_faculty_assignment_exists(db, data.faculty_id, data.subject_id, data.section_id, data.batch_id)
-            except HTTPException as e:
-                errors.append({"index": idx, "error": e.detail})
-                continue
-            
-            conflicts = check_timetable_conflicts(db, data)
-            if conflicts:
-                errors.append({"index": idx, "error": "Conflict detected", "conflicts": conflicts})
-                continue
-            
-            slot = TimetableSlot(**data.model_dump())
-            db.add(slot)
-            try:
-                db.flush()
-                created_slots.append(slot.id)
-            except IntegrityError:
-                db.rollback()
-                errors.append({"index": idx, "error": "Database constraint violation"})
-    
-    db.commit()
+def get_recurring_slot_for_admin(db: Session, rule_id: int, organisation_id: int) -> RecurringSlot:
+    rule = db.query(RecurringSlot).join(AcademicTerm).join(Course).join(Department).filter(
+        RecurringSlot.id == rule_id,
+        Department.organisation_id == organisation_id
+    ).first()
+    if not rule:
+        raise HTTPException(404, "Recurring slot not found")
+    return rule
+
+
+def recurring_slot_response(rule: RecurringSlot, exception_dates) -> dict:
     return {
-        "created": len(created_slots),
-        "slot_ids": created_slots,
-        "errors": errors
+        "id": rule.id,
+        "academic_term_id": rule.academic_term_id,
+        "subject_id": rule.subject_id,
+        "faculty_id": rule.faculty_id,
+        "section_id": rule.section_id,
+        "batch_id": rule.batch_id,
+        "room_id": rule.room_id,
+        "day_of_week": rule.day_of_week.value if isinstance(rule.day_of_week, DayOfWeek) else rule.day_of_week,
+        "start_time": rule.start_time,
+        "end_time": rule.end_time,
+        "start_date": rule.start_date,
+        "end_date": rule.end_date,
+        "modality": rule.modality,
+        "is_active": rule.is_active,
+        "exceptions": sorted(exception_dates),
     }
 
 
-# =========================
-# DASHBOARD / SUMMARY
-# =========================
-@app.get("/dashboard/summary")
-def get_dashboard_summary(db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
-    total_courses = db.query(Course).join(Department).filter(
-        Department.organisation_id == current_user.organisation_id,
-        Course.is_active == True
-    ).count()
+@app.post("/timetable/recurring", response_model=RecurringSlotResponse, status_code=201)
+def create_recurring_slot(data: RecurringSlotCreate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
+    term = db.query(AcademicTerm).join(Course).join(Department).filter(
+        AcademicTerm.id == data.academic_term_id,
+        Department.organisation_id == current_user.organisation_id
+    ).first()
+    if not term:
+        raise HTTPException(404, "Term not found")
     
-    total_terms = db.query(AcademicTerm).join(Course).join(Department).filter(
-        Department.organisation_id == current_user.organisation_id,
-        AcademicTerm.is_active == True
-    ).count()
+    start_date = data.start_date or term.start_date
+    end_date = data.end_date or term.end_date
+    if start_date > end_date or start_date < term.start_date or end_date > term.end_date:
+        raise HTTPException(400, "Recurring slot dates must lie within the term")
+    if first_occurrence(data.day_of_week, start_date, end_date) is None:
+        raise HTTPException(400, f"No {data.day_of_week} between {start_date} and {end_date}")
     
-    total_subjects = db.query(Subject).join(AcademicTerm).join(Course).join(Department).filter(
-        Department.organisation_id == current_user.organisation_id,
-        Subject.is_active == True
-    ).count()
+    validate_faculty_department_match(db, data.faculty_id, data.subject_id)
+    validate_faculty_assignment_exists(db, data.faculty_id, data.subject_id, data.section_id, data.batch_id)
     
-    total_faculties = db.query(Faculty).join(Department).filter(
-        Department.organisation_id == current_user.organisation_id,
-        Faculty.is_active == True
-    ).count()
+    rule = RecurringSlot(
+        **data.model_dump(exclude={"start_date", "end_date"}),
+        start_date=start_date,
+        end_date=end_date,
+        is_active=True
+    )
+    found, recurring_found = find_pattern_conflicts(db, rule)
+    if found or recurring_found:
+        raise HTTPException(400, {
+            "message": "Scheduling conflict",
+            "conflicts": build_conflicts(found, recurring_found=recurring_found)
+        })
     
-    total_rooms = db.query(Room).join(Department).filter(
-        Department.organisation_id == current_user.organisation_id,
-        Room.is_active == True
-    ).count()
+    db.add(rule)
+    try:
+        bump_slot_versions(db, [rule])
+        db.commit()
+        db.refresh(rule)
+    except IntegrityError as e:
+        db.rollback()
+        raise HTTPException(400, f"Database constraint violation: {str(e.orig)}")
     
-    total_slots = db.query(TimetableSlot).join(AcademicTerm).join(Course).join(Department).filter(
-        Department.organisation_id == current_user.organisation_id,
-        TimetableSlot.is_active == True
-    ).count()
+    invalidate_slots([rule])
+    return recurring_slot_response(rule, [])
+
+
+@app.get("/terms/{term_id}/recurring", response_model=list[RecurringSlotResponse])
+async def list_recurring_slots(term_id: int, db=Depends(get_read_db), current_user: Principal = Depends(get_current_admin)):
+    if not await read_term_exists(db, term_id, current_user.organisation_id):
+        raise HTTPException(404, "Term not found")
+    
+    rules = (await db.scalars(select(RecurringSlot).where(
+        RecurringSlot.academic_term_id == term_id,
+        RecurringSlot.is_active == True
+    ).order_by(RecurringSlot.day_of_week, RecurringSlot.start_time, RecurringSlot.id))).all()
+    
+    exceptions = {}
+    if rules:
+        for row in (await db.execute(select(
+            RecurringSlotException.recurring_slot_id, RecurringSlotException.date
+        ).where(RecurringSlotException.recurring_slot_id.in_([rule.id for rule in rules])))).all():
+            exceptions.setdefault(row.recurring_slot_id, []).append(row.date)
+    
+    return [recurring_slot_response(rule, exceptions.get(rule.id, [])) for rule in rules]
+
+
+@app.delete("/timetable/recurring/{rule_id}")
+def delete_recurring_slot(rule_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
+    rule = get_recurring_slot_for_admin(db, rule_id, current_user.organisation_id)
+    
+    tags = slot_tags(rule)
+    bump_slot_versions(db, [rule])
+    db.delete(rule)
+    db.commit()
+    timetable_cache.invalidate_tags(tags)
+    return {"message": "Recurring slot deleted permanently"}
+
+
+@app.post("/timetable/recurring/{rule_id}/exceptions", response_model=RecurringSlotResponse, status_code=201)
+def add_recurring_slot_exception(
+    rule_id: int,
+    data: RecurringSlotExceptionCreate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+):
+    rule = get_recurring_slot_for_admin(db, rule_id, current_user.organisation_id)
+    if not is_occurrence(rule, data.date):
+        raise HTTPException(400, "Date is not an occurrence of this recurring slot")
+    
+    db.add(RecurringSlotException(recurring_slot_id=rule.id, date=data.date))
+    try:
+        bump_slot_versions(db, [rule])
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(400, "Occurrence is already cancelled")
+    
+    invalidate_slots([rule])
+    return recurring_slot_response(rule, [e.date for e in rule.exceptions])
+
+
+@app.delete("/timetable/recurring/{rule_id}/exceptions/{exception_date}")
+def remove_recurring_slot_exception(
+    rule_id: int,
+    exception_date: date,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+):
+    rule = get_recurring_slot_for_admin(db, rule_id, current_user.organisation_id)
+    exception = db.query(RecurringSlotException).filter(
+        RecurringSlotException.recurring_slot_id == rule.id,
+        RecurringSlotException.date == exception_date
+    ).first()
+    if not exception:
+        raise HTTPException(404, "Exception not found")
+    
+    # The restored occurrence must still be free
+    occurrence = Occurrence(
+        rule.id, rule.faculty_id, rule.room_id, rule.section_id, rule.batch_id,
+        exception_date, rule.start_time, rule.end_time
+    )
+    conflicts = build_conflicts(
+        find_conflicting_slots(db, occurrence),
+        recurring_found=RecurringRules.load(db, [occurrence], exclude_rule_id=rule.id).conflicts(occurrence)
+    )
+    if conflicts:
+        raise HTTPException(400, {"message": "Scheduling conflict", "conflicts": conflicts})
+    
+    db.delete(exception)
+    bump_slot_versions(db, [rule])
+    db.commit()
+    invalidate_slots([rule])
+    return {"message": "Occurrence restored"}
+
+
+# =========================
+# TIMETABLE GENERATION
+# =========================
+def invalidate_term_timetables(db: Session, term_id: int) -> None:
+    tags = {term_tag(term_id)}
+    tags.update(section_tag(row.id) for row in db.query(Section.id).filter(Section.academic_term_id == term_id))
+    tags.update(batch_tag(row.id) for row in db.query(Batch.id).filter(Batch.academic_term_id == term_id))
+    timetable_cache.invalidate_tags(tags)
+
+
+@app.post("/terms/{term_id}/timetable/generate", response_model=TimetableGenerateResult)
+def generate_term_timetable(term_id: int, data: TimetableGenerateRequest, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
+    term = db.query(AcademicTerm).join(Course).join(Department).filter(
+        AcademicTerm.id == term_id,
+        Department.organisation_id == current_user.organisation_id
+    ).first()
+    if not term:
+        raise HTTPException(404, "Term not found")
+    
+    # Inactive slots still hold their unique (term, group, date, time) tuples
+    has_timetable = db.query(TimetableSlot.id).filter(
+        TimetableSlot.academic_term_id == term_id
+    ).first()
+    if has_timetable and not data.replace_existing:
+        raise HTTPException(400, "Term already has a timetable. Set replace_existing to regenerate it.")
+    
+    if not generator_runs.acquire(blocking=False):
+        raise HTTPException(429, "Another timetable is being generated. Try again shortly.")
+    try:
+        started = perf_counter()
+        periods = [(p.start_time, p.end_time) for p in data.periods]
+        problem, index = load_problem(db, term, current_user.organisation_id, data.days, periods)
+        solution, starts_completed = solve_multistart(
+            problem,
+            starts=data.starts,
+            workers=data.workers,
+            time_budget=data.time_budget_seconds,
+            seed=data.seed
+        )
+        rows = expand_solution(problem, index, solution, term)
+    finally:
+        generator_runs.release()
+    
+    if not data.dry_run:
+        bump_versions(db, AcademicTerm, AcademicTerm.id == term_id)
+        bump_versions(db, Section, Section.academic_term_id == term_id)
+        bump_versions(db, Batch, Batch.academic_term_id == term_id)
+        if data.replace_existing:
+            db.query(TimetableSlot).filter(
+                TimetableSlot.academic_term_id == term_id
+            ).delete(synchronize_session=False)
+        try:
+            if rows:
+                db.execute(insert(TimetableSlot), rows)
+            db.commit()
+        except IntegrityError as e:
+            db.rollback()
+            raise HTTPException(400, f"Database constraint violation: {str(e.orig)}")
+        track_bulk_change()
+        invalidate_term_timetables(db, term_id)
+    
+    return {
+        "lessons": len(problem.lessons),
+        "placed": len(problem.lessons) - solution.unplaced,
+        "created": 0 if data.dry_run else len(rows),
+        "score": solution.score,
+        "seed": solution.seed,
+        "starts_completed": starts_completed,
+        "elapsed_ms": int((perf_counter() - started) * 1000),
+        "unplaced": unplaced_summary(problem, index, solution)
+    }
+
+
+# =========================
+# TIMETABLE CLONE
+# =========================
+CLONE_COLUMNS = (
+    "academic_term_id", "subject_id", "faculty_id", "section_id", "batch_id",
+    "room_id", "date", "start_time", "end_time", "modality"
+)
+
+
+def clone_slots_query(source_term_id: int, target_term_id: int, from_date: date, to_date: date, date_map: dict[date, date]):
+    """
+    The source term's active slots between the two dates, mapped onto the target term.
+
+    `date_map` gives the target date of every source date that lands inside
+    the target term. Subjects are matched by code, sections and batches by
+    name. Returns the mapped rows as a subquery along with the conditions for
+    "fully mapped" and "free of stored and recurring slots".
+    """
+    source = aliased(TimetableSlot, name="source")
+    # Keyed CASEs rather than a VALUES list, which SQLite cannot alias
+    target_date = case(date_map, value=source.date)
+    day_of_week = case({day: weekday_of(day).value for day in date_map}, value=source.date)
+    
+    if source_term_id == target_term_id:
+        subject_id, section_id, batch_id = source.subject_id, source.section_id, source.batch_id
+        query = select(source)
+    else:
+        source_subject = aliased(Subject, name="source_subject")
+        source_section = aliased(Section, name="source_section")
+        source_batch = aliased(Batch, name="source_batch")
+        target_subject = aliased(Subject, name="target_subject")
+        target_section = aliased(Section, name="target_section")
+        target_batch = aliased(Batch, name="target_batch")
+        # min() keeps one row per slot should a name or code repeat in the target term
+        subject_id = select(func.min(target_subject.id)).where(
+            target_subject.academic_term_id == target_term_id,
+            target_subject.code == source_subject.code,
+            target_subject.is_active == True
+        ).scalar_subquery()
+        section_id = select(func.min(target_section.id)).where(
+            target_section.academic_term_id == target_term_id,
+            target_section.name == source_section.name,
+            target_section.is_active == True
+        ).scalar_subquery()
+        batch_id = select(func.min(target_batch.id)).join(
+            target_subject, target_batch.subject_id == target_subject.id
+        ).where(
+            target_batch.academic_term_id == target_term_id,
+            target_batch.name == source_batch.name,
+            target_subject.code == source_subject.code,
+            target_batch.is_active == True
+        ).scalar_subquery()
+        query = select(source).join(
+            source_subject, source.subject_id == source_subject.id
+        ).outerjoin(
+            source_section, source.section_id == source_section.id
+        ).outerjoin(
+            source_batch, source.batch_id == source_batch.id
+        )
+    
+    mapped = query.with_only_columns(
+        literal(target_term_id).label("academic_term_id"),
+        subject_id.label("subject_id"),
+        source.faculty_id,
+        section_id.label("section_id"),
+        batch_id.label("batch_id"),
+        source.room_id,
+        target_date.label("date"),
+        source.start_time,
+        source.end_time,
+        source.modality,
+        day_of_week.label("day_of_week"),
+        source.section_id.label("source_section_id"),
+        source.batch_id.label("source_batch_id"),
+        maintain_column_froms=True
+    ).where(
+        source.academic_term_id == source_term_id,
+        source.date >= from_date,
+        source.date <= to_date,
+        source.is_active == True
+    ).subquery("mapped")
+    
+    is_mapped = and_(
+        mapped.c.date.isnot(None),
+        mapped.c.subject_id.isnot(None),
+        or_(mapped.c.source_section_id.is_(None), mapped.c.section_id.isnot(None)),
+        or_(mapped.c.source_batch_id.is_(None), mapped.c.batch_id.isnot(None)),
+        exists().where(
+            FacultyAssignment.faculty_id == mapped.c.faculty_id,
+            FacultyAssignment.subject_id == mapped.c.subject_id,
+            or_(mapped.c.section_id.is_(None), FacultyAssignment.section_id == mapped.c.section_id),
+            or_(mapped.c.batch_id.is_(None), FacultyAssignment.batch_id == mapped.c.batch_id),
+            FacultyAssignment.is_active == True
+        )
+    )
+    
+    existing = aliased(TimetableSlot, name="existing")
+    stored = aliased(TimetableSlot, name="stored")
+    is_free = and_(
+        ~exists().where(
+            existing.date == mapped.c.date,
+            existing.start_time < mapped.c.end_time,
+            existing.end_time > mapped.c.start_time,
+            existing.is_active == True,
+            or_(
+                existing.faculty_id == mapped.c.faculty_id,
+                existing.room_id == mapped.c.room_id,
+                existing.section_id == mapped.c.section_id,
+                existing.batch_id == mapped.c.batch_id
+            )
+        ),
+        # The unique slot constraints also cover inactive slots
+        ~exists().where(
+            stored.date == mapped.c.date,
+            stored.start_time == mapped.c.start_time,
+            stored.end_time == mapped.c.end_time,
+            or_(
+                stored.faculty_id == mapped.c.faculty_id,
+                stored.room_id == mapped.c.room_id,
+                and_(
+                    stored.academic_term_id == mapped.c.academic_term_id,
+                    or_(stored.section_id == mapped.c.section_id, stored.batch_id == mapped.c.batch_id)
+                )
+            )
+        ),
+        ~exists().where(
+            RecurringSlot.day_of_week == cast(mapped.c.day_of_week, RecurringSlot.day_of_week.type),
+            RecurringSlot.start_date <= mapped.c.date,
+            RecurringSlot.end_date >= mapped.c.date,
+            RecurringSlot.start_time < mapped.c.end_time,
+            RecurringSlot.end_time > mapped.c.start_time,
+            RecurringSlot.is_active == True,
+            or_(
+                RecurringSlot.faculty_id == mapped.c.faculty_id,
+                RecurringSlot.room_id == mapped.c.room_id,
+                RecurringSlot.section_id == mapped.c.section_id,
+                RecurringSlot.batch_id == mapped.c.batch_id
+            ),
+            ~exists().where(
+                RecurringSlotException.recurring_slot_id == RecurringSlot.id,
+                RecurringSlotException.date == mapped.c.date
+            ).correlate_except(RecurringSlotException)
+        )
+    )
+    return mapped, is_mapped, is_free
+
+
+@app.post("/terms/{term_id}/timetable/clone", response_model=TimetableCloneResult)
+def clone_term_timetable(term_id: int, data: TimetableCloneRequest, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
+    terms = {
+        term.id: term for term in db.query(AcademicTerm).join(Course).join(Department).filter(
+            AcademicTerm.id.in_(sorted({term_id, data.target_term_id or term_id})),
+            Department.organisation_id == current_user.organisation_id
+        )
+    }
+    source = terms.get(term_id)
+    if not source:
+        raise HTTPException(404, "Term not found")
+    target = terms.get(data.target_term_id or term_id)
+    if not target:
+        raise HTTPException(404, "Target term not found")
+    
+    if data.week_offset is not None:
+        week_offset = data.week_offset
+    else:
+        week_offset = (week_start(target.start_date) - week_start(source.start_date)).days // 7
+    if target.id == source.id and week_offset == 0:
+        raise HTTPException(400, "week_offset is required to clone a term onto itself")
+    
+    started = perf_counter()
+    from_date = data.from_date or source.start_date
+    to_date = data.to_date or source.end_date
+    shift = timedelta(weeks=week_offset)
+    # Whole weeks keep every slot on its weekday
+    date_map = {
+        row.date: row.date + shift
+        for row in db.query(TimetableSlot.date).filter(
+            TimetableSlot.academic_term_id == source.id,
+            TimetableSlot.date >= from_date,
+            TimetableSlot.date <= to_date,
+            TimetableSlot.is_active == True
+        ).distinct()
+        if target.start_date <= row.date + shift <= target.end_date
+    }
+    
+    source_slots = mapped_slots = free_slots = 0
+    if date_map:
+        mapped, is_mapped, is_free = clone_slots_query(source.id, target.id, from_date, to_date, date_map)
+        source_slots, mapped_slots, free_slots = db.execute(select(
+            func.count(),
+            func.coalesce(func.sum(case((is_mapped, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((and_(is_mapped, is_free), 1), else_=0)), 0)
+        ).select_from(mapped)).one()
+    else:
+        source_slots = db.query(func.count(TimetableSlot.id)).filter(
+            TimetableSlot.academic_term_id == source.id,
+            TimetableSlot.date >= from_date,
+            TimetableSlot.date <= to_date,
+            TimetableSlot.is_active == True
+        ).scalar()
+    
+    created = 0
+    if free_slots and not data.dry_run:
+        bump_versions(db, AcademicTerm, AcademicTerm.id == target.id)
+        bump_versions(db, Section, Section.academic_term_id == target.id)
+        bump_versions(db, Batch, Batch.academic_term_id == target.id)
+        try:
+            created = db.execute(insert(TimetableSlot).from_select(
+                CLONE_COLUMNS,
+                select(*(mapped.c[name] for name in CLONE_COLUMNS)).where(is_mapped, is_free)
+            )).rowcount
+            db.commit()
+        except IntegrityError as e:
+            db.rollback()
+            raise HTTPException(400, f"Database constraint violation: {str(e.orig)}")
+        track_bulk_change()
+        invalidate_term_timetables(db, target.id)
+    
+    return {
+        "target_term_id": target.id,
+        "week_offset": week_offset,
+        "source_slots": source_slots,
+        "created": free_slots if data.dry_run else created,
+        "unmapped": source_slots - mapped_slots,
+        "conflicting": mapped_slots - free_slots,
+        "elapsed_ms": int((perf_counter() - started) * 1000)
+    }
+
+
+# =========================
+# BULK TIMETABLE OPERATIONS
+# =========================
+def insert_validated_slots(db: Session, slots_data: list, validated: list, check_existing: bool) -> tuple[list, list]:
+    """
+    Insert the validated (index, data) pairs that do not clash, in one statement.
+
+    Clashes between rows of the request and with recurring slots are always
+    checked in memory. With `check_existing` False the stored slots are left
+    to the overlap constraints; if one fires, the insert is redone with the
+    pre-check so conflicts are still reported per row. Any other constraint
+    failure falls back to inserting row by row. Rows that would take their
+    faculty over `max_weekly_hours` for the week are rejected.
+    """
+    errors = []
+    existing = load_grid_for_slots(db, [data for _, data in validated]) if check_existing else OccupancyGrid()
+    recurring = RecurringRules.load(db, [data for _, data in validated]) if validated else RecurringRules([], {})
+    loads = FacultyWeekLoads.load(db, [data for _, data in validated])
+    accepted = OccupancyGrid()
+    rows = []
+    row_indexes = []
+    for idx, data in validated:
+        over_limit = loads.exceeded(data)
+        if over_limit:
+            errors.append({"index": idx, "error": over_limit})
+            continue
+        
+        found = existing.conflicts(data)
+        batch_found = accepted.conflicts(data)
+        recurring_found = recurring.conflicts(data)
+        if found or batch_found or recurring_found:
+            errors.append({
+                "index": idx,
+                "error": "Conflict detected",
+                "conflicts": build_conflicts(found, batch_found, recurring_found)
+            })
+            continue
+        
+        accepted.add(data, idx)
+        loads.add(data)
+        rows.append(data.model_dump())
+        row_indexes.append(idx)
+    
+    created_slots = []
+    if rows:
+        try:
+            created_slots = db.scalars(
+                insert(TimetableSlot).returning(TimetableSlot.id, sort_by_parameter_order=True),
+                rows
+            ).all()
+            bump_slot_versions(db, rows)
+            db.commit()
+            track_slots_created([slots_data[idx] for idx in row_indexes], created_slots)
+            invalidate_slots(rows)
+        except IntegrityError as e:
+            db.rollback()
+            if not check_existing and conflict_dimension(e):
+                return insert_validated_slots(db, slots_data, validated, check_existing=True)
+            created_slots, row_errors = insert_slots_individually(db, slots_data, rows, row_indexes)
+            errors.extend(row_errors)
+    
+    return created_slots, errors
+
+
+def insert_slots_individually(db: Session, slots_data: list, rows: list, row_indexes: list) -> tuple[list, list]:
+    """Insert each row in its own SAVEPOINT, so a constraint failure only rejects that row."""
+    created_slots = []
+    created_rows = []
+    created_indexes = []
+    errors = []
+    for idx, row in zip(row_indexes, rows):
+        try:
+            with db.begin_nested():
+                slot_id = db.scalar(insert(TimetableSlot).values(**row).returning(TimetableSlot.id))
+        except IntegrityError:
+            errors.append({"index": idx, "error": "Database constraint violation"})
+            continue
+        created_slots.append(slot_id)
+        created_rows.append(row)
+        created_indexes.append(idx)
+    
+    if created_rows:
+        bump_slot_versions(db, created_rows)
+    db.commit()
+    track_slots_created([slots_data[idx] for idx in created_indexes], created_slots)
+    invalidate_slots(created_rows)
+    return created_slots, errors
+
+
+@app.post("/timetable/bulk", status_code=201)
+def create_bulk_timetable(slots_data: list[TimetableSlotCreate], db: Session = Depends(get_db), current_user: Principal = Depends(get_current_admin)):
+    errors = []
+    
+    term_ids = {data.academic_term_id for data in slots_data}
+    faculty_ids = {data.faculty_id for data in slots_data}
+    subject_ids = {data.subject_id for data in slots_data}
     
+    valid_term_ids = {
+        row.id for row in db.query(AcademicTerm.id).join(Course).join(Department).filter(
+            AcademicTerm.id.in_(sorted(term_ids)),
+            Department.organisation_id == current_user.organisation_id
+        )
+    } if term_ids else set()
+    faculty_depts = {
+        row.id: row.department_id
+        for row in db.query(Faculty.id, Faculty.department_id).filter(Faculty.id.in_(sorted(faculty_ids)))
+    } if faculty_ids else {}
+    subject_depts = {
+        row.id: row.department_id
+        for row in db.query(Subject.id, Course.department_id).select_from(Subject).join(AcademicTerm).join(Course).filter(
+            Subject.id.in_(sorted(subject_ids))
+        )
+    } if subject_ids else {}
+    assignments = db.query(
+        FacultyAssignment.faculty_id,
+        FacultyAssignment.subject_id,
+        FacultyAssignment.section_id,
+        FacultyAssignment.batch_id
+    ).filter(
+        FacultyAssignment.faculty_id.in_(sorted(faculty_ids)),
+        FacultyAssignment.subject_id.in_(sorted(subject_ids)),
+        FacultyAssignment.is_active == True
+    ).all() if faculty_ids else []
+    assignments_by_pair = {}
+    for a in assignments:
+        assignments_by_pair.setdefault((a.faculty_id, a.subject_id), []).append(a)
+    
+    validated = []
+    for idx, data in enumerate(slots_data):
+        if data.academic_term_id not in valid_term_ids:
+            errors.append({"index": idx, "error": "Term not found"})
+            continue
+        
+        try:
+            check_department_ids_match(faculty_depts.get(data.faculty_id), subject_depts.get(data.subject_id))
+        except HTTPException as e:
+            errors.append({"index": idx, "error": e.detail})
+            continue
+        
+        has_assignment = any(
+            (not data.section_id or a.section_id == data.section_id) and
+            (not data.batch_id or a.batch_id == data.batch_id)
+            for a in assignments_by_pair.get((data.faculty_id, data.subject_id), [])
+        )
+        if not has_assignment:
+            errors.append({"index": idx, "error": NO_ASSIGNMENT_MESSAGE})
+            continue
+        
+        validated.append((idx, data))
+    
+    created_slots, insert_errors = insert_validated_slots(
+        db, slots_data, validated, check_existing=not SLOT_OVERLAP_CONSTRAINTS
+    )
+    errors.extend(insert_errors)
+    
+    errors.sort(key=lambda e: e["index"])
     return {
-        "courses": total_courses,
-        "terms": total_terms,
-        "subjects": total_subjects,
-        "faculties": total_faculties,
-        "rooms": total_rooms,
-        "timetable_slots": total_slots
+        "created": len(created_slots),
+        "slot_ids": created_slots,
+        "errors": errors
     }
 
 
+# =========================
+# DASHBOARD / SUMMARY
+# =========================
+# DASHBOARD_COUNTERS: read the summary from organisation_counters, which the
+# triggers in migrations/003_organisation_counters.sql keep current, instead of
+# counting. An organisation without a counter row is counted as usual.
+DASHBOARD_COUNTERS = env_flag("DASHBOARD_COUNTERS", False)
+
+DASHBOARD_COUNTER_FIELDS = ("courses", "terms", "subjects", "faculties", "rooms", "timetable_slots")
+
+
+def dashboard_counts_query(org_id: int):
+    """The six summary counts as scalar subqueries of one SELECT (one round trip)."""
+    def count_active(model, *joins):
+        query = select(func.count(model.id))
+        for target in joins:
+            query = query.join(target)
+        return query.where(
+            Department.organisation_id == org_id,
+            model.is_active == True
+        ).scalar_subquery()
+
+    return select(
+        count_active(Course, Department).label("courses"),
+        count_active(AcademicTerm, Course, Department).label("terms"),
+        count_active(Subject, AcademicTerm, Course, Department).label("subjects"),
+        count_active(Faculty, Department).label("faculties"),
+        count_active(Room, Department).label("rooms"),
+        count_active(TimetableSlot, AcademicTerm, Course, Department).label("timetable_slots"),
+    )
+
+
+@app.get("/dashboard/summary")
+async def get_dashboard_summary(db=Depends(get_read_db), current_user: Principal = Depends(get_current_admin)):
+    org_id = current_user.organisation_id
+    
+    if DASHBOARD_COUNTERS:
+        counters = (await db.execute(
+            select(*[getattr(OrganisationCounter, field) for field in DASHBOARD_COUNTER_FIELDS])
+            .where(OrganisationCounter.organisation_id == org_id)
+        )).first()
+        if counters is not None:
+            return dict(counters._mapping)
+    
+    counts = (await db.execute(dashboard_counts_query(org_id))).one()
+    return dict(counts._mapping)
+
+
+@app.post("/super-admin/dashboard/counters/refresh", status_code=200)
+def super_admin_refresh_dashboard_counters(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_super_admin)
+):
+    if db.get_bind().dialect.name != "postgresql":
+        raise HTTPException(400, "Dashboard counters require PostgreSQL")
+    
+    db.execute(text("SELECT refresh_organisation_counters()"))
+    db.commit()
+    
+    return {"message": "Dashboard counters refreshed"}
+
+
 # =========================
 # STUDENT ENROLLMENT HELPERS
 # =========================
-def parse_uids_from_excel(contents: bytes) -> list[str]:
+ROSTER_EXTENSIONS = (".xlsx", ".xls", ".csv")
+
+
+def iter_excel_rows(fileobj, max_col: int) -> Iterator[tuple]:
     try:
         from openpyxl import load_workbook
     except ImportError:
         raise HTTPException(500, "Excel parsing not available. Install openpyxl.")
     
-    wb = load_workbook(io.BytesIO(contents), data_only=True)
-    ws = wb.active
-    
-    uids = []
-    for row in ws.iter_rows(min_row=1, max_col=1, values_only=True):
-        uid = row[0]
-        if uid is not None:
-            uid_str = str(uid).strip()
-            if uid_str:
-                uids.append(uid_str)
+    try:
+        wb = load_workbook(fileobj, read_only=True, data_only=True)
+    except Exception as e:
+        raise HTTPException(400, f"Failed to parse Excel file: {str(e)}")
+    try:
+        yield from wb.active.iter_rows(min_row=1, max_col=max_col, values_only=True)
+    except Exception as e:
+        raise HTTPException(400, f"Failed to parse Excel file: {str(e)}")
+    finally:
+        wb.close()
+
+
+def iter_csv_rows(fileobj) -> Iterator[list]:
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    try:
+        yield from csv.reader(text)
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(400, f"Failed to parse CSV file: {str(e)}")
+    finally:
+        text.detach()
+
+
+def iter_roster_rows(file: UploadFile, max_col: int = 1) -> Iterator[tuple]:
+    """Stream the first `max_col` cells of each roster row; the upload itself is already spooled to disk."""
+    if not (file.filename and file.filename.lower().endswith(ROSTER_EXTENSIONS)):
+        raise HTTPException(400, "Please upload an Excel (.xlsx or .xls) or CSV file")
     
-    return uids
+    if file.filename.lower().endswith(".csv"):
+        rows = iter_csv_rows(file.file)
+    else:
+        rows = iter_excel_rows(file.file, max_col)
+    return (tuple(row[:max_col]) + (None,) * (max_col - len(row)) for row in rows)
+
+
+def iter_uids_from_upload(file: UploadFile) -> Iterator[str]:
+    return (row[0] for row in iter_roster_rows(file) if row[0] is not None)
 
 
 def get_enrollment_count(db: Session, group_type: GroupType, group_id: int) -> int:
@@ -1558,13 +2578,17 @@ def get_enrollment_count(db: Session, group_type: GroupType, group_id: int) -> i
     ).count()
 
 
-def bulk_enroll_students(
+ENROLL_CHUNK_SIZE = 1000
+
+
+def stage_enrollments(
     db: Session,
     group_type: GroupType,
     group_id: int,
     student_ids: list[str],
     max_capacity: int = None
-) -> BulkEnrollResult:
+) -> tuple[BulkEnrollResult, list[str]]:
+    """Enroll `student_ids` without committing; returns the counts and the ids added or reactivated."""
     cleaned_ids = []
     for sid in student_ids:
         s = str(sid).strip()
@@ -1572,71 +2596,134 @@ def bulk_enroll_students(
             cleaned_ids.append(s)
     
     if not cleaned_ids:
-        return BulkEnrollResult(total=0, added=0, already_enrolled=0, skipped=0)
+        return BulkEnrollResult(total=0, added=0, already_enrolled=0, skipped=0), []
+    
+    existing = {}
+    unique_ids = list(dict.fromkeys(cleaned_ids))
+    for i in range(0, len(unique_ids), ENROLL_CHUNK_SIZE):
+        chunk = unique_ids[i:i + ENROLL_CHUNK_SIZE]
+        existing.update(db.query(StudentGroupMap.student_id, StudentGroupMap.is_active).filter(
+            StudentGroupMap.group_type == group_type,
+            StudentGroupMap.group_id == group_id,
+            StudentGroupMap.student_id.in_(chunk)
+        ).all())
     
     current_count = get_enrollment_count(db, group_type, group_id)
     added = 0
     already_enrolled = 0
     skipped = 0
+    to_reactivate = []
+    to_insert = []
     
     for student_id in cleaned_ids:
         if max_capacity is not None and current_count >= max_capacity:
             skipped += 1
             continue
         
-        existing = db.query(StudentGroupMap).filter(
-            StudentGroupMap.group_type == group_type,
-            StudentGroupMap.group_id == group_id,
-            StudentGroupMap.student_id == student_id
-        ).first()
-        
-        if existing:
-            if existing.is_active:
+        if student_id in existing:
+            if existing[student_id]:
                 already_enrolled += 1
             else:
-                existing.is_active = True
+                to_reactivate.append(student_id)
                 added += 1
                 current_count += 1
         else:
-            enrollment = StudentGroupMap(
-                group_type=group_type,
-                group_id=group_id,
-                student_id=student_id
-            )
-            db.add(enrollment)
+            to_insert.append(student_id)
             added += 1
             current_count += 1
+        existing[student_id] = True
     
-    db.commit()
-    return BulkEnrollResult(
+    for i in range(0, len(to_reactivate), ENROLL_CHUNK_SIZE):
+        db.query(StudentGroupMap).filter(
+            StudentGroupMap.group_type == group_type,
+            StudentGroupMap.group_id == group_id,
+            StudentGroupMap.student_id.in_(to_reactivate[i:i + ENROLL_CHUNK_SIZE])
+        ).update({StudentGroupMap.is_active: True}, synchronize_session=False)
+    
+    inserted = []
+    if to_insert:
+        # Rows enrolled concurrently since the lookup above are left alone and counted as already enrolled
+        inserted = db.scalars(
+            pg_insert(StudentGroupMap).on_conflict_do_nothing(
+                index_elements=["group_type", "group_id", "student_id"]
+            ).returning(StudentGroupMap.student_id),
+            [{"group_type": group_type, "group_id": group_id, "student_id": sid} for sid in to_insert]
+        ).all()
+        lost = len(to_insert) - len(inserted)
+        added -= lost
+        already_enrolled += lost
+    
+    result = BulkEnrollResult(
         total=len(cleaned_ids),
         added=added,
         already_enrolled=already_enrolled,
         skipped=skipped
     )
+    return result, to_reactivate + inserted
+
+
+def bulk_enroll_students(
+    db: Session,
+    group_type: GroupType,
+    group_id: int,
+    student_ids: list[str],
+    max_capacity: int = None
+) -> BulkEnrollResult:
+    result, enrolled = stage_enrollments(db, group_type, group_id, student_ids, max_capacity)
+    db.commit()
+    invalidate_students(enrolled)
+    return result
+
+
+def enroll_from_roster(
+    db: Session,
+    group_type: GroupType,
+    group_id: int,
+    student_ids: Iterable[str],
+    max_capacity: int = None
+) -> BulkEnrollResult:
+    """Enroll a streamed roster chunk by chunk, committing once at the end."""
+    totals = BulkEnrollResult(total=0, added=0, already_enrolled=0, skipped=0)
+    enrolled = []
+    student_ids = iter(student_ids)
+    while True:
+        chunk = list(islice(student_ids, ENROLL_CHUNK_SIZE))
+        if not chunk:
+            break
+        result, added = stage_enrollments(db, group_type, group_id, chunk, max_capacity)
+        enrolled.extend(added)
+        totals.total += result.total
+        totals.added += result.added
+        totals.already_enrolled += result.already_enrolled
+        totals.skipped += result.skipped
+    db.commit()
+    invalidate_students(enrolled)
+    return totals
 
 
 # =========================
 # SECTION ENROLLMENT ENDPOINTS
 # =========================
 @app.get("/sections/{section_id}/enrollments", response_model=list[StudentEnrollmentResponse])
-def get_section_enrollments(
+async def get_section_enrollments(
     section_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    db=Depends(get_read_db),
+    current_user: Principal = Depends(get_current_admin)
 ):
-    section = db.query(Section).join(AcademicTerm).join(Course).join(Department).filter(
+    section = await db.scalar(select(Section.id).join(AcademicTerm).join(Course).join(Department).where(
         Section.id == section_id,
         Department.organisation_id == current_user.organisation_id
-    ).first()
+    ))
     if not section:
         raise HTTPException(404, "Section not found")
     
-    return db.query(StudentGroupMap).filter(
-        StudentGroupMap.group_type == GroupType.section,
-        StudentGroupMap.group_id == section_id,
-        StudentGroupMap.is_active == True
-    ).order_by(StudentGroupMap.student_id).all()
+    return (await db.scalars(
+        select(StudentGroupMap).where(
+            StudentGroupMap.group_type == GroupType.section,
+            StudentGroupMap.group_id == section_id,
+            StudentGroupMap.is_active == True
+        ).order_by(StudentGroupMap.student_id)
+    )).all()
 
 
 @app.post("/sections/{section_id}/enroll/bulk", response_model=BulkEnrollResult)
@@ -1644,7 +2731,7 @@ def bulk_enroll_section(
     section_id: int,
     data: BulkEnrollRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ):
     section = db.query(Section).join(AcademicTerm).join(Course).join(Department).filter(
         Section.id == section_id,
@@ -1663,11 +2750,11 @@ def bulk_enroll_section(
 
 
 @app.post("/sections/{section_id}/enroll/upload", response_model=BulkEnrollResult)
-async def upload_enroll_section(
+def upload_enroll_section(
     section_id: int,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ):
     section = db.query(Section).join(AcademicTerm).join(Course).join(Department).filter(
         Section.id == section_id,
@@ -1676,20 +2763,11 @@ async def upload_enroll_section(
     if not section:
         raise HTTPException(404, "Section not found")
     
-    if not (file.filename and (file.filename.endswith('.xlsx') or file.filename.endswith('.xls'))):
-        raise HTTPException(400, "Please upload an Excel file (.xlsx or .xls)")
-    
-    contents = await file.read()
-    try:
-        student_ids = parse_uids_from_excel(contents)
-    except Exception as e:
-        raise HTTPException(400, f"Failed to parse Excel file: {str(e)}")
-    
-    return bulk_enroll_students(
+    return enroll_from_roster(
         db=db,
         group_type=GroupType.section,
         group_id=section_id,
-        student_ids=student_ids,
+        student_ids=iter_uids_from_upload(file),
         max_capacity=section.max_capacity
     )
 
@@ -1698,23 +2776,25 @@ async def upload_enroll_section(
 # BATCH ENROLLMENT ENDPOINTS
 # =========================
 @app.get("/batches/{batch_id}/enrollments", response_model=list[StudentEnrollmentResponse])
-def get_batch_enrollments(
+async def get_batch_enrollments(
     batch_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    db=Depends(get_read_db),
+    current_user: Principal = Depends(get_current_admin)
 ):
-    batch = db.query(Batch).join(AcademicTerm).join(Course).join(Department).filter(
+    batch = await db.scalar(select(Batch.id).join(AcademicTerm).join(Course).join(Department).where(
         Batch.id == batch_id,
         Department.organisation_id == current_user.organisation_id
-    ).first()
+    ))
     if not batch:
         raise HTTPException(404, "Batch not found")
     
-    return db.query(StudentGroupMap).filter(
-        StudentGroupMap.group_type == GroupType.batch,
-        StudentGroupMap.group_id == batch_id,
-        StudentGroupMap.is_active == True
-    ).order_by(StudentGroupMap.student_id).all()
+    return (await db.scalars(
+        select(StudentGroupMap).where(
+            StudentGroupMap.group_type == GroupType.batch,
+            StudentGroupMap.group_id == batch_id,
+            StudentGroupMap.is_active == True
+        ).order_by(StudentGroupMap.student_id)
+    )).all()
 
 
 @app.post("/batches/{batch_id}/enroll/bulk", response_model=BulkEnrollResult)
@@ -1722,7 +2802,7 @@ def bulk_enroll_batch(
     batch_id: int,
     data: BulkEnrollRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ):
     batch = db.query(Batch).join(AcademicTerm).join(Course).join(Department).filter(
         Batch.id == batch_id,
@@ -1741,11 +2821,11 @@ def bulk_enroll_batch(
 
 
 @app.post("/batches/{batch_id}/enroll/upload", response_model=BulkEnrollResult)
-async def upload_enroll_batch(
+def upload_enroll_batch(
     batch_id: int,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ):
     batch = db.query(Batch).join(AcademicTerm).join(Course).join(Department).filter(
         Batch.id == batch_id,
@@ -1754,24 +2834,168 @@ async def upload_enroll_batch(
     if not batch:
         raise HTTPException(404, "Batch not found")
     
-    if not (file.filename and (file.filename.endswith('.xlsx') or file.filename.endswith('.xls'))):
-        raise HTTPException(400, "Please upload an Excel file (.xlsx or .xls)")
-    
-    contents = await file.read()
-    try:
-        student_ids = parse_uids_from_excel(contents)
-    except Exception as e:
-        raise HTTPException(400, f"Failed to parse Excel file: {str(e)}")
-    
-    return bulk_enroll_students(
+    return enroll_from_roster(
         db=db,
         group_type=GroupType.batch,
         group_id=batch_id,
-        student_ids=student_ids,
+        student_ids=iter_uids_from_upload(file),
         max_capacity=batch.max_capacity
     )
 
 
+# =========================
+# TERM ENROLLMENT JOBS
+# =========================
+def load_term_groups(db: Session, term_id: int) -> dict:
+    """(group_type, group_id) -> (display name, max_capacity) for every active section and batch of a term."""
+    groups = {}
+    for row in db.query(Section.id, Section.name, Section.max_capacity).filter(
+        Section.academic_term_id == term_id,
+        Section.is_active == True
+    ):
+        groups[(GroupType.section, row.id)] = (row.name, row.max_capacity)
+    batches = db.query(Batch.id, Batch.name, Batch.max_capacity, Subject.code).join(
+        Subject, Batch.subject_id == Subject.id
+    ).filter(
+        Batch.academic_term_id == term_id,
+        Batch.is_active == True
+    )
+    for row in batches:
+        groups[(GroupType.batch, row.id)] = (f"{row.code}/{row.name}", row.max_capacity)
+    return groups
+
+
+def run_term_enrollment_job(job_id: str, groups: dict, student_ids_by_group: dict):
+    job = get_job(job_id)
+    job.start()
+    db = SessionLocal()
+    try:
+        for (group_type, group_id), student_ids in student_ids_by_group.items():
+            name, max_capacity = groups[(group_type, group_id)]
+            result = enroll_from_roster(db, group_type, group_id, student_ids, max_capacity)
+            job.add_result({
+                "group_type": group_type.value,
+                "group_id": group_id,
+                "group_name": name,
+                **result.model_dump()
+            }, len(student_ids))
+        job.finish()
+    except Exception as e:
+        db.rollback()
+        job.finish(error=str(e))
+    finally:
+        db.close()
+
+
+def start_term_enrollment_job(background_tasks: BackgroundTasks, organisation_id: int, groups: dict, student_ids_by_group: dict) -> dict:
+    job = create_job(
+        "term_enrollment",
+        organisation_id,
+        total=sum(len(ids) for ids in student_ids_by_group.values()),
+        groups_total=len(student_ids_by_group)
+    )
+    background_tasks.add_task(run_term_enrollment_job, job.id, groups, student_ids_by_group)
+    return job.to_dict()
+
+
+def get_term_for_admin(db: Session, term_id: int, current_user: Principal):
+    term = db.query(AcademicTerm.id).join(Course).join(Department).filter(
+        AcademicTerm.id == term_id,
+        Department.organisation_id == current_user.organisation_id
+    ).first()
+    if not term:
+        raise HTTPException(404, "Term not found")
+    return term
+
+
+@app.post("/terms/{term_id}/enroll/bulk", response_model=EnrollmentJobResponse, status_code=202)
+def bulk_enroll_term(
+    term_id: int,
+    data: TermBulkEnrollRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+):
+    get_term_for_admin(db, term_id, current_user)
+    groups = load_term_groups(db, term_id)
+    
+    student_ids_by_group = {}
+    unknown = set()
+    for entry in data.enrollments:
+        if entry.section_id is not None:
+            key = (GroupType.section, entry.section_id)
+        else:
+            key = (GroupType.batch, entry.batch_id)
+        if key not in groups:
+            unknown.add(f"{key[0].value} {key[1]}")
+            continue
+        student_ids_by_group.setdefault(key, []).append(entry.student_id)
+    
+    if unknown:
+        raise HTTPException(400, f"Groups not found in this term: {', '.join(sorted(unknown))}")
+    
+    return start_term_enrollment_job(background_tasks, current_user.organisation_id, groups, student_ids_by_group)
+
+
+@app.post("/terms/{term_id}/enroll/upload", response_model=EnrollmentJobResponse, status_code=202)
+def upload_enroll_term(
+    term_id: int,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+):
+    """
+    Roster with the student UID in the first column and the group in the second:
+    a section name, or a batch as "<subject code>/<batch name>" (the bare batch
+    name works when it is unique in the term). A first row whose group does not
+    resolve is treated as a header.
+    """
+    get_term_for_admin(db, term_id, current_user)
+    groups = load_term_groups(db, term_id)
+    
+    by_label = {}
+    batch_names = {}
+    for key, (name, _) in groups.items():
+        by_label[name] = key
+        if key[0] == GroupType.batch:
+            batch_names.setdefault(name.split("/", 1)[1], []).append(key)
+    for name, keys in batch_names.items():
+        if len(keys) == 1:
+            by_label.setdefault(name, keys[0])
+    
+    student_ids_by_group = {}
+    unknown = set()
+    for row_number, (uid, label) in enumerate(iter_roster_rows(file, max_col=2), start=1):
+        uid = str(uid).strip() if uid is not None else ""
+        label = str(label).strip() if label is not None else ""
+        if not uid:
+            continue
+        key = by_label.get(label)
+        if key is None:
+            if row_number > 1:
+                unknown.add(label or "(empty)")
+            continue
+        student_ids_by_group.setdefault(key, []).append(uid)
+    
+    if unknown:
+        listed = sorted(unknown)
+        more = f" and {len(listed) - 10} more" if len(listed) > 10 else ""
+        raise HTTPException(400, f"Groups not found in this term: {', '.join(listed[:10])}{more}")
+    if not student_ids_by_group:
+        raise HTTPException(400, "No enrollments found in the uploaded file")
+    
+    return start_term_enrollment_job(background_tasks, current_user.organisation_id, groups, student_ids_by_group)
+
+
+@app.get("/jobs/{job_id}", response_model=EnrollmentJobResponse)
+def get_job_status(job_id: str, current_user: Principal = Depends(get_current_admin)):
+    job = get_job(job_id)
+    if not job or job.organisation_id != current_user.organisation_id:
+        raise HTTPException(404, "Job not found")
+    return job.to_dict()
+
+
 # =========================
 # DELETE ENROLLMENT (Soft Delete)
 # =========================
@@ -1779,7 +3003,7 @@ async def upload_enroll_batch(
 def delete_enrollment(
     enrollment_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ):
     enrollment = db.query(StudentGroupMap).filter(
         StudentGroupMap.id == enrollment_id
@@ -1810,36 +3034,63 @@ def delete_enrollment(
     
     enrollment.is_active = False
     db.commit()
+    invalidate_students([enrollment.student_id])
     return {"message": "Enrollment deactivated", "student_id": enrollment.student_id}
 
 
 # =========================
 # STUDENT TIMETABLE ENDPOINT
 # =========================
-@app.get("/students/{student_id}/timetable", response_model=list[StudentTimetableSlot])
-def get_student_timetable(
-    student_id: str,
-    date: date,
-    db: Session = Depends(get_db)
-):
-    enrollments = db.query(StudentGroupMap).filter(
+async def get_student_groups(db, student_id: str) -> tuple[list[int], list[int], list[tuple]]:
+    """Active section and batch ids of a student, plus (type, id, timetable_version) for each group."""
+    enrollments = (await db.execute(select(
+        StudentGroupMap.group_type,
+        StudentGroupMap.group_id,
+        Section.timetable_version.label("section_version"),
+        Batch.timetable_version.label("batch_version"),
+    ).outerjoin(
+        Section, and_(StudentGroupMap.group_type == GroupType.section, Section.id == StudentGroupMap.group_id)
+    ).outerjoin(
+        Batch, and_(StudentGroupMap.group_type == GroupType.batch, Batch.id == StudentGroupMap.group_id)
+    ).where(
         StudentGroupMap.student_id == student_id,
         StudentGroupMap.is_active == True
-    ).all()
-    
-    if not enrollments:
-        return []
+    ).order_by(StudentGroupMap.group_type, StudentGroupMap.group_id))).all()
     
     section_ids = []
     batch_ids = []
+    versions = []
     for e in enrollments:
         if e.group_type == GroupType.section:
             section_ids.append(e.group_id)
+            versions.append(("section", e.group_id, e.section_version))
         else:
             batch_ids.append(e.group_id)
-    
+            versions.append(("batch", e.group_id, e.batch_version))
+    return section_ids, batch_ids, versions
+
+
+STUDENT_SLOT_COLUMNS = (
+    TimetableSlot.id,
+    TimetableSlot.date,
+    TimetableSlot.start_time,
+    TimetableSlot.end_time,
+    TimetableSlot.section_id,
+    TimetableSlot.batch_id,
+    Subject.name.label("subject_name"),
+    Subject.code.label("subject_code"),
+    Faculty.name.label("faculty_name"),
+    Room.name.label("room_name"),
+    Section.name.label("section_name"),
+    Batch.name.label("batch_name"),
+)
+
+MAX_STUDENT_TIMETABLE_DAYS = 62
+
+
+async def query_student_slots(db, section_ids: list[int], batch_ids: list[int], *filters) -> list[dict]:
     query_filters = [
-        TimetableSlot.date == date,
+        *filters,
         TimetableSlot.is_active == True
     ]
     
@@ -1855,34 +3106,104 @@ def get_student_timetable(
     else:
         return []
     
-    slots = db.query(TimetableSlot).filter(
+    rows = (await db.execute(select(*STUDENT_SLOT_COLUMNS).select_from(TimetableSlot).outerjoin(
+        Subject, TimetableSlot.subject_id == Subject.id
+    ).outerjoin(
+        Faculty, TimetableSlot.faculty_id == Faculty.id
+    ).outerjoin(
+        Room, TimetableSlot.room_id == Room.id
+    ).outerjoin(
+        Section, TimetableSlot.section_id == Section.id
+    ).outerjoin(
+        Batch, TimetableSlot.batch_id == Batch.id
+    ).where(
         and_(*query_filters)
-    ).order_by(TimetableSlot.start_time).all()
+    ).order_by(TimetableSlot.date, TimetableSlot.start_time))).all()
     
-    result = []
-    for slot in slots:
-        group_type = None
-        group_name = None
-        
-        if slot.section_id is not None and slot.section_id in section_ids:
-            group_type = "section"
-            group_name = slot.section.name if slot.section else None
-        elif slot.batch_id is not None and slot.batch_id in batch_ids:
-            group_type = "batch"
-            group_name = slot.batch.name if slot.batch else None
-        
-        slot_dict = {
-            "id": slot.id,
-            "date": slot.date,
-            "start_time": slot.start_time,
-            "end_time": slot.end_time,
-            "subject_name": slot.subject.name if slot.subject else None,
-            "subject_code": slot.subject.code if slot.subject else None,
-            "faculty_name": slot.faculty.name if slot.faculty else None,
-            "room_name": slot.room.name if slot.room else None,
-            "group_type": group_type,
-            "group_name": group_name,
-        }
-        result.append(slot_dict)
+    return [student_slot_dict(row, row.date, section_ids, batch_ids, slot_id=row.id) for row in rows]
+
+
+async def query_student_occurrences(db, section_ids: list[int], batch_ids: list[int], from_date: date, to_date: date) -> list[dict]:
+    groups = []
+    if section_ids:
+        groups.append(RecurringSlot.section_id.in_(section_ids))
+    if batch_ids:
+        groups.append(RecurringSlot.batch_id.in_(batch_ids))
+    if not groups:
+        return []
+    
+    occurrences = await query_recurring_occurrences(db, or_(*groups), from_date=from_date, to_date=to_date)
+    return [
+        student_slot_dict(row, day, section_ids, batch_ids, recurring_slot_id=row.id)
+        for row, day in occurrences
+    ]
+
+
+def student_slot_dict(row, day: date, section_ids: list[int], batch_ids: list[int], slot_id=None, recurring_slot_id=None) -> dict:
+    group_type = None
+    group_name = None
     
+    if row.section_id is not None and row.section_id in section_ids:
+        group_type = "section"
+        group_name = row.section_name
+    elif row.batch_id is not None and row.batch_id in batch_ids:
+        group_type = "batch"
+        group_name = row.batch_name
+    
+    return {
+        "id": slot_id,
+        "recurring_slot_id": recurring_slot_id,
+        "date": day,
+        "start_time": row.start_time,
+        "end_time": row.end_time,
+        "subject_name": row.subject_name,
+        "subject_code": row.subject_code,
+        "faculty_name": row.faculty_name,
+        "room_name": row.room_name,
+        "group_type": group_type,
+        "group_name": group_name,
+    }
+
+
+@app.get("/students/{student_id}/timetable", response_model=list[StudentTimetableSlot])
+async def get_student_timetable(
+    student_id: str,
+    request: Request,
+    response: Response,
+    date: Optional[date] = None,
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    db=Depends(get_read_db)
+):
+    if date is not None:
+        from_date = to_date = date
+    if from_date is None or to_date is None:
+        raise HTTPException(400, "Provide either date or both from and to")
+    if to_date < from_date:
+        raise HTTPException(400, "to must be on or after from")
+    if (to_date - from_date).days >= MAX_STUDENT_TIMETABLE_DAYS:
+        raise HTTPException(400, f"Date range cannot exceed {MAX_STUDENT_TIMETABLE_DAYS} days")
+    
+    section_ids, batch_ids, versions = await get_student_groups(db, student_id)
+    etag = make_digest_etag("student", student_id, from_date.isoformat(), to_date.isoformat(), versions)
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    
+    cache_key = f"timetable:student:{student_id}:{from_date.isoformat()}:{to_date.isoformat()}:{etag}"
+    result = timetable_cache.get(cache_key)
+    if result is None:
+        result = await query_student_slots(
+            db, section_ids, batch_ids,
+            TimetableSlot.date >= from_date,
+            TimetableSlot.date <= to_date
+        )
+        occurrences = await query_student_occurrences(db, section_ids, batch_ids, from_date, to_date)
+        if occurrences:
+            result += occurrences
+            result.sort(key=lambda slot: (slot["date"], slot["start_time"]))
+        tags = [student_tag(student_id)]
+        tags += [section_tag(sid) for sid in section_ids]
+        tags += [batch_tag(bid) for bid in batch_ids]
+        timetable_cache.set(cache_key, result, tags=tags)
     return result
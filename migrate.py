@@ -0,0 +1,30 @@
+"""
+Apply the SQL files in migrations/ that have not been applied yet, in name order.
+
+Fresh databases get the full schema from create_tables.py; existing ones are
+brought up to date with `python migrate.py`.
+"""
+from pathlib import Path
+
+from sqlalchemy import text
+
+from db import engine
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+
+with engine.begin() as conn:
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "name VARCHAR PRIMARY KEY, applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+    ))
+    applied = set(conn.execute(text("SELECT name FROM schema_migrations")).scalars())
+
+for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+    if path.name in applied:
+        continue
+    with engine.begin() as conn:
+        conn.exec_driver_sql(path.read_text())
+        conn.execute(text("INSERT INTO schema_migrations (name) VALUES (:name)"), {"name": path.name})
+    print(f"Applied {path.name}")
+
+print("Migrations up to date!")
@@ -0,0 +1,4 @@
+-- Per-term/section/batch timetable version counters used for ETags.
+ALTER TABLE academic_terms ADD COLUMN IF NOT EXISTS timetable_version INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE sections ADD COLUMN IF NOT EXISTS timetable_version INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE batches ADD COLUMN IF NOT EXISTS timetable_version INTEGER NOT NULL DEFAULT 0;
@@ -0,0 +1,5 @@
+-- Student timetable lookups: student -> active groups, then slots by date and group.
+CREATE INDEX IF NOT EXISTS idx_student_group_map_student_active
+    ON student_group_map (student_id, is_active) INCLUDE (group_type, group_id);
+CREATE INDEX IF NOT EXISTS idx_timetable_slots_date_section ON timetable_slots (date, section_id);
+CREATE INDEX IF NOT EXISTS idx_timetable_slots_date_batch ON timetable_slots (date, batch_id);
@@ -0,0 +1,220 @@
+-- Per-organisation counts of active courses, terms, subjects, faculties, rooms
+-- and timetable slots for the dashboard (read with DASHBOARD_COUNTERS=1).
+-- Kept current by statement-level triggers, so bulk inserts, generate and
+-- slot deletes each cost one counter update per statement, not per row.
+CREATE TABLE IF NOT EXISTS organisation_counters (
+    organisation_id INTEGER PRIMARY KEY REFERENCES organisations (id) ON DELETE CASCADE,
+    courses INTEGER NOT NULL DEFAULT 0,
+    terms INTEGER NOT NULL DEFAULT 0,
+    subjects INTEGER NOT NULL DEFAULT 0,
+    faculties INTEGER NOT NULL DEFAULT 0,
+    rooms INTEGER NOT NULL DEFAULT 0,
+    timetable_slots INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT now()
+);
+
+-- Add one to `counter` for each entry in `added` and subtract one for each in
+-- `removed` (both arrays of organisation ids, repeated once per row).
+CREATE OR REPLACE FUNCTION apply_organisation_counter(counter TEXT, added INTEGER[], removed INTEGER[])
+RETURNS VOID LANGUAGE plpgsql AS $$
+BEGIN
+    EXECUTE
+        'INSERT INTO organisation_counters AS c (organisation_id, ' || quote_ident(counter) || ') '
+        'SELECT org_id, sum(delta) FROM ('
+        '    SELECT unnest($1) AS org_id, 1 AS delta'
+        '    UNION ALL SELECT unnest($2), -1'
+        ') d WHERE org_id IS NOT NULL GROUP BY org_id HAVING sum(delta) <> 0 '
+        'ON CONFLICT (organisation_id) DO UPDATE SET '
+        || quote_ident(counter) || ' = c.' || quote_ident(counter) || ' + EXCLUDED.' || quote_ident(counter)
+        || ', updated_at = now()'
+    USING added, removed;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION count_courses() RETURNS TRIGGER LANGUAGE plpgsql AS $$
+DECLARE
+    added INTEGER[] := '{}';
+    removed INTEGER[] := '{}';
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        added := ARRAY(SELECT d.organisation_id FROM new_rows r
+                       JOIN departments d ON d.id = r.department_id WHERE r.is_active);
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        removed := ARRAY(SELECT d.organisation_id FROM old_rows r
+                         JOIN departments d ON d.id = r.department_id WHERE r.is_active);
+    END IF;
+    PERFORM apply_organisation_counter('courses', added, removed);
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION count_terms() RETURNS TRIGGER LANGUAGE plpgsql AS $$
+DECLARE
+    added INTEGER[] := '{}';
+    removed INTEGER[] := '{}';
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        added := ARRAY(SELECT d.organisation_id FROM new_rows r
+                       JOIN courses c ON c.id = r.course_id
+                       JOIN departments d ON d.id = c.department_id WHERE r.is_active);
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        removed := ARRAY(SELECT d.organisation_id FROM old_rows r
+                         JOIN courses c ON c.id = r.course_id
+                         JOIN departments d ON d.id = c.department_id WHERE r.is_active);
+    END IF;
+    PERFORM apply_organisation_counter('terms', added, removed);
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION count_subjects() RETURNS TRIGGER LANGUAGE plpgsql AS $$
+DECLARE
+    added INTEGER[] := '{}';
+    removed INTEGER[] := '{}';
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        added := ARRAY(SELECT d.organisation_id FROM new_rows r
+                       JOIN academic_terms t ON t.id = r.academic_term_id
+                       JOIN courses c ON c.id = t.course_id
+                       JOIN departments d ON d.id = c.department_id WHERE r.is_active);
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        removed := ARRAY(SELECT d.organisation_id FROM old_rows r
+                         JOIN academic_terms t ON t.id = r.academic_term_id
+                         JOIN courses c ON c.id = t.course_id
+                         JOIN departments d ON d.id = c.department_id WHERE r.is_active);
+    END IF;
+    PERFORM apply_organisation_counter('subjects', added, removed);
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION count_faculties() RETURNS TRIGGER LANGUAGE plpgsql AS $$
+DECLARE
+    added INTEGER[] := '{}';
+    removed INTEGER[] := '{}';
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        added := ARRAY(SELECT d.organisation_id FROM new_rows r
+                       JOIN departments d ON d.id = r.department_id WHERE r.is_active);
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        removed := ARRAY(SELECT d.organisation_id FROM old_rows r
+                         JOIN departments d ON d.id = r.department_id WHERE r.is_active);
+    END IF;
+    PERFORM apply_organisation_counter('faculties', added, removed);
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION count_rooms() RETURNS TRIGGER LANGUAGE plpgsql AS $$
+DECLARE
+    added INTEGER[] := '{}';
+    removed INTEGER[] := '{}';
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        added := ARRAY(SELECT d.organisation_id FROM new_rows r
+                       JOIN departments d ON d.id = r.department_id WHERE r.is_active);
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        removed := ARRAY(SELECT d.organisation_id FROM old_rows r
+                         JOIN departments d ON d.id = r.department_id WHERE r.is_active);
+    END IF;
+    PERFORM apply_organisation_counter('rooms', added, removed);
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION count_timetable_slots() RETURNS TRIGGER LANGUAGE plpgsql AS $$
+DECLARE
+    added INTEGER[] := '{}';
+    removed INTEGER[] := '{}';
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        added := ARRAY(SELECT d.organisation_id FROM new_rows r
+                       JOIN academic_terms t ON t.id = r.academic_term_id
+                       JOIN courses c ON c.id = t.course_id
+                       JOIN departments d ON d.id = c.department_id WHERE r.is_active);
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        removed := ARRAY(SELECT d.organisation_id FROM old_rows r
+                         JOIN academic_terms t ON t.id = r.academic_term_id
+                         JOIN courses c ON c.id = t.course_id
+                         JOIN departments d ON d.id = c.department_id WHERE r.is_active);
+    END IF;
+    PERFORM apply_organisation_counter('timetable_slots', added, removed);
+    RETURN NULL;
+END;
+$$;
+
+-- Transition tables allow one event per trigger, hence three triggers per table.
+DO $$
+DECLARE
+    tables TEXT[][] := ARRAY[
+        ['courses', 'count_courses'],
+        ['academic_terms', 'count_terms'],
+        ['subjects', 'count_subjects'],
+        ['faculties', 'count_faculties'],
+        ['rooms', 'count_rooms'],
+        ['timetable_slots', 'count_timetable_slots']
+    ];
+    tbl TEXT;
+    fn TEXT;
+BEGIN
+    FOR i IN 1 .. array_length(tables, 1) LOOP
+        tbl := tables[i][1];
+        fn := tables[i][2];
+        EXECUTE 'DROP TRIGGER IF EXISTS ' || quote_ident(tbl || '_counters_insert') || ' ON ' || quote_ident(tbl);
+        EXECUTE 'DROP TRIGGER IF EXISTS ' || quote_ident(tbl || '_counters_update') || ' ON ' || quote_ident(tbl);
+        EXECUTE 'DROP TRIGGER IF EXISTS ' || quote_ident(tbl || '_counters_delete') || ' ON ' || quote_ident(tbl);
+        EXECUTE 'CREATE TRIGGER ' || quote_ident(tbl || '_counters_insert') || ' AFTER INSERT ON ' || quote_ident(tbl)
+            || ' REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION ' || quote_ident(fn) || '()';
+        EXECUTE 'CREATE TRIGGER ' || quote_ident(tbl || '_counters_update') || ' AFTER UPDATE ON ' || quote_ident(tbl)
+            || ' REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION '
+            || quote_ident(fn) || '()';
+        EXECUTE 'CREATE TRIGGER ' || quote_ident(tbl || '_counters_delete') || ' AFTER DELETE ON ' || quote_ident(tbl)
+            || ' REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION ' || quote_ident(fn) || '()';
+    END LOOP;
+END;
+$$;
+
+-- Full recount, used for the backfill and by POST /super-admin/dashboard/counters/refresh
+-- after data was changed outside the app (e.g. a cascading hard delete of a department).
+CREATE OR REPLACE FUNCTION refresh_organisation_counters() RETURNS VOID LANGUAGE plpgsql AS $$
+BEGIN
+    LOCK TABLE organisation_counters IN EXCLUSIVE MODE;
+    INSERT INTO organisation_counters AS oc
+        (organisation_id, courses, terms, subjects, faculties, rooms, timetable_slots, updated_at)
+    SELECT
+        o.id,
+        (SELECT count(*) FROM courses c JOIN departments d ON d.id = c.department_id
+         WHERE d.organisation_id = o.id AND c.is_active),
+        (SELECT count(*) FROM academic_terms t JOIN courses c ON c.id = t.course_id
+         JOIN departments d ON d.id = c.department_id
+         WHERE d.organisation_id = o.id AND t.is_active),
+        (SELECT count(*) FROM subjects s JOIN academic_terms t ON t.id = s.academic_term_id
+         JOIN courses c ON c.id = t.course_id JOIN departments d ON d.id = c.department_id
+         WHERE d.organisation_id = o.id AND s.is_active),
+        (SELECT count(*) FROM faculties f JOIN departments d ON d.id = f.department_id
+         WHERE d.organisation_id = o.id AND f.is_active),
+        (SELECT count(*) FROM rooms r JOIN departments d ON d.id = r.department_id
+         WHERE d.organisation_id = o.id AND r.is_active),
+        (SELECT count(*) FROM timetable_slots ts JOIN academic_terms t ON t.id = ts.academic_term_id
+         JOIN courses c ON c.id = t.course_id JOIN departments d ON d.id = c.department_id
+         WHERE d.organisation_id = o.id AND ts.is_active),
+        now()
+    FROM organisations o
+    ON CONFLICT (organisation_id) DO UPDATE SET
+        courses = EXCLUDED.courses,
+        terms = EXCLUDED.terms,
+        subjects = EXCLUDED.subjects,
+        faculties = EXCLUDED.faculties,
+        rooms = EXCLUDED.rooms,
+        timetable_slots = EXCLUDED.timetable_slots,
+        updated_at = EXCLUDED.updated_at;
+END;
+$$;
+
+SELECT refresh_organisation_counters();
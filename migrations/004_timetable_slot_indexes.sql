@@ -0,0 +1,21 @@
+-- Partial indexes over active slots, one per hot query shape:
+--   term timetable, term delete/generate checks, load_term_grid -> (academic_term_id)
+--   section timetable, ordered by date, start_time               -> (section_id, date, start_time)
+--   batch and student timetables                                  -> (batch_id, date, start_time)
+--   check_faculty_hours, weekly load (index-only)                 -> (faculty_id, date) + times
+--   subject delete check                                          -> (subject_id)
+-- Room and conflict lookups are already served by the unique constraints and
+-- the (date, section_id)/(date, batch_id) indexes. Check the plans with
+-- explain_indexes.py.
+CREATE INDEX IF NOT EXISTS idx_timetable_slots_term_active
+    ON timetable_slots (academic_term_id) WHERE is_active;
+CREATE INDEX IF NOT EXISTS idx_timetable_slots_section_active
+    ON timetable_slots (section_id, date, start_time) WHERE is_active;
+CREATE INDEX IF NOT EXISTS idx_timetable_slots_batch_active
+    ON timetable_slots (batch_id, date, start_time) WHERE is_active;
+CREATE INDEX IF NOT EXISTS idx_timetable_slots_faculty_active
+    ON timetable_slots (faculty_id, date) INCLUDE (start_time, end_time) WHERE is_active;
+CREATE INDEX IF NOT EXISTS idx_timetable_slots_subject_active
+    ON timetable_slots (subject_id) WHERE is_active;
+
+ANALYZE timetable_slots;
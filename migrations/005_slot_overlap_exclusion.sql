@@ -0,0 +1,27 @@
+-- Overlap exclusion per faculty, room, section and batch over active slots, so
+-- PostgreSQL rejects an overlapping slot at insert time (SQLSTATE 23P01) and
+-- writers can skip the conflict pre-check (SLOT_OVERLAP_CONSTRAINTS=1).
+-- Ranges are half-open, so back-to-back slots do not clash, matching
+-- find_conflicting_slots. Adding the constraints fails if active slots already
+-- overlap; resolve those first. CREATE EXTENSION needs a role allowed to do it.
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+ALTER TABLE timetable_slots DROP CONSTRAINT IF EXISTS excl_timetable_slots_faculty_overlap;
+ALTER TABLE timetable_slots ADD CONSTRAINT excl_timetable_slots_faculty_overlap
+    EXCLUDE USING gist (faculty_id WITH =, tsrange("date" + start_time, "date" + end_time) WITH &&)
+    WHERE (is_active);
+
+ALTER TABLE timetable_slots DROP CONSTRAINT IF EXISTS excl_timetable_slots_room_overlap;
+ALTER TABLE timetable_slots ADD CONSTRAINT excl_timetable_slots_room_overlap
+    EXCLUDE USING gist (room_id WITH =, tsrange("date" + start_time, "date" + end_time) WITH &&)
+    WHERE (is_active);
+
+ALTER TABLE timetable_slots DROP CONSTRAINT IF EXISTS excl_timetable_slots_section_overlap;
+ALTER TABLE timetable_slots ADD CONSTRAINT excl_timetable_slots_section_overlap
+    EXCLUDE USING gist (section_id WITH =, tsrange("date" + start_time, "date" + end_time) WITH &&)
+    WHERE (is_active);
+
+ALTER TABLE timetable_slots DROP CONSTRAINT IF EXISTS excl_timetable_slots_batch_overlap;
+ALTER TABLE timetable_slots ADD CONSTRAINT excl_timetable_slots_batch_overlap
+    EXCLUDE USING gist (batch_id WITH =, tsrange("date" + start_time, "date" + end_time) WITH &&)
+    WHERE (is_active);
@@ -0,0 +1,46 @@
+-- Weekly recurring slots, expanded into dated occurrences when read.
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'dayofweek') THEN
+        CREATE TYPE dayofweek AS ENUM
+            ('MONDAY', 'TUESDAY', 'WEDNESDAY', 'THURSDAY', 'FRIDAY', 'SATURDAY', 'SUNDAY');
+    END IF;
+END;
+$$;
+
+CREATE TABLE IF NOT EXISTS recurring_slots (
+    id SERIAL PRIMARY KEY,
+    academic_term_id INTEGER NOT NULL REFERENCES academic_terms (id) ON DELETE CASCADE,
+    subject_id INTEGER NOT NULL REFERENCES subjects (id) ON DELETE CASCADE,
+    faculty_id INTEGER NOT NULL REFERENCES faculties (id) ON DELETE CASCADE,
+    section_id INTEGER REFERENCES sections (id) ON DELETE CASCADE,
+    batch_id INTEGER REFERENCES batches (id) ON DELETE CASCADE,
+    room_id INTEGER REFERENCES rooms (id) ON DELETE CASCADE,
+    day_of_week dayofweek NOT NULL,
+    start_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    start_date DATE NOT NULL,
+    end_date DATE NOT NULL,
+    modality VARCHAR(20),
+    is_active BOOLEAN,
+    created_at DATE DEFAULT now(),
+    updated_at DATE DEFAULT now(),
+    CONSTRAINT check_recurring_slot_times CHECK (end_time > start_time),
+    CONSTRAINT check_recurring_slot_dates CHECK (end_date >= start_date),
+    CONSTRAINT check_recurring_section_or_batch CHECK (section_id IS NOT NULL OR batch_id IS NOT NULL)
+);
+CREATE INDEX IF NOT EXISTS ix_recurring_slots_id ON recurring_slots (id);
+CREATE INDEX IF NOT EXISTS idx_recurring_slots_term ON recurring_slots (academic_term_id);
+CREATE INDEX IF NOT EXISTS idx_recurring_slots_faculty_day ON recurring_slots (faculty_id, day_of_week);
+CREATE INDEX IF NOT EXISTS idx_recurring_slots_room_day ON recurring_slots (room_id, day_of_week);
+CREATE INDEX IF NOT EXISTS idx_recurring_slots_section_day ON recurring_slots (section_id, day_of_week);
+CREATE INDEX IF NOT EXISTS idx_recurring_slots_batch_day ON recurring_slots (batch_id, day_of_week);
+
+CREATE TABLE IF NOT EXISTS recurring_slot_exceptions (
+    id SERIAL PRIMARY KEY,
+    recurring_slot_id INTEGER NOT NULL REFERENCES recurring_slots (id) ON DELETE CASCADE,
+    date DATE NOT NULL,
+    created_at DATE DEFAULT now(),
+    CONSTRAINT unique_recurring_slot_exception UNIQUE (recurring_slot_id, date)
+);
+CREATE INDEX IF NOT EXISTS ix_recurring_slot_exceptions_id ON recurring_slot_exceptions (id);
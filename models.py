@@ -1,9 +1,9 @@
 from sqlalchemy import (
-    Column, Integer, String, Time, ForeignKey, Date, Enum, Boolean, 
+    Column, Integer, String, Time, ForeignKey, Date, DateTime, Enum, Boolean, 
     UniqueConstraint, CheckConstraint, Index
 )
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from db import Base
 import enum
 
@@ -178,6 +178,7 @@ class AcademicTerm(Base):
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=False)
 
+    timetable_version = Column(Integer, nullable=False, default=0, server_default="0")
     is_active = Column(Boolean, default=True)
     created_at = Column(Date, server_default=func.now())
     updated_at = Column(Date, server_default=func.now(), onupdate=func.now())
@@ -237,6 +238,7 @@ class Section(Base):
     academic_term_id = Column(Integer, ForeignKey("academic_terms.id", ondelete="CASCADE"), nullable=False)
     name = Column(String, nullable=False)
     max_capacity = Column(Integer, default=60)
+    timetable_version = Column(Integer, nullable=False, default=0, server_default="0")
     is_active = Column(Boolean, default=True)
     created_at = Column(Date, server_default=func.now())
     updated_at = Column(Date, server_default=func.now(), onupdate=func.now())
@@ -261,6 +263,7 @@ class Batch(Base):
     subject_id = Column(Integer, ForeignKey("subjects.id", ondelete="CASCADE"), nullable=False)
     name = Column(String, nullable=False)
     max_capacity = Column(Integer, default=30)
+    timetable_version = Column(Integer, nullable=False, default=0, server_default="0")
     is_active = Column(Boolean, default=True)
     created_at = Column(Date, server_default=func.now())
     updated_at = Column(Date, server_default=func.now(), onupdate=func.now())
@@ -390,6 +393,75 @@ class TimetableSlot(Base):
         UniqueConstraint("room_id", "date", "start_time", "end_time", name="unique_room_slot"),
         CheckConstraint("end_time > start_time", name="check_slot_times"),
         CheckConstraint("section_id IS NOT NULL OR batch_id IS NOT NULL", name="check_section_or_batch"),
+        Index("idx_timetable_slots_date_section", "date", "section_id"),
+        Index("idx_timetable_slots_date_batch", "date", "batch_id"),
+        # Partial indexes over active slots for the hot reads (migrations/004)
+        Index("idx_timetable_slots_term_active", "academic_term_id", postgresql_where=text("is_active")),
+        Index(
+            "idx_timetable_slots_section_active", "section_id", "date", "start_time",
+            postgresql_where=text("is_active")
+        ),
+        Index(
+            "idx_timetable_slots_batch_active", "batch_id", "date", "start_time",
+            postgresql_where=text("is_active")
+        ),
+        Index(
+            "idx_timetable_slots_faculty_active", "faculty_id", "date",
+            postgresql_include=["start_time", "end_time"], postgresql_where=text("is_active")
+        ),
+        Index("idx_timetable_slots_subject_active", "subject_id", postgresql_where=text("is_active")),
+    )
+
+
+# =========================
+# RECURRING TIMETABLE SLOTS
+# =========================
+class RecurringSlot(Base):
+    """A class held every week on `day_of_week` from `start_date` to `end_date`, minus its exceptions."""
+    __tablename__ = "recurring_slots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    academic_term_id = Column(Integer, ForeignKey("academic_terms.id", ondelete="CASCADE"), nullable=False)
+    subject_id = Column(Integer, ForeignKey("subjects.id", ondelete="CASCADE"), nullable=False)
+    faculty_id = Column(Integer, ForeignKey("faculties.id", ondelete="CASCADE"), nullable=False)
+    section_id = Column(Integer, ForeignKey("sections.id", ondelete="CASCADE"), nullable=True)
+    batch_id = Column(Integer, ForeignKey("batches.id", ondelete="CASCADE"), nullable=True)
+    room_id = Column(Integer, ForeignKey("rooms.id", ondelete="CASCADE"), nullable=True)
+    day_of_week = Column(Enum(DayOfWeek), nullable=False)
+    start_time = Column(Time, nullable=False)
+    end_time = Column(Time, nullable=False)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    modality = Column(String(20), default="Offline")
+    is_active = Column(Boolean, default=True)
+    created_at = Column(Date, server_default=func.now())
+    updated_at = Column(Date, server_default=func.now(), onupdate=func.now())
+
+    exceptions = relationship("RecurringSlotException", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        CheckConstraint("end_time > start_time", name="check_recurring_slot_times"),
+        CheckConstraint("end_date >= start_date", name="check_recurring_slot_dates"),
+        CheckConstraint("section_id IS NOT NULL OR batch_id IS NOT NULL", name="check_recurring_section_or_batch"),
+        Index("idx_recurring_slots_term", "academic_term_id"),
+        Index("idx_recurring_slots_faculty_day", "faculty_id", "day_of_week"),
+        Index("idx_recurring_slots_room_day", "room_id", "day_of_week"),
+        Index("idx_recurring_slots_section_day", "section_id", "day_of_week"),
+        Index("idx_recurring_slots_batch_day", "batch_id", "day_of_week"),
+    )
+
+
+class RecurringSlotException(Base):
+    """A date on which a recurring slot does not take place."""
+    __tablename__ = "recurring_slot_exceptions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    recurring_slot_id = Column(Integer, ForeignKey("recurring_slots.id", ondelete="CASCADE"), nullable=False)
+    date = Column(Date, nullable=False)
+    created_at = Column(Date, server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("recurring_slot_id", "date", name="unique_recurring_slot_exception"),
     )
 
 
@@ -436,4 +508,25 @@ class StudentGroupMap(Base):
         UniqueConstraint("group_type", "group_id", "student_id", name="unique_student_per_group"),
         Index("idx_student_group_map_group", "group_type", "group_id"),
         Index("idx_student_group_map_active", "is_active"),
+        Index(
+            "idx_student_group_map_student_active", "student_id", "is_active",
+            postgresql_include=["group_type", "group_id"]
+        ),
     )
+
+
+# =========================
+# ORGANISATION COUNTERS (dashboard)
+# =========================
+# Maintained by the triggers in migrations/003_organisation_counters.sql
+class OrganisationCounter(Base):
+    __tablename__ = "organisation_counters"
+
+    organisation_id = Column(Integer, ForeignKey("organisations.id", ondelete="CASCADE"), primary_key=True)
+    courses = Column(Integer, nullable=False, default=0, server_default="0")
+    terms = Column(Integer, nullable=False, default=0, server_default="0")
+    subjects = Column(Integer, nullable=False, default=0, server_default="0")
+    faculties = Column(Integer, nullable=False, default=0, server_default="0")
+    rooms = Column(Integer, nullable=False, default=0, server_default="0")
+    timetable_slots = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime, server_default=func.now())
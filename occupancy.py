@@ -0,0 +1,198 @@
+"""
+Bitset occupancy grid for timetable resources.
+
+Every (dimension, resource id, date) owns an integer whose bits are the
+quanta of that day (5 minutes by default), so asking whether a faculty, room,
+section or batch is free is a single AND. Bit hits are confirmed against the
+exact slot intervals, so quantum rounding never reports a false conflict.
+
+The process-wide `grid` is loaded lazily one date at a time and kept in sync
+by the slot write endpoints. It is opt-in (TIMETABLE_OCCUPANCY_GRID=1)
+because each process only sees its own writes: run it with a single API
+process, or leave it off and conflict checks fall back to SQL.
+"""
+import os
+import threading
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from conflicts import CONFLICT_DIMENSIONS, RESOURCE_COLUMNS, slot_resources
+from db import env_flag
+from models import TimetableSlot
+
+
+QUANTUM_MINUTES = int(os.getenv("OCCUPANCY_QUANTUM_MINUTES", "5"))
+OCCUPANCY_GRID_ENABLED = env_flag("TIMETABLE_OCCUPANCY_GRID", False)
+
+SLOT_COLUMNS = (
+    TimetableSlot.id,
+    TimetableSlot.faculty_id,
+    TimetableSlot.room_id,
+    TimetableSlot.section_id,
+    TimetableSlot.batch_id,
+    TimetableSlot.date,
+    TimetableSlot.start_time,
+    TimetableSlot.end_time,
+)
+
+
+def _minutes(t) -> int:
+    return t.hour * 60 + t.minute
+
+
+class OccupancyGrid:
+    def __init__(self, quantum_minutes: int = QUANTUM_MINUTES):
+        self.quantum = quantum_minutes
+        self._bits = {}
+        self._intervals = {}
+        self._keys_by_ref = {}
+        self._loaded_dates = set()
+        self._lock = threading.RLock()
+
+    def mask(self, start, end) -> int:
+        first = _minutes(start) // self.quantum
+        last = -(-_minutes(end) // self.quantum)
+        return ((1 << (last - first)) - 1) << first
+
+    def add(self, slot, ref) -> None:
+        """Mark `slot` (anything with resource ids, date and times) as occupying its resources."""
+        mask = self.mask(slot.start_time, slot.end_time)
+        with self._lock:
+            self.remove(ref)
+            keys = []
+            for dim, rid in slot_resources(slot).items():
+                key = (dim, rid, slot.date)
+                self._bits[key] = self._bits.get(key, 0) | mask
+                self._intervals.setdefault(key, {})[ref] = (slot.start_time, slot.end_time, mask)
+                keys.append(key)
+            self._keys_by_ref[ref] = keys
+
+    def remove(self, ref) -> None:
+        with self._lock:
+            for key in self._keys_by_ref.pop(ref, ()):
+                intervals = self._intervals[key]
+                del intervals[ref]
+                if intervals:
+                    bits = 0
+                    for _, _, mask in intervals.values():
+                        bits |= mask
+                    self._bits[key] = bits
+                else:
+                    del self._intervals[key]
+                    del self._bits[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._bits.clear()
+            self._intervals.clear()
+            self._keys_by_ref.clear()
+            self._loaded_dates.clear()
+
+    def is_free(self, dimension: str, resource_id: int, day, start, end) -> bool:
+        key = (dimension, resource_id, day)
+        mask = self.mask(start, end)
+        with self._lock:
+            if not self._bits.get(key, 0) & mask:
+                return True
+            return not any(
+                s < end and e > start for s, e, _ in self._intervals.get(key, {}).values()
+            )
+
+    def conflicts(self, data, exclude_ref=None) -> dict[str, list]:
+        """Refs of the slots overlapping `data`, per dimension (same shape as `find_conflicting_slots`)."""
+        mask = self.mask(data.start_time, data.end_time)
+        found = {}
+        with self._lock:
+            for dim, rid in slot_resources(data).items():
+                key = (dim, rid, data.date)
+                if not self._bits.get(key, 0) & mask:
+                    continue
+                for ref, (start, end, _) in self._intervals[key].items():
+                    if ref != exclude_ref and start < data.end_time and end > data.start_time:
+                        found.setdefault(dim, []).append(ref)
+        return found
+
+    def occupancy(self):
+        """Yield (dimension, resource id, date, bits) for every occupied resource-day."""
+        with self._lock:
+            items = list(self._bits.items())
+        for (dim, rid, day), bits in items:
+            yield dim, rid, day, bits
+
+    def load_dates(self, db: Session, dates) -> None:
+        """Load every active slot on the given dates that has not been loaded yet."""
+        with self._lock:
+            missing = sorted(set(dates) - self._loaded_dates)
+            if not missing:
+                return
+            rows = db.query(*SLOT_COLUMNS).filter(
+                TimetableSlot.date.in_(missing),
+                TimetableSlot.is_active == True,
+            ).all()
+            for row in rows:
+                self.add(row, row.id)
+            self._loaded_dates.update(missing)
+
+
+def load_grid_for_slots(db: Session, slots) -> OccupancyGrid:
+    """Grid of every active slot that could clash with `slots`, fetched in one query."""
+    grid = OccupancyGrid()
+    if not slots:
+        return grid
+
+    resource_ids = {dim: set() for dim in CONFLICT_DIMENSIONS}
+    for data in slots:
+        for dim, rid in slot_resources(data).items():
+            resource_ids[dim].add(rid)
+
+    rows = db.query(*SLOT_COLUMNS).filter(
+        TimetableSlot.date.in_(sorted({data.date for data in slots})),
+        TimetableSlot.is_active == True,
+        or_(*(RESOURCE_COLUMNS[dim].in_(sorted(ids)) for dim, ids in resource_ids.items() if ids)),
+    ).order_by(TimetableSlot.id).all()
+
+    for row in rows:
+        grid.add(row, row.id)
+    return grid
+
+
+def load_term_grid(db: Session, term_id: int) -> OccupancyGrid:
+    grid = OccupancyGrid()
+    rows = db.query(*SLOT_COLUMNS).filter(
+        TimetableSlot.academic_term_id == term_id,
+        TimetableSlot.is_active == True,
+    ).all()
+    for row in rows:
+        grid.add(row, row.id)
+    return grid
+
+
+# =========================
+# PROCESS-WIDE GRID
+# =========================
+grid = OccupancyGrid()
+
+
+def track_slot_saved(slot) -> None:
+    if OCCUPANCY_GRID_ENABLED:
+        if slot.is_active:
+            grid.add(slot, slot.id)
+        else:
+            grid.remove(slot.id)
+
+
+def track_slots_created(slots, slot_ids) -> None:
+    if OCCUPANCY_GRID_ENABLED:
+        for data, slot_id in zip(slots, slot_ids):
+            grid.add(data, slot_id)
+
+
+def track_slot_deleted(slot_id: int) -> None:
+    if OCCUPANCY_GRID_ENABLED:
+        grid.remove(slot_id)
+
+
+def track_bulk_change() -> None:
+    if OCCUPANCY_GRID_ENABLED:
+        grid.clear()
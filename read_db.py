@@ -0,0 +1,201 @@
+"""
+Read sessions for the hot read endpoints.
+
+`get_read_db` yields an object with the AsyncSession read API (`execute`,
+`scalar`, `scalars`). With DB_ASYNC_READS=1 it is a real AsyncSession on an
+asyncpg engine, so concurrency is bounded by the pool instead of the anyio
+threadpool; otherwise it wraps the sync SessionLocal and runs each statement
+on the threadpool, which behaves like the previous sync endpoints.
+
+When DATABASE_REPLICA_URLS is set, read sessions go to a healthy replica
+(see db.ReplicaRouter) unless the client wrote recently.
+"""
+import os
+from typing import Optional
+
+from fastapi import Request
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
+
+from cache import LRUCache
+from db import (
+    DATABASE_URL, SessionLocal, env_flag, replica_router, is_connection_error,
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING,
+    DB_STATEMENT_TIMEOUT_MS, DB_PGBOUNCER,
+)
+
+DB_ASYNC_READS = env_flag("DB_ASYNC_READS", False)
+
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+
+def async_database_url(url: str):
+    url = make_url(url)
+    backend = url.get_backend_name()
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+def build_async_engine(url: str):
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = async_database_url(url)
+    backend = url.get_backend_name()
+    kwargs = {"pool_pre_ping": DB_POOL_PRE_PING}
+    connect_args = {}
+
+    if DB_PGBOUNCER:
+        kwargs["poolclass"] = NullPool
+        if backend == "postgresql":
+            # asyncpg's prepared statement cache breaks under transaction pooling
+            connect_args["statement_cache_size"] = 0
+    else:
+        kwargs.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+        if DB_STATEMENT_TIMEOUT_MS and backend == "postgresql":
+            connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+
+    engine = create_async_engine(url, connect_args=connect_args, **kwargs)
+
+    if DB_PGBOUNCER and DB_STATEMENT_TIMEOUT_MS and backend == "postgresql":
+        @event.listens_for(engine.sync_engine, "begin")
+        def set_statement_timeout(conn):
+            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {DB_STATEMENT_TIMEOUT_MS}")
+
+    return engine
+
+
+if DB_ASYNC_READS:
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    async_engine = build_async_engine(DATABASE_URL)
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+    replica_async_sessions = {
+        replica.index: async_sessionmaker(build_async_engine(replica.url), expire_on_commit=False)
+        for replica in replica_router.replicas
+    }
+else:
+    async_engine = None
+    AsyncSessionLocal = None
+    replica_async_sessions = {}
+
+
+# =========================
+# READ-YOUR-WRITES
+# =========================
+# Clients that wrote within DB_REPLICA_STICKY_SECONDS read from the primary so
+# they do not see a replica that has not replayed their change yet.
+DB_REPLICA_STICKY_SECONDS = float(os.getenv("DB_REPLICA_STICKY_SECONDS", "5"))
+recent_writers = LRUCache(max_entries=10000, ttl_seconds=DB_REPLICA_STICKY_SECONDS)
+
+
+def client_key(request: Request) -> Optional[str]:
+    return request.headers.get("authorization")
+
+
+def mark_primary_write(request: Request) -> None:
+    key = client_key(request)
+    if key and replica_router.replicas:
+        recent_writers.set(key, True)
+
+
+def use_primary(request: Request) -> bool:
+    key = client_key(request)
+    return bool(key) and recent_writers.get(key) is not None
+
+
+# =========================
+# READ SESSIONS
+# =========================
+class ThreadedReadSession:
+    """
+    A sync Session behind the AsyncSession read API. Each statement runs on the
+    threadpool with its result buffered, and the connection is returned to the
+    pool before control goes back to the event loop, so a request never holds a
+    connection while waiting for a thread. A replica that drops the connection
+    is marked down and the statement is retried on the primary.
+    """
+
+    def __init__(self, replica=None):
+        self.replica = replica
+        self._session = replica.session_factory() if replica else SessionLocal()
+
+    def _run(self, fn):
+        try:
+            return fn(self._session)
+        except Exception as e:
+            if self.replica is None or not is_connection_error(e):
+                raise
+            replica_router.mark_down(self.replica, e)
+            self._session.close()
+            self.replica = None
+            self._session = SessionLocal()
+            return fn(self._session)
+        finally:
+            self._session.close()
+
+    async def execute(self, statement, params=None):
+        frozen = await run_in_threadpool(self._run, lambda s: s.execute(statement, params).freeze())
+        return frozen()
+
+    async def scalar(self, statement, params=None):
+        return await run_in_threadpool(self._run, lambda s: s.scalar(statement, params))
+
+    async def scalars(self, statement, params=None):
+        return (await self.execute(statement, params)).scalars()
+
+    async def close(self):
+        await run_in_threadpool(self._session.close)
+
+
+class AsyncReadSession:
+    """AsyncSession with the same replica fallback as ThreadedReadSession."""
+
+    def __init__(self, replica=None):
+        self.replica = replica
+        factory = replica_async_sessions[replica.index] if replica else AsyncSessionLocal
+        self._session = factory()
+
+    async def _run(self, fn):
+        try:
+            return await fn(self._session)
+        except Exception as e:
+            if self.replica is None or not is_connection_error(e):
+                raise
+            replica_router.mark_down(self.replica, e)
+            await self._session.close()
+            self.replica = None
+            self._session = AsyncSessionLocal()
+            return await fn(self._session)
+
+    async def execute(self, statement, params=None):
+        return await self._run(lambda s: s.execute(statement, params))
+
+    async def scalar(self, statement, params=None):
+        return await self._run(lambda s: s.scalar(statement, params))
+
+    async def scalars(self, statement, params=None):
+        return await self._run(lambda s: s.scalars(statement, params))
+
+    async def close(self):
+        await self._session.close()
+
+
+async def get_read_db(request: Request):
+    replica = None
+    if replica_router.replicas and not use_primary(request):
+        replica = await run_in_threadpool(replica_router.pick)
+
+    session = AsyncReadSession(replica) if AsyncSessionLocal is not None else ThreadedReadSession(replica)
+    try:
+        yield session
+    finally:
+        await session.close()
@@ -0,0 +1,216 @@
+"""
+Recurring weekly slots.
+
+A RecurringSlot is one class every week on `day_of_week` between its
+`start_date` and `end_date`, minus the dates listed as exceptions. Nothing is
+stored per occurrence: reads expand the rules for the requested window, and
+conflicts are found by comparing patterns (weekday, times, date range) rather
+than every dated occurrence.
+"""
+from datetime import date, timedelta
+from typing import NamedTuple, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from conflicts import CONFLICT_DIMENSIONS, RESOURCE_COLUMNS, slot_resources
+from models import DayOfWeek, RecurringSlot, RecurringSlotException, TimetableSlot
+
+
+WEEKDAYS = list(DayOfWeek)
+
+RECURRING_RESOURCE_COLUMNS = {
+    "faculty": RecurringSlot.faculty_id,
+    "room": RecurringSlot.room_id,
+    "section": RecurringSlot.section_id,
+    "batch": RecurringSlot.batch_id,
+}
+
+
+class Occurrence(NamedTuple):
+    """One dated occurrence of a recurring slot; usable wherever a slot's resources and times are read."""
+    recurring_slot_id: int
+    faculty_id: int
+    room_id: Optional[int]
+    section_id: Optional[int]
+    batch_id: Optional[int]
+    date: date
+    start_time: object
+    end_time: object
+
+
+# =========================
+# EXPANSION
+# =========================
+def weekday_of(day: date) -> DayOfWeek:
+    return WEEKDAYS[day.weekday()]
+
+
+def first_occurrence(day_of_week, start_date: date, end_date: date) -> Optional[date]:
+    offset = (WEEKDAYS.index(DayOfWeek(day_of_week)) - start_date.weekday()) % 7
+    first = start_date + timedelta(days=offset)
+    return first if first <= end_date else None
+
+
+def occurrence_dates(day_of_week, start_date: date, end_date: date, exceptions=()) -> list[date]:
+    """Dates of `day_of_week` from `start_date` to `end_date` (inclusive), skipping `exceptions`."""
+    dates = []
+    day = first_occurrence(day_of_week, start_date, end_date)
+    while day is not None and day <= end_date:
+        if day not in exceptions:
+            dates.append(day)
+        day += timedelta(days=7)
+    return dates
+
+
+def expand(rule, from_date: date = None, to_date: date = None, exceptions=()) -> list[Occurrence]:
+    start = max(rule.start_date, from_date) if from_date else rule.start_date
+    end = min(rule.end_date, to_date) if to_date else rule.end_date
+    return [
+        Occurrence(rule.id, rule.faculty_id, rule.room_id, rule.section_id, rule.batch_id, day, rule.start_time, rule.end_time)
+        for day in occurrence_dates(rule.day_of_week, start, end, exceptions)
+    ]
+
+
+def is_occurrence(rule, day: date) -> bool:
+    return rule.start_date <= day <= rule.end_date and weekday_of(day) == DayOfWeek(rule.day_of_week)
+
+
+def load_exceptions(db: Session, rule_ids) -> dict[int, set]:
+    exceptions = {}
+    if rule_ids:
+        rows = db.query(RecurringSlotException.recurring_slot_id, RecurringSlotException.date).filter(
+            RecurringSlotException.recurring_slot_id.in_(sorted(rule_ids))
+        ).all()
+        for row in rows:
+            exceptions.setdefault(row.recurring_slot_id, set()).add(row.date)
+    return exceptions
+
+
+def resource_filter(columns: dict, resource_ids: dict):
+    return or_(*(columns[dim].in_(sorted(ids)) for dim, ids in resource_ids.items() if ids))
+
+
+def load_occurrences(db: Session, from_date: date, to_date: date, resource_ids: dict[str, set]) -> list[Occurrence]:
+    """Occurrences between the two dates of every active recurring slot holding one of `resource_ids`."""
+    if not any(resource_ids.values()):
+        return []
+    rules = db.query(RecurringSlot).filter(
+        RecurringSlot.is_active == True,
+        RecurringSlot.start_date <= to_date,
+        RecurringSlot.end_date >= from_date,
+        resource_filter(RECURRING_RESOURCE_COLUMNS, resource_ids),
+    ).order_by(RecurringSlot.id).all()
+    exceptions = load_exceptions(db, {rule.id for rule in rules})
+    return [
+        occurrence
+        for rule in rules
+        for occurrence in expand(rule, from_date, to_date, exceptions.get(rule.id, ()))
+    ]
+
+
+# =========================
+# CONFLICTS
+# =========================
+class RecurringRules:
+    """Active recurring slots that could clash with a set of dated slots, checked in memory."""
+
+    def __init__(self, rules, exceptions: dict[int, set]):
+        self.rules = rules
+        self.exceptions = exceptions
+
+    @classmethod
+    def load(cls, db: Session, slots, exclude_rule_id: int = None) -> "RecurringRules":
+        resource_ids = {dim: set() for dim in CONFLICT_DIMENSIONS}
+        for data in slots:
+            for dim, rid in slot_resources(data).items():
+                resource_ids[dim].add(rid)
+        if not any(resource_ids.values()):
+            return cls([], {})
+
+        dates = {data.date for data in slots}
+        query = db.query(RecurringSlot).filter(
+            RecurringSlot.is_active == True,
+            RecurringSlot.day_of_week.in_(sorted({weekday_of(day) for day in dates})),
+            RecurringSlot.start_date <= max(dates),
+            RecurringSlot.end_date >= min(dates),
+            resource_filter(RECURRING_RESOURCE_COLUMNS, resource_ids),
+        )
+        if exclude_rule_id is not None:
+            query = query.filter(RecurringSlot.id != exclude_rule_id)
+        rules = query.order_by(RecurringSlot.id).all()
+        return cls(rules, load_exceptions(db, {rule.id for rule in rules}))
+
+    def conflicts(self, data) -> dict[str, list[int]]:
+        """Ids of the recurring slots with an occurrence overlapping `data`, per dimension."""
+        resources = slot_resources(data)
+        found = {}
+        for rule in self.rules:
+            if not is_occurrence(rule, data.date) or data.date in self.exceptions.get(rule.id, ()):
+                continue
+            if not (rule.start_time < data.end_time and rule.end_time > data.start_time):
+                continue
+            for dim, rid in slot_resources(rule).items():
+                if resources.get(dim) == rid:
+                    found.setdefault(dim, []).append(rule.id)
+        return found
+
+
+def find_pattern_conflicts(db: Session, rule, exclude_rule_id: int = None) -> tuple[dict, dict]:
+    """
+    Dated slots and other recurring slots that clash with the recurring slot `rule`.
+
+    Returns (slot ids, recurring slot ids) per dimension. Two recurring slots
+    clash when they share a resource, weekday and time, and their date ranges
+    have that weekday in common; exceptions are not taken into account.
+    """
+    resources = slot_resources(rule)
+    first = first_occurrence(rule.day_of_week, rule.start_date, rule.end_date)
+    if not resources or first is None:
+        return {}, {}
+    exceptions = load_exceptions(db, [rule.id]).get(rule.id, set()) if rule.id else set()
+    weekday = DayOfWeek(rule.day_of_week)
+
+    slot_found = {}
+    rows = db.query(
+        TimetableSlot.id,
+        TimetableSlot.date,
+        TimetableSlot.faculty_id,
+        TimetableSlot.room_id,
+        TimetableSlot.section_id,
+        TimetableSlot.batch_id,
+    ).filter(
+        TimetableSlot.date >= first,
+        TimetableSlot.date <= rule.end_date,
+        TimetableSlot.start_time < rule.end_time,
+        TimetableSlot.end_time > rule.start_time,
+        TimetableSlot.is_active == True,
+        or_(*(RESOURCE_COLUMNS[dim] == rid for dim, rid in resources.items())),
+    ).order_by(TimetableSlot.id).all()
+    for row in rows:
+        if weekday_of(row.date) != weekday or row.date in exceptions:
+            continue
+        for dim, rid in slot_resources(row).items():
+            if resources.get(dim) == rid:
+                slot_found.setdefault(dim, []).append(row.id)
+
+    rule_found = {}
+    query = db.query(RecurringSlot).filter(
+        RecurringSlot.is_active == True,
+        RecurringSlot.day_of_week == weekday,
+        RecurringSlot.start_time < rule.end_time,
+        RecurringSlot.end_time > rule.start_time,
+        RecurringSlot.start_date <= rule.end_date,
+        RecurringSlot.end_date >= first,
+        or_(*(RECURRING_RESOURCE_COLUMNS[dim] == rid for dim, rid in resources.items())),
+    )
+    if exclude_rule_id is not None:
+        query = query.filter(RecurringSlot.id != exclude_rule_id)
+    for other in query.order_by(RecurringSlot.id).all():
+        if first_occurrence(weekday, max(first, other.start_date), min(rule.end_date, other.end_date)) is None:
+            continue
+        for dim, rid in slot_resources(other).items():
+            if resources.get(dim) == rid:
+                rule_found.setdefault(dim, []).append(other.id)
+
+    return slot_found, rule_found
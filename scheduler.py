@@ -0,0 +1,513 @@
+"""
+Automatic timetable generation.
+
+The solver works on a compact, ORM-free description of a term (`Problem`):
+every weekly slot is a bit in an integer, so "is this faculty/room/group free"
+is a single AND. Occupancy held in other terms is read through an
+`OccupancyGrid` and folded onto the weekly periods. `load_problem` builds that description from the database and
+`expand_solution` turns a solved week back into concrete `TimetableSlot` rows.
+"""
+import math
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import timedelta
+from typing import NamedTuple, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from models import (
+    AcademicTerm, Department, Subject, Section, Batch, Faculty,
+    FacultyAssignment, Room, TimetableSlot
+)
+from occupancy import OccupancyGrid, SLOT_COLUMNS
+from recurrence import load_occurrences
+from schemas import DAYS
+
+
+UNPLACED_PENALTY = 1000
+SAME_DAY_PENALTY = 1
+DEADLINE_CHECK_STEPS = 256
+MAX_WORKERS = int(os.getenv("TIMETABLE_GENERATOR_MAX_WORKERS", os.cpu_count() or 1))
+# Each run may start MAX_WORKERS processes, so cap how many run at once
+MAX_CONCURRENT_RUNS = int(os.getenv("TIMETABLE_GENERATOR_MAX_CONCURRENT", "1"))
+generator_runs = threading.BoundedSemaphore(MAX_CONCURRENT_RUNS)
+
+
+# =========================
+# PROBLEM DESCRIPTION
+# =========================
+class Lesson(NamedTuple):
+    assignment: int
+    faculty: int
+    group: int
+    rooms: tuple
+
+
+class Problem(NamedTuple):
+    days: int
+    periods_per_day: int
+    slot_minutes: tuple
+    lessons: tuple
+    faculty_limits: tuple
+    faculty_fixed: tuple
+    room_fixed: tuple
+    group_fixed: tuple
+
+
+class ProblemIndex(NamedTuple):
+    """Maps the integer indexes used by `Problem` back to database ids."""
+    assignments: tuple
+    room_ids: tuple
+    weekdays: tuple
+    periods: tuple
+
+
+class Solution(NamedTuple):
+    score: int
+    unplaced: int
+    placements: tuple
+    seed: int = 0
+
+
+# =========================
+# SOLVER
+# =========================
+def solve(problem: Problem, seed: int = 0, max_steps: Optional[int] = None, deadline: Optional[float] = None) -> Solution:
+    """
+    Greedy placement with conflict-directed backtracking.
+
+    Lessons are placed most-constrained first into the cheapest free weekly
+    slot. When a lesson has no free slot, the slot that displaces the fewest
+    already placed lessons is taken and the displaced lessons are re-queued.
+    The search stops when every lesson is placed, after `max_steps`, or once
+    the wall-clock `deadline` (a `time.time()` value) has passed.
+    """
+    rng = random.Random(seed)
+    lessons = problem.lessons
+    ppd = problem.periods_per_day
+    n_slots = problem.days * ppd
+    full = (1 << n_slots) - 1
+    slot_minutes = problem.slot_minutes
+    limits = problem.faculty_limits
+
+    fac_occ = list(problem.faculty_fixed)
+    room_occ = list(problem.room_fixed)
+    grp_occ = list(problem.group_fixed)
+    fac_minutes = [0] * len(limits)
+    fac_at = {}
+    room_at = {}
+    grp_at = {}
+    day_count = {}
+    placements = [None] * len(lessons)
+    evicted_by = {}
+
+    def place(i, t, r):
+        lesson = lessons[i]
+        bit = 1 << t
+        fac_occ[lesson.faculty] |= bit
+        grp_occ[lesson.group] |= bit
+        room_occ[r] |= bit
+        fac_minutes[lesson.faculty] += slot_minutes[t]
+        fac_at[(lesson.faculty, t)] = i
+        grp_at[(lesson.group, t)] = i
+        room_at[(r, t)] = i
+        key = (lesson.assignment, t // ppd)
+        day_count[key] = day_count.get(key, 0) + 1
+        placements[i] = (t, r)
+
+    def unplace(i):
+        lesson = lessons[i]
+        t, r = placements[i]
+        mask = ~(1 << t)
+        fac_occ[lesson.faculty] &= mask
+        grp_occ[lesson.group] &= mask
+        room_occ[r] &= mask
+        fac_minutes[lesson.faculty] -= slot_minutes[t]
+        del fac_at[(lesson.faculty, t)]
+        del grp_at[(lesson.group, t)]
+        del room_at[(r, t)]
+        day_count[(lesson.assignment, t // ppd)] -= 1
+        placements[i] = None
+
+    def free_placement(i):
+        lesson = lessons[i]
+        free = full & ~(fac_occ[lesson.faculty] | grp_occ[lesson.group])
+        rooms_free = 0
+        for r in lesson.rooms:
+            rooms_free |= ~room_occ[r]
+            if rooms_free & free == free:
+                break
+        free &= rooms_free
+        if not free:
+            return None
+
+        best_t, best_cost = None, None
+        budget = limits[lesson.faculty] - fac_minutes[lesson.faculty]
+        t = 0
+        while free:
+            if free & 1 and slot_minutes[t] <= budget:
+                cost = day_count.get((lesson.assignment, t // ppd), 0) * SAME_DAY_PENALTY + rng.random()
+                if best_cost is None or cost < best_cost:
+                    best_t, best_cost = t, cost
+            free >>= 1
+            t += 1
+        if best_t is None:
+            return None
+
+        bit = 1 << best_t
+        room = next(r for r in lesson.rooms if not room_occ[r] & bit)
+        return best_t, room
+
+    def evicting_placement(i):
+        lesson = lessons[i]
+        fixed = problem.faculty_fixed[lesson.faculty] | problem.group_fixed[lesson.group]
+        protected = evicted_by.get(i)
+        best, best_cost = None, None
+
+        for t in range(n_slots):
+            bit = 1 << t
+            if fixed & bit:
+                continue
+            victims = set()
+            for owner in (fac_at.get((lesson.faculty, t)), grp_at.get((lesson.group, t))):
+                if owner is not None:
+                    victims.add(owner)
+
+            freed = slot_minutes[t] if fac_at.get((lesson.faculty, t)) is not None else 0
+            if fac_minutes[lesson.faculty] - freed + slot_minutes[t] > limits[lesson.faculty]:
+                continue
+
+            room, room_victim = None, None
+            for r in lesson.rooms:
+                if problem.room_fixed[r] & bit:
+                    continue
+                occupant = room_at.get((r, t))
+                if occupant is None or occupant in victims:
+                    room, room_victim = r, None
+                    break
+                if room is None:
+                    room, room_victim = r, occupant
+            if room is None:
+                continue
+            if room_victim is not None:
+                victims.add(room_victim)
+            if protected is not None and protected in victims:
+                continue
+
+            cost = len(victims) + rng.random()
+            if best_cost is None or cost < best_cost:
+                best, best_cost = (t, room, victims), cost
+        return best
+
+    order = sorted(range(len(lessons)), key=lambda i: (len(lessons[i].rooms), rng.random()))
+    queue = deque(i for i in order if lessons[i].rooms)
+    unplaceable = len(lessons) - len(queue)
+    max_steps = max_steps or 20 * len(lessons) + 100
+    steps = 0
+
+    while queue and steps < max_steps:
+        steps += 1
+        if deadline is not None and steps % DEADLINE_CHECK_STEPS == 0 and time.time() >= deadline:
+            break
+        i = queue.popleft()
+        choice = free_placement(i)
+        if choice is not None:
+            place(i, *choice)
+            continue
+
+        choice = evicting_placement(i)
+        if choice is None:
+            unplaceable += 1
+            continue
+        t, r, victims = choice
+        for j in victims:
+            unplace(j)
+            evicted_by[j] = i
+            queue.appendleft(j)
+        place(i, t, r)
+
+    unplaced = unplaceable + len(queue)
+    penalty = sum(max(0, c - 1) for c in day_count.values()) * SAME_DAY_PENALTY
+    return Solution(
+        score=unplaced * UNPLACED_PENALTY + penalty,
+        unplaced=unplaced,
+        placements=tuple(placements),
+        seed=seed,
+    )
+
+
+# =========================
+# MULTI-START SEARCH
+# =========================
+_worker_problem = None
+
+
+def _init_worker(problem: Problem) -> None:
+    global _worker_problem
+    _worker_problem = problem
+
+
+def _solve_in_worker(seed: int, deadline: Optional[float]) -> Solution:
+    return solve(_worker_problem, seed=seed, deadline=deadline)
+
+
+def solve_multistart(problem: Problem, starts: int = 1, workers: Optional[int] = None, time_budget: Optional[float] = None, seed: int = 0) -> tuple[Solution, int]:
+    """
+    Run `starts` independently seeded searches and keep the best scoring one.
+
+    With more than one worker the searches run on a process pool; the problem
+    is handed to each worker once through the pool initializer, and every
+    task only carries its seed. `time_budget` bounds the whole search in
+    seconds: searches still running when it expires return what they have,
+    and ones not yet started are dropped. Returns the best solution and the
+    number of searches that completed.
+    """
+    deadline = time.time() + time_budget if time_budget else None
+    workers = max(1, min(workers or MAX_WORKERS, MAX_WORKERS, starts))
+    seeds = [seed + k for k in range(starts)]
+    best = None
+    completed = 0
+
+    if workers == 1:
+        for s in seeds:
+            if best is not None and deadline is not None and time.time() >= deadline:
+                break
+            solution = solve(problem, seed=s, deadline=deadline)
+            completed += 1
+            if best is None or solution.score < best.score:
+                best = solution
+            if best.score == 0:
+                break
+        return best, completed
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(problem,)) as pool:
+        futures = [pool.submit(_solve_in_worker, s, deadline) for s in seeds]
+        for future in as_completed(futures):
+            # Searches dropped below are still yielded, as cancelled
+            if future.cancelled():
+                continue
+            solution = future.result()
+            completed += 1
+            if best is None or solution.score < best.score:
+                best = solution
+            if best.score == 0 or (deadline is not None and time.time() >= deadline):
+                for pending in futures:
+                    pending.cancel()
+    return best, completed
+
+
+# =========================
+# DATABASE <-> PROBLEM
+# =========================
+def _minutes(t) -> int:
+    return t.hour * 60 + t.minute
+
+
+def load_problem(db: Session, term: AcademicTerm, organisation_id: int, days: list[str], periods: list[tuple]) -> tuple[Problem, ProblemIndex]:
+    """
+    Describe the weekly scheduling problem for `term`.
+
+    Every active assignment whose subject has `weekly_hours` becomes one lesson
+    per period needed. Slots that faculties and rooms already hold in other
+    terms during this term's date range are marked as fixed occupancy, as are
+    the occurrences of recurring slots in any term (this one included).
+
+    This is deliberately conservative: occupancy on any one date blocks that
+    weekday and period for the whole term, because `expand_solution` repeats
+    every placement on each week and a single clashing date would otherwise
+    become a conflicting slot. A resource busy in only a few weeks can leave
+    lessons unplaced that a per-week schedule could fit.
+    """
+    periods = sorted(periods)
+    weekdays = tuple(DAYS.index(d) for d in days)
+    period_minutes = [_minutes(end) - _minutes(start) for start, end in periods]
+    slot_minutes = tuple(period_minutes) * len(weekdays)
+    average_minutes = sum(period_minutes) / len(period_minutes)
+
+    rows = db.query(
+        FacultyAssignment.id,
+        FacultyAssignment.subject_id,
+        FacultyAssignment.faculty_id,
+        FacultyAssignment.section_id,
+        FacultyAssignment.batch_id,
+        Subject.weekly_hours,
+        Faculty.max_weekly_hours,
+        Section.max_capacity.label("section_capacity"),
+        Batch.max_capacity.label("batch_capacity"),
+    ).join(Subject, FacultyAssignment.subject_id == Subject.id).join(
+        Faculty, FacultyAssignment.faculty_id == Faculty.id
+    ).outerjoin(
+        Section, FacultyAssignment.section_id == Section.id
+    ).outerjoin(
+        Batch, FacultyAssignment.batch_id == Batch.id
+    ).filter(
+        Subject.academic_term_id == term.id,
+        Subject.is_active == True,
+        Subject.weekly_hours > 0,
+        FacultyAssignment.is_active == True,
+        Faculty.is_active == True,
+        or_(Section.is_active == True, Batch.is_active == True),
+    ).order_by(FacultyAssignment.id).all()
+
+    rooms = db.query(Room.id, Room.capacity).join(Department).filter(
+        Department.organisation_id == organisation_id,
+        Room.is_active == True
+    ).order_by(Room.capacity, Room.id).all()
+
+    assignments = []
+    seen = set()
+    for row in rows:
+        key = (row.subject_id, row.section_id, row.batch_id)
+        if key in seen:
+            continue
+        seen.add(key)
+        assignments.append(row)
+
+    faculty_ids = sorted({a.faculty_id for a in assignments})
+    faculty_index = {fid: i for i, fid in enumerate(faculty_ids)}
+    room_ids = tuple(r.id for r in rooms)
+    room_index = {rid: i for i, rid in enumerate(room_ids)}
+    groups = sorted({("section", a.section_id) if a.section_id else ("batch", a.batch_id) for a in assignments})
+    group_index = {g: i for i, g in enumerate(groups)}
+
+    faculty_fixed = [0] * len(faculty_ids)
+    room_fixed = [0] * len(room_ids)
+    group_fixed = [0] * len(groups)
+    section_index = {gid: i for (kind, gid), i in group_index.items() if kind == "section"}
+    batch_index = {gid: i for (kind, gid), i in group_index.items() if kind == "batch"}
+    faculty_week_minutes = {}
+    if faculty_ids or room_ids:
+        existing = db.query(*SLOT_COLUMNS).filter(
+            TimetableSlot.academic_term_id != term.id,
+            TimetableSlot.date >= term.start_date,
+            TimetableSlot.date <= term.end_date,
+            TimetableSlot.is_active == True,
+            or_(TimetableSlot.faculty_id.in_(faculty_ids), TimetableSlot.room_id.in_(room_ids)),
+        ).all()
+        held = [(slot, slot.id) for slot in existing]
+        held += [
+            (occurrence, ("recurring", occurrence.recurring_slot_id, occurrence.date))
+            for occurrence in load_occurrences(db, term.start_date, term.end_date, {
+                "faculty": set(faculty_ids),
+                "room": set(room_ids),
+                "section": set(section_index),
+                "batch": set(batch_index),
+            })
+        ]
+        occupied = OccupancyGrid()
+        for slot, ref in held:
+            occupied.add(slot, ref)
+            if slot.faculty_id in faculty_index:
+                key = (slot.faculty_id, slot.date.isocalendar()[:2])
+                faculty_week_minutes[key] = faculty_week_minutes.get(key, 0) + _minutes(slot.end_time) - _minutes(slot.start_time)
+
+        period_masks = [occupied.mask(start, end) for start, end in periods]
+        fixed_by_dim = {
+            "faculty": (faculty_fixed, faculty_index),
+            "room": (room_fixed, room_index),
+            "section": (group_fixed, section_index),
+            "batch": (group_fixed, batch_index),
+        }
+        # Fold every dated occupancy onto its weekday; see the docstring
+        for dim, rid, day, bits in occupied.occupancy():
+            if dim not in fixed_by_dim or day.weekday() not in weekdays:
+                continue
+            fixed, positions = fixed_by_dim[dim]
+            if rid not in positions:
+                continue
+            offset = weekdays.index(day.weekday()) * len(periods)
+            for p, period_mask in enumerate(period_masks):
+                if bits & period_mask:
+                    fixed[positions[rid]] |= 1 << (offset + p)
+
+    busiest_week = {}
+    for (fid, _), minutes in faculty_week_minutes.items():
+        busiest_week[fid] = max(busiest_week.get(fid, 0), minutes)
+    faculty_limits = [0] * len(faculty_ids)
+    for a in assignments:
+        faculty_limits[faculty_index[a.faculty_id]] = (a.max_weekly_hours or 0) * 60 - busiest_week.get(a.faculty_id, 0)
+
+    lessons = []
+    for i, a in enumerate(assignments):
+        capacity = a.section_capacity if a.section_id else a.batch_capacity
+        candidate_rooms = tuple(room_index[r.id] for r in rooms if (r.capacity or 0) >= (capacity or 0))
+        group = group_index[("section", a.section_id) if a.section_id else ("batch", a.batch_id)]
+        needed = math.ceil(a.weekly_hours * 60 / average_minutes)
+        lessons.extend(Lesson(i, faculty_index[a.faculty_id], group, candidate_rooms) for _ in range(needed))
+
+    problem = Problem(
+        days=len(weekdays),
+        periods_per_day=len(periods),
+        slot_minutes=slot_minutes,
+        lessons=tuple(lessons),
+        faculty_limits=tuple(faculty_limits),
+        faculty_fixed=tuple(faculty_fixed),
+        room_fixed=tuple(room_fixed),
+        group_fixed=tuple(group_fixed),
+    )
+    index = ProblemIndex(
+        assignments=tuple(
+            (a.id, a.subject_id, a.faculty_id, a.section_id, a.batch_id) for a in assignments
+        ),
+        room_ids=room_ids,
+        weekdays=weekdays,
+        periods=tuple(periods),
+    )
+    return problem, index
+
+
+def expand_solution(problem: Problem, index: ProblemIndex, solution: Solution, term: AcademicTerm) -> list[dict]:
+    """Materialise the solved week into one `TimetableSlot` row per date of the term."""
+    ppd = problem.periods_per_day
+    dates_by_day = {d: [] for d in range(problem.days)}
+    current = term.start_date
+    while current <= term.end_date:
+        if current.weekday() in index.weekdays:
+            dates_by_day[index.weekdays.index(current.weekday())].append(current)
+        current += timedelta(days=1)
+
+    rows = []
+    for lesson, placement in zip(problem.lessons, solution.placements):
+        if placement is None:
+            continue
+        t, r = placement
+        _, subject_id, faculty_id, section_id, batch_id = index.assignments[lesson.assignment]
+        start, end = index.periods[t % ppd]
+        for slot_date in dates_by_day[t // ppd]:
+            rows.append({
+                "academic_term_id": term.id,
+                "subject_id": subject_id,
+                "faculty_id": faculty_id,
+                "section_id": section_id,
+                "batch_id": batch_id,
+                "room_id": index.room_ids[r],
+                "date": slot_date,
+                "start_time": start,
+                "end_time": end,
+                "modality": "Offline",
+            })
+    return rows
+
+
+def unplaced_summary(problem: Problem, index: ProblemIndex, solution: Solution) -> list[dict]:
+    missing = {}
+    for lesson, placement in zip(problem.lessons, solution.placements):
+        if placement is None:
+            missing[lesson.assignment] = missing.get(lesson.assignment, 0) + 1
+
+    return [
+        {
+            "assignment_id": index.assignments[a][0],
+            "subject_id": index.assignments[a][1],
+            "faculty_id": index.assignments[a][2],
+            "section_id": index.assignments[a][3],
+            "batch_id": index.assignments[a][4],
+            "missing_periods": count,
+        }
+        for a, count in sorted(missing.items())
+    ]
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, EmailStr, field_validator, model_validator, ConfigDict
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator, ConfigDict
 from typing import Optional, Literal
-from datetime import date, time
+from datetime import date, time, datetime
 
 
 TermType = Literal["SEMESTER", "YEAR"]
@@ -263,6 +263,21 @@ class FacultyResponse(FacultyBase):
     is_active: bool
 
 
+class FacultyWeekLoad(BaseModel):
+    week_start: date
+    iso_year: int
+    iso_week: int
+    minutes: int
+    hours: float
+    over_limit: bool
+
+
+class FacultyLoadResponse(BaseModel):
+    faculty_id: int
+    max_weekly_hours: Optional[int] = None
+    weeks: list[FacultyWeekLoad]
+
+
 # =========================
 # FACULTY ASSIGNMENT
 # =========================
@@ -371,6 +386,8 @@ class TimetableSlotResponse(TimetableSlotBase):
 
 
 class TimetableSlotWithDetails(TimetableSlotResponse):
+    id: Optional[int] = None  # None for occurrences of a recurring slot
+    recurring_slot_id: Optional[int] = None
     subject_name: Optional[str] = None
     faculty_name: Optional[str] = None
     section_name: Optional[str] = None
@@ -378,6 +395,155 @@ class TimetableSlotWithDetails(TimetableSlotResponse):
     room_name: Optional[str] = None
 
 
+# =========================
+# RECURRING TIMETABLE SLOTS
+# =========================
+class RecurringSlotBase(BaseModel):
+    subject_id: int
+    faculty_id: int
+    section_id: Optional[int] = None
+    batch_id: Optional[int] = None
+    room_id: Optional[int] = None
+    day_of_week: DayOfWeek
+    start_time: time
+    end_time: time
+    modality: str = "Offline"
+
+    @field_validator('end_time')
+    @classmethod
+    def end_after_start(cls, v, info):
+        if 'start_time' in info.data and v <= info.data['start_time']:
+            raise ValueError('end_time must be after start_time')
+        return v
+
+    @model_validator(mode='after')
+    def validate_room_for_modality(self):
+        if self.modality in ("Offline", "Hybrid") and self.room_id is None:
+            raise ValueError('Room is required for Offline and Hybrid classes')
+        return self
+
+    @model_validator(mode='after')
+    def validate_section_or_batch(self):
+        if self.section_id is None and self.batch_id is None:
+            raise ValueError('At least one of Section or Batch must be selected')
+        return self
+
+
+class RecurringSlotCreate(RecurringSlotBase):
+    academic_term_id: int
+    start_date: Optional[date] = None  # defaults to the term's start_date
+    end_date: Optional[date] = None  # defaults to the term's end_date
+
+
+class RecurringSlotResponse(RecurringSlotBase):
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: int
+    academic_term_id: int
+    start_date: date
+    end_date: date
+    is_active: bool
+    exceptions: list[date] = []
+
+
+class RecurringSlotExceptionCreate(BaseModel):
+    date: date
+
+
+# =========================
+# TIMETABLE GENERATION
+# =========================
+class PeriodDefinition(BaseModel):
+    start_time: time
+    end_time: time
+
+    @field_validator('end_time')
+    @classmethod
+    def end_after_start(cls, v, info):
+        if 'start_time' in info.data and v <= info.data['start_time']:
+            raise ValueError('end_time must be after start_time')
+        return v
+
+
+DEFAULT_PERIODS = [
+    PeriodDefinition(start_time=time(h), end_time=time(h + 1))
+    for h in (9, 10, 11, 12, 14, 15, 16)
+]
+
+
+class TimetableGenerateRequest(BaseModel):
+    days: list[DayOfWeek] = DAYS[:5]  # type: ignore
+    periods: list[PeriodDefinition] = DEFAULT_PERIODS
+    replace_existing: bool = False
+    dry_run: bool = False
+    seed: int = 0
+    starts: int = Field(default=1, ge=1, le=256)
+    workers: Optional[int] = Field(default=None, ge=1)
+    time_budget_seconds: Optional[float] = Field(default=None, gt=0)
+
+    @field_validator('days')
+    @classmethod
+    def days_not_empty(cls, v):
+        if not v:
+            raise ValueError('At least one day is required')
+        return list(dict.fromkeys(v))
+
+    @field_validator('periods')
+    @classmethod
+    def periods_not_overlapping(cls, v):
+        if not v:
+            raise ValueError('At least one period is required')
+        ordered = sorted(v, key=lambda p: p.start_time)
+        for prev, nxt in zip(ordered, ordered[1:]):
+            if nxt.start_time < prev.end_time:
+                raise ValueError('Periods must not overlap')
+        return ordered
+
+
+class UnplacedLesson(BaseModel):
+    assignment_id: int
+    subject_id: int
+    faculty_id: int
+    section_id: Optional[int] = None
+    batch_id: Optional[int] = None
+    missing_periods: int
+
+
+class TimetableGenerateResult(BaseModel):
+    lessons: int
+    placed: int
+    created: int
+    score: int
+    seed: int
+    starts_completed: int
+    elapsed_ms: int
+    unplaced: list[UnplacedLesson]
+
+
+class TimetableCloneRequest(BaseModel):
+    target_term_id: Optional[int] = None  # defaults to the source term
+    week_offset: Optional[int] = None  # defaults to the weeks between the two terms' starts
+    from_date: Optional[date] = None  # source window, defaults to the source term's dates
+    to_date: Optional[date] = None
+    dry_run: bool = False
+
+    @model_validator(mode='after')
+    def validate_window(self):
+        if self.from_date and self.to_date and self.to_date < self.from_date:
+            raise ValueError('to_date must not be before from_date')
+        return self
+
+
+class TimetableCloneResult(BaseModel):
+    target_term_id: int
+    week_offset: int
+    source_slots: int
+    created: int
+    unmapped: int  # no target date, subject, section, batch or faculty assignment
+    conflicting: int
+    elapsed_ms: int
+
+
 # =========================
 # USER / AUTH
 # =========================
@@ -441,13 +607,50 @@ class BulkEnrollResult(BaseModel):
     skipped: int
 
 
+class TermEnrollmentEntry(BaseModel):
+    student_id: str
+    section_id: Optional[int] = None
+    batch_id: Optional[int] = None
+
+    @model_validator(mode='after')
+    def validate_one_group(self):
+        if (self.section_id is None) == (self.batch_id is None):
+            raise ValueError('Exactly one of section_id or batch_id must be set')
+        return self
+
+
+class TermBulkEnrollRequest(BaseModel):
+    enrollments: list[TermEnrollmentEntry] = Field(min_length=1)
+
+
+class GroupEnrollResult(BulkEnrollResult):
+    group_type: GroupType
+    group_id: int
+    group_name: str
+
+
+class EnrollmentJobResponse(BaseModel):
+    id: str
+    kind: str
+    status: Literal["pending", "running", "completed", "failed"]
+    total: int
+    processed: int
+    groups_total: int
+    groups_done: int
+    results: list[GroupEnrollResult] = []
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+
 # =========================
 # STUDENT TIMETABLE
 # =========================
 class StudentTimetableSlot(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     
-    id: int
+    id: Optional[int] = None
+    recurring_slot_id: Optional[int] = None
     date: date
     start_time: time
     end_time: time
@@ -0,0 +1,93 @@
+import os
+import sys
+import tempfile
+
+# The app reads DATABASE_URL at import time, so point it at a throwaway
+# SQLite file before any test module imports it
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.schema import DefaultClause
+
+
+@pytest.fixture(scope="module")
+def app_db():
+    """Fresh tables for the module; yields the db module."""
+    import db
+    import models
+    for table in models.Base.metadata.tables.values():
+        for col in table.columns:
+            # SQLite's now() is a timestamp, which does not read back as a Date
+            if col.name in ("created_at", "updated_at"):
+                col.server_default = DefaultClause(text("(date('now'))"))
+                col.onupdate = None
+    models.Base.metadata.drop_all(bind=db.engine)
+    models.Base.metadata.create_all(bind=db.engine)
+    # User ids restart with the tables
+    from auth import principal_cache
+    principal_cache.clear()
+    yield db
+    models.Base.metadata.drop_all(bind=db.engine)
+
+
+@pytest.fixture(scope="module")
+def client(app_db):
+    from fastapi.testclient import TestClient
+    import main
+    return TestClient(main.app)
+
+
+@pytest.fixture(scope="module")
+def super_admin_headers(app_db, client):
+    from auth import hash_password
+    from models import User, UserRole
+    with app_db.SessionLocal() as session:
+        session.add(User(username="super", password=hash_password("pw"), role=UserRole.SUPER_ADMIN))
+        session.commit()
+    response = client.post("/login", json={"username": "super", "password": "pw"})
+    assert response.status_code == 200, response.text
+    return {"Authorization": "Bearer " + response.json()["access_token"]}
+
+
+@pytest.fixture(scope="module")
+def org(app_db, client):
+    """One organisation with a term, subject, section, faculty, room and an admin; yields ids and headers."""
+    from datetime import date
+    from auth import hash_password
+    from models import (
+        Organisation, Department, Course, AcademicTerm, Subject, Section, Faculty,
+        FacultyAssignment, Room, TermType, User, UserRole
+    )
+    with app_db.SessionLocal() as session:
+        organisation = Organisation(name="Org", code="ORG")
+        session.add(organisation)
+        session.flush()
+        dept = Department(name="CS", short_name="CS", organisation_id=organisation.id)
+        session.add(dept)
+        session.flush()
+        course = Course(name="BTech", code="BT", duration_years=4, department_id=dept.id)
+        session.add(course)
+        session.flush()
+        term = AcademicTerm(
+            course_id=course.id, term_number=1, term_type=TermType.SEMESTER,
+            start_date=date(2026, 1, 5), end_date=date(2026, 5, 1)
+        )
+        session.add(term)
+        session.flush()
+        subject = Subject(academic_term_id=term.id, name="Maths", code="M1", subject_short_name="M")
+        section = Section(academic_term_id=term.id, name="A")
+        faculty = Faculty(name="F", employee_code="E1", department_id=dept.id, max_weekly_hours=2)
+        room = Room(name="R1", department_id=dept.id)
+        session.add_all([subject, section, faculty, room])
+        session.flush()
+        session.add(FacultyAssignment(faculty_id=faculty.id, subject_id=subject.id, section_id=section.id))
+        session.add(User(username="admin", password=hash_password("pw"), role=UserRole.ADMIN, organisation_id=organisation.id))
+        session.commit()
+        ids = dict(term=term.id, subject=subject.id, section=section.id, faculty=faculty.id, room=room.id)
+    
+    response = client.post("/login", json={"username": "admin", "password": "pw"})
+    assert response.status_code == 200, response.text
+    ids["headers"] = {"Authorization": "Bearer " + response.json()["access_token"]}
+    return ids
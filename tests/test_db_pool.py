@@ -0,0 +1,24 @@
+import os
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from db import InstrumentedQueuePool
+
+
+def test_timed_out_checkouts_are_not_counted_as_checkouts():
+    url = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "pool.db")
+    engine = create_engine(url, poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.2)
+    pool = engine.pool
+    held = engine.connect()
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+    held.close()
+    engine.connect().close()
+    
+    assert (pool.checkouts, pool.timeouts, pool.waiters) == (2, 1, 0)
+    assert pool.timeout_wait_ms >= 200
+    assert pool.max_wait_ms < 200
+    engine.dispose()
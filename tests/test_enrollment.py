@@ -0,0 +1,16 @@
+import main
+
+
+def test_roster_upload_invalidates_only_students_it_enrolled(client, org, monkeypatch):
+    url = f"/sections/{org['section']}/enroll"
+    response = client.post(f"{url}/bulk", json={"student_ids": ["S1"]}, headers=org["headers"])
+    assert response.status_code == 200, response.text
+    
+    invalidated = []
+    monkeypatch.setattr(main, "invalidate_students", lambda ids: invalidated.extend(ids))
+    roster = ("roster.csv", b"S1\nS2\n S3 \n", "text/csv")
+    response = client.post(f"{url}/upload", files={"file": roster}, headers=org["headers"])
+    assert response.status_code == 200, response.text
+    assert response.json()["added"] == 2
+    assert response.json()["already_enrolled"] == 1
+    assert sorted(invalidated) == ["S2", "S3"]
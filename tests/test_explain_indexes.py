@@ -0,0 +1,27 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine
+
+# Needs PostgreSQL with the migrations applied; the rest of the suite runs on SQLite
+EXPLAIN_DATABASE_URL = os.getenv("EXPLAIN_INDEXES_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(
+    not (EXPLAIN_DATABASE_URL or "").startswith("postgresql"),
+    reason="set EXPLAIN_INDEXES_DATABASE_URL to a PostgreSQL database",
+)
+
+
+def test_hot_queries_use_partial_indexes():
+    from explain_indexes import check_indexes
+
+    engine = create_engine(EXPLAIN_DATABASE_URL)
+    try:
+        with engine.connect() as conn:
+            results = check_indexes(conn, slots=200_000, terms=20, sections_per_term=10)
+    finally:
+        engine.dispose()
+    assert [name for name, ok, _ in results] == [
+        "term timetable", "section timetable", "batch timetable", "faculty hours", "conflict check",
+    ]
+    assert [(name, scans) for name, ok, scans in results if not ok] == []
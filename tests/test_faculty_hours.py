@@ -0,0 +1,38 @@
+def slot(org, **overrides):
+    data = {
+        "academic_term_id": org["term"], "subject_id": org["subject"], "faculty_id": org["faculty"],
+        "section_id": org["section"], "room_id": org["room"],
+        "date": "2026-01-05", "start_time": "09:00", "end_time": "10:00"
+    }
+    data.update(overrides)
+    return data
+
+
+def test_create_and_update_enforce_max_weekly_hours(client, org):
+    headers = org["headers"]
+    first = client.post("/timetable/slots", json=slot(org), headers=headers)
+    assert first.status_code == 201, first.text
+    second = client.post("/timetable/slots", json=slot(org, date="2026-01-06"), headers=headers)
+    assert second.status_code == 201, second.text
+    
+    # The fixture faculty may teach 2 hours a week
+    response = client.post("/timetable/slots", json=slot(org, date="2026-01-07"), headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Faculty would exceed max weekly hours (2h)"
+    
+    # Moving a slot within the week does not count it twice
+    response = client.put(
+        f"/timetable/slots/{first.json()['id']}", json={"start_time": "11:00", "end_time": "12:00"}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    response = client.put(f"/timetable/slots/{first.json()['id']}", json={"end_time": "13:00"}, headers=headers)
+    assert response.status_code == 400
+
+
+def test_bulk_rejects_rows_over_max_weekly_hours(client, org):
+    rows = [slot(org, date=day) for day in ("2026-01-12", "2026-01-13", "2026-01-14")]
+    response = client.post("/timetable/bulk", json=rows, headers=org["headers"])
+    assert response.status_code == 201, response.text
+    body = response.json()
+    assert body["created"] == 2
+    assert body["errors"] == [{"index": 2, "error": "Faculty would exceed max weekly hours (2h)"}]
@@ -0,0 +1,37 @@
+import scheduler
+
+
+def generate(client, org, **body):
+    return client.post(f"/terms/{org['term']}/timetable/generate", json=body, headers=org["headers"])
+
+
+def test_inactive_slots_count_as_an_existing_timetable(client, app_db, org):
+    from models import TimetableSlot
+    response = client.post("/timetable/slots", json={
+        "academic_term_id": org["term"], "subject_id": org["subject"], "faculty_id": org["faculty"],
+        "section_id": org["section"], "room_id": org["room"],
+        "date": "2026-01-05", "start_time": "09:00", "end_time": "10:00"
+    }, headers=org["headers"])
+    assert response.status_code == 201, response.text
+    with app_db.SessionLocal() as db:
+        db.query(TimetableSlot).update({TimetableSlot.is_active: False})
+        db.commit()
+    
+    response = generate(client, org)
+    assert response.status_code == 400
+    assert "replace_existing" in response.json()["detail"]
+    
+    response = generate(client, org, replace_existing=True)
+    assert response.status_code == 200, response.text
+
+
+def test_concurrent_generate_calls_are_capped(client, org):
+    assert scheduler.generator_runs.acquire(blocking=False)
+    try:
+        response = generate(client, org, replace_existing=True, dry_run=True)
+        assert response.status_code == 429
+    finally:
+        scheduler.generator_runs.release()
+    
+    response = generate(client, org, replace_existing=True, dry_run=True)
+    assert response.status_code == 200, response.text
@@ -0,0 +1,12 @@
+import scheduler
+from bench_scheduler import build_problem
+
+
+def test_multistart_with_more_starts_than_workers(monkeypatch):
+    monkeypatch.setattr(scheduler, "MAX_WORKERS", 2)
+    problem = build_problem(sections=8, subjects=3, hours=2, sections_per_faculty=4, room_slack=1.5)
+    
+    solution, completed = scheduler.solve_multistart(problem, starts=8, workers=2)
+    
+    assert solution.unplaced == 0
+    assert 1 <= completed <= 8
@@ -0,0 +1,51 @@
+from itertools import count
+
+import pytest
+from sqlalchemy import event
+
+from models import Organisation, Department, Course, User, UserRole
+
+
+ORG_NUMBERS = count()
+
+
+def add_organisations(db, n: int) -> None:
+    with db.SessionLocal() as session:
+        for i in (next(ORG_NUMBERS) for _ in range(n)):
+            org = Organisation(name=f"Org {i}", code=f"ORG{i}")
+            session.add(org)
+            session.flush()
+            dept = Department(name="Dept", short_name="D", organisation_id=org.id)
+            session.add(dept)
+            session.flush()
+            session.add(Course(name="Course", code=f"C{i}", duration_years=1, department_id=dept.id))
+            session.add(User(username=f"admin{i}", password="x", role=UserRole.ADMIN, organisation_id=org.id))
+        session.commit()
+
+
+def count_statements(db, client, path: str, headers: dict) -> int:
+    statements = []
+    
+    def record(*args):
+        statements.append(1)
+    
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        response = client.get(path, headers=headers)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+    assert response.status_code == 200, response.text
+    return len(statements)
+
+
+@pytest.mark.parametrize("path", ["/super-admin/stats", "/super-admin/users"])
+def test_statement_count_does_not_grow_with_organisations(app_db, client, super_admin_headers, path):
+    # Warm the principal cache so only the endpoint's own queries are counted
+    client.get(path, headers=super_admin_headers)
+    
+    add_organisations(app_db, 1)
+    with_one = count_statements(app_db, client, path, super_admin_headers)
+    add_organisations(app_db, 25)
+    with_many = count_statements(app_db, client, path, super_admin_headers)
+    
+    assert with_one == with_many
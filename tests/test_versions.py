@@ -0,0 +1,20 @@
+def test_rename_changes_etag_of_timetable_with_only_recurring_slots(client, org):
+    headers = org["headers"]
+    response = client.post("/timetable/recurring", json={
+        "academic_term_id": org["term"], "subject_id": org["subject"], "faculty_id": org["faculty"],
+        "section_id": org["section"], "room_id": org["room"],
+        "day_of_week": "MONDAY", "start_time": "09:00", "end_time": "10:00"
+    }, headers=headers)
+    assert response.status_code == 201, response.text
+    
+    urls = [f"/timetable/term/{org['term']}", f"/timetable/section/{org['section']}"]
+    etags = {url: client.get(url, headers=headers).headers["ETag"] for url in urls}
+    
+    response = client.put(f"/subjects/{org['subject']}", json={"name": "Physics"}, headers=headers)
+    assert response.status_code == 200, response.text
+    
+    for url in urls:
+        response = client.get(url, headers={**headers, "If-None-Match": etags[url]})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etags[url]
+        assert response.json()[0]["subject_name"] == "Physics"
@@ -0,0 +1,100 @@
+"""
+Timetable version counters and conditional GET support.
+
+Every term, section and batch carries a `timetable_version` that is bumped in
+the same transaction as any write to the slots it shows. Timetable GETs derive
+their ETag from it, so an unchanged view is answered with 304 Not Modified
+without reading the slot table.
+"""
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy import select, union
+from sqlalchemy.orm import Session
+
+from models import AcademicTerm, Section, Batch, TimetableSlot, RecurringSlot
+
+
+VERSIONED_GROUPS = (
+    (AcademicTerm, TimetableSlot.academic_term_id),
+    (Section, TimetableSlot.section_id),
+    (Batch, TimetableSlot.batch_id),
+)
+
+# Both dated and recurring slots show up in a timetable
+SLOT_SOURCES = (TimetableSlot, RecurringSlot)
+
+
+# =========================
+# VERSION BUMPS
+# =========================
+def bump_versions(db: Session, model, *filters) -> None:
+    db.query(model).filter(*filters).update(
+        {model.timetable_version: model.timetable_version + 1},
+        synchronize_session=False
+    )
+
+
+def bump_slot_versions(db: Session, slots) -> None:
+    """Bump the term/section/batch shown by each of `slots` (TimetableSlot rows or column dicts)."""
+    ids = {model: set() for model, _ in VERSIONED_GROUPS}
+    for slot in slots:
+        if not isinstance(slot, dict):
+            slot = {
+                "academic_term_id": slot.academic_term_id,
+                "section_id": slot.section_id,
+                "batch_id": slot.batch_id,
+            }
+        for model, column in VERSIONED_GROUPS:
+            if slot.get(column.key):
+                ids[model].add(slot[column.key])
+    for model, model_ids in ids.items():
+        if model_ids:
+            bump_versions(db, model, model.id.in_(model_ids))
+
+
+def bump_versions_where(db: Session, column_key: str, value) -> None:
+    """Bump every term/section/batch showing a dated or recurring slot whose `column_key` is `value`."""
+    for model, column in VERSIONED_GROUPS:
+        shown = union(*(
+            select(getattr(source, column.key)).where(
+                getattr(source, column_key) == value,
+                getattr(source, column.key).isnot(None)
+            )
+            for source in SLOT_SOURCES
+        ))
+        bump_versions(db, model, model.id.in_(shown))
+
+
+# =========================
+# ETAGS
+# =========================
+def make_etag(kind: str, key, version) -> str:
+    return f'"{kind}-{key}-v{version}"'
+
+
+def make_digest_etag(kind: str, *parts) -> str:
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+    return f'"{kind}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Set the validator headers on `response`; return a 304 if the client already has `etag`."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=dict(response.headers))
+    return None